@@ -1,6 +1,5 @@
 import numpy as np
 import pandas as pd
-from scipy.signal import correlate
 
 def detect_time_shift(throughput_slots, packet_loss_slots, max_lag=50):
     """
@@ -9,6 +8,8 @@ def detect_time_shift(throughput_slots, packet_loss_slots, max_lag=50):
     Returns:
         lag (int): positive means packet_loss lags throughput
     """
+    from scipy.signal import correlate
+
     # Normalize
     t = (throughput_slots - throughput_slots.mean()) / (throughput_slots.std() + 1e-6)
     p = (packet_loss_slots - packet_loss_slots.mean()) / (packet_loss_slots.std() + 1e-6)
@@ -23,9 +24,12 @@ def detect_time_shift(throughput_slots, packet_loss_slots, max_lag=50):
     return int(best_lag)
 
 
-def align_packet_loss(throughput_df, packet_df):
+def align_packet_loss(throughput_df, packet_df, copy=True):
     """
     Align packet loss timeline to throughput timeline.
+
+    copy=False shifts packet_df's packet_loss column in place and returns
+    packet_df itself. The column keeps its dtype (e.g. uint16).
     """
     min_len = min(len(throughput_df), len(packet_df))
 
@@ -34,13 +38,14 @@ def align_packet_loss(throughput_df, packet_df):
 
     lag = detect_time_shift(t_series.values, p_series.values)
 
-    aligned_packet = packet_df.copy()
+    aligned_packet = packet_df.copy() if copy else packet_df
+    dtype = aligned_packet["packet_loss"].dtype
 
     if lag > 0:
         aligned_packet["packet_loss"] = aligned_packet["packet_loss"].shift(-lag)
     elif lag < 0:
         aligned_packet["packet_loss"] = aligned_packet["packet_loss"].shift(abs(lag))
 
-    aligned_packet["packet_loss"] = aligned_packet["packet_loss"].fillna(0)
+    aligned_packet["packet_loss"] = aligned_packet["packet_loss"].fillna(0).astype(dtype)
 
     return aligned_packet, lag
@@ -0,0 +1,270 @@
+# =========================
+# FronthaulIQ Batch Runner
+# =========================
+"""
+Runs the PS1/PS2 pipeline over many sites in parallel.
+
+    python src/batch.py --sites-root data/sites --workers 8 --max-memory-gb 4
+
+Every sub-directory of --sites-root that holds a throughput/ and a
+packet_stats/ folder is one site. Sites run in a process pool; each worker
+gets an address-space limit and is recycled after --tasks-per-worker sites
+so memory cannot creep up over a long night. A site that raises (or whose
+worker dies) is recorded as failed and the rest carry on.
+
+Results go to one table with a row per (site, link): the inferred cells,
+the capacity estimates, and topology accuracy when the site ships a
+topology_truth.json (see simulation/workload_generator.py).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from pipeline.stages import run_pipeline
+
+RESULT_COLUMNS = [
+    "site", "status", "error", "n_cells", "n_links", "link", "cells",
+    "no_buffer", "with_buffer", "offered_with_buffer",
+    "topology_accuracy", "seconds", "peak_rss_mb",
+]
+
+
+def discover_sites(root, throughput_subdir="throughput", packet_subdir="packet_stats"):
+    """
+    Returns:
+        list of site directories under root, sorted by name
+    """
+    sites = []
+    for entry in sorted(os.scandir(root), key=lambda e: e.name):
+        if (entry.is_dir()
+                and os.path.isdir(os.path.join(entry.path, throughput_subdir))
+                and os.path.isdir(os.path.join(entry.path, packet_subdir))):
+            sites.append(entry.path)
+    return sites
+
+
+def _limit_memory(max_memory_bytes):
+    if resource is not None and max_memory_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory_bytes, max_memory_bytes))
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_site(site_dir, cache_root=None, throughput_subdir="throughput",
+             packet_subdir="packet_stats", **overrides):
+    """
+    Runs topology inference and capacity estimation for one site.
+
+    Never raises: errors are returned as a single "failed" row.
+
+    Returns:
+        list of result rows (dicts with RESULT_COLUMNS keys)
+    """
+    site = os.path.basename(os.path.normpath(site_dir))
+    start = time.time()
+
+    try:
+        from topology.infer_links import score_link_mapping
+
+        cache_dir = os.path.join(cache_root, site) if cache_root else None
+        result, _ = run_pipeline(
+            ["cells", "link_mapping", "capacity"],
+            cache_dir=cache_dir,
+            throughput_dir=os.path.join(site_dir, throughput_subdir),
+            packet_dir=os.path.join(site_dir, packet_subdir),
+            **overrides
+        )
+
+        link_mapping = result["link_mapping"]
+        if not link_mapping:
+            raise RuntimeError("no communities detected")
+
+        accuracy = None
+        truth_path = os.path.join(site_dir, "topology_truth.json")
+        if os.path.exists(truth_path):
+            with open(truth_path) as f:
+                accuracy = score_link_mapping(link_mapping, json.load(f))["accuracy"]
+
+        capacity = result["capacity"].set_index("link")
+        rows = [
+            {
+                "site": site,
+                "status": "ok",
+                "error": None,
+                "n_cells": len(result["cells"]),
+                "n_links": len(link_mapping),
+                "link": link,
+                "cells": ";".join(cells),
+                "no_buffer": capacity.at[link, "no_buffer"],
+                "with_buffer": capacity.at[link, "with_buffer"],
+                "offered_with_buffer": capacity.at[link, "offered_with_buffer"],
+                "topology_accuracy": accuracy,
+            }
+            for link, cells in link_mapping.items()
+        ]
+    except BaseException as exc:  # MemoryError included; keep the batch going
+        if isinstance(exc, KeyboardInterrupt):
+            raise
+        rows = [_failed_row(site, f"{type(exc).__name__}: {exc}")]
+        traceback.print_exc()
+
+    elapsed, peak = time.time() - start, _peak_rss_mb()
+    for row in rows:
+        row["seconds"] = elapsed
+        row["peak_rss_mb"] = peak
+
+    return rows
+
+
+def _failed_row(site, error):
+    row = {col: None for col in RESULT_COLUMNS}
+    row.update(site=site, status="failed", error=error)
+    return row
+
+
+def _run_pool(sites, workers, max_memory_bytes, tasks_per_worker, site_kwargs):
+    """
+    Runs sites in one pool.
+
+    Returns:
+        (rows, sites whose worker died before returning)
+    """
+    rows, crashed = [], []
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_limit_memory,
+        initargs=(max_memory_bytes,),
+        max_tasks_per_child=tasks_per_worker,
+    ) as pool:
+        futures = {pool.submit(run_site, site, **site_kwargs): site for site in sites}
+
+        for future in as_completed(futures):
+            site = futures[future]
+            try:
+                site_rows = future.result()
+            except BrokenProcessPool:
+                crashed.append(site)
+                continue
+
+            rows.extend(site_rows)
+            status = site_rows[0]["status"]
+            print(f"{'✅' if status == 'ok' else '❌'} {os.path.basename(site)}: {status}")
+
+    return rows, crashed
+
+
+def run_batch(sites, workers=None, max_memory_gb=None, tasks_per_worker=1,
+              cache_root=None, **overrides):
+    """
+    Runs every site and aggregates the results.
+
+    A worker that dies outright (e.g. killed by the OOM killer) breaks the
+    whole pool, so the sites still pending at that point get one isolated
+    retry: each in its own single-worker pool, `workers` of those pools at
+    a time. Only a site that crashes again is marked failed.
+
+    Returns:
+        DataFrame with RESULT_COLUMNS, one row per (site, link)
+    """
+    import pandas as pd
+
+    max_memory_bytes = int(max_memory_gb * 1024 ** 3) if max_memory_gb else None
+    site_kwargs = {"cache_root": cache_root, **overrides}
+
+    rows, crashed = _run_pool(sites, workers, max_memory_bytes, tasks_per_worker, site_kwargs)
+
+    def retry(site):
+        return site, _run_pool([site], 1, max_memory_bytes, tasks_per_worker, site_kwargs)
+
+    # Threads only wait on the per-site pools, the work runs in their workers
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as threads:
+        for site, (retry_rows, still_crashed) in threads.map(retry, sorted(crashed)):
+            rows.extend(retry_rows)
+            if still_crashed:
+                rows.append(_failed_row(os.path.basename(site), "worker process died"))
+                print(f"❌ {os.path.basename(site)}: worker process died")
+
+    table = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+    return table.sort_values(["site", "link"], na_position="first").reset_index(drop=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run FronthaulIQ over many sites")
+    parser.add_argument("--sites-root", required=True,
+                        help="Directory with one sub-directory per site")
+    parser.add_argument("--output", default="data/processed/batch_results.csv")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-memory-gb", type=float, default=None,
+                        help="Address-space limit per worker")
+    parser.add_argument("--tasks-per-worker", type=int, default=1,
+                        help="Sites a worker runs before it is replaced")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Artifact cache root (one sub-directory per site)")
+    parser.add_argument("--throughput-subdir", default="throughput")
+    parser.add_argument("--packet-subdir", default="packet_stats")
+    parser.add_argument("--threshold", type=float, default=None)
+    parser.add_argument("--max-links", type=int, default=None)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    sites = discover_sites(args.sites_root, args.throughput_subdir, args.packet_subdir)
+    if not sites:
+        print(f"❌ No sites found under {args.sites_root}")
+        return 1
+
+    print(f"🚀 Running {len(sites)} sites...\n")
+
+    overrides = {
+        name: value
+        for name, value in (("threshold", args.threshold), ("max_links", args.max_links))
+        if value is not None
+    }
+    table = run_batch(
+        sites,
+        workers=args.workers,
+        max_memory_gb=args.max_memory_gb,
+        tasks_per_worker=args.tasks_per_worker,
+        cache_root=args.cache_dir,
+        throughput_subdir=args.throughput_subdir,
+        packet_subdir=args.packet_subdir,
+        **overrides
+    )
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    table.to_csv(args.output, index=False)
+
+    failed = table.loc[table["status"] == "failed", "site"].unique()
+    print(f"\n🏁 {len(sites) - len(failed)}/{len(sites)} sites succeeded")
+    if len(failed):
+        print(f"   Failed: {list(failed)}")
+    print(f"Results written to {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+
+"""
+Stage Benchmarks
+================
+
+Runs every pipeline stage on synthetic data at increasing scale and
+records time, throughput (cell-slots per second) and traced peak memory.
+
+    python src/benchmarks/bench_stages.py --scale small
+    python src/benchmarks/bench_stages.py --scale medium --save-baseline
+    python src/benchmarks/bench_stages.py --scale small --baseline src/benchmarks/baseline.json
+
+With --baseline, exits with status 1 if any stage got slower or used more
+memory than the baseline by more than --tolerance. Only grid points present
+in both are compared. The committed baseline.json is a small-scale run;
+re-save it on the machine that does the comparing.
+
+Grid points whose cells x slots exceed --max-cell-slots are skipped (and
+reported as such). The default, 2.4e9, runs 24 x 10^8, 200 x 10^7 and
+2,000 x 10^6 cells x slots and everything smaller. Inputs take about 32
+bytes per cell-slot, so the largest of those need tens of GB; the
+2,000-cell x 10^8-slot corner would need terabytes as dense frames.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+SCALES = {
+    "small": {"cells": [24], "slots": [10 ** 5]},
+    "medium": {"cells": [24, 200], "slots": [10 ** 5, 10 ** 6]},
+    "large": {"cells": [24, 200, 2000], "slots": [10 ** 5, 10 ** 6, 10 ** 7, 10 ** 8]},
+}
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# Largest grid point run by default: 24 cells x 10^8 slots
+MAX_CELL_SLOTS = 24 * 10 ** 8
+
+
+# -------------------------
+# Synthetic inputs
+# -------------------------
+def make_inputs(n_cells, n_slots, n_links=3, seed=0):
+    """
+    Bursty per-cell traffic where cells on the same link lose packets
+    together, so correlation and clustering have real structure to find.
+    """
+    rng = np.random.default_rng(seed)
+
+    cells = [f"cell-{i + 1}" for i in range(n_cells)]
+    link_of = rng.integers(0, n_links, n_cells)
+    link_mapping = {
+        f"Link{l + 1}": [c for c, k in zip(cells, link_of) if k == l]
+        for l in range(n_links)
+    }
+    link_mapping = {k: v for k, v in link_mapping.items() if v}
+
+    slots = np.arange(n_slots)
+    link_burst = rng.random((n_links, n_slots)) < 0.002
+
+    packets, throughput = {}, {}
+    for i, cell in enumerate(cells):
+        burst = link_burst[link_of[i]] & (rng.random(n_slots) < 0.8)
+        loss = np.where(burst, rng.integers(1, 40, n_slots), 0).astype(float)
+        tput = rng.gamma(2.0, 4000.0, n_slots) * (1 + 3 * burst)
+
+        packets[cell] = pd.DataFrame({"slot": slots, "packet_loss": loss})
+        throughput[cell] = pd.DataFrame({"slot": slots, "throughput": tput})
+
+    return packets, throughput, link_mapping
+
+
+def write_packet_files(packets, directory):
+    for cell, df in packets.items():
+        n = len(df)
+        data = np.column_stack([
+            df["slot"].to_numpy() * 0.0005,
+            df["packet_loss"].to_numpy(),
+            df["packet_loss"].to_numpy(),
+            np.zeros(n)
+        ])
+        path = os.path.join(directory, f"pkt-stats-{cell}.dat")
+        np.savetxt(path, data, fmt="%.5f %d %d %d",
+                   header="<slot> <slotStart> <txPackets> <rxPackets> <tooLateRxPackets>",
+                   comments="")
+
+
+# -------------------------
+# Stage runners
+# -------------------------
+def stage_benchmarks(packets, throughput, link_mapping, tmp_dir):
+    """
+    Yields (stage_name, callable); later callables reuse earlier results.
+    """
+    from ingestion.load_packet_stats import load_packet_stats
+    from alignment.time_shift import align_packet_loss
+    from topology.congestion_events import extract_windowed_congestion_events
+    from topology.correlation import build_congestion_matrix, compute_correlation_matrix
+    from topology.graph_builder import build_correlation_graph
+    from topology.clustering import detect_link_communities
+    from ps2.link_aggregation import aggregate_link_throughput
+    from ps2.capacity_estimation import (
+        required_capacity_no_buffer,
+        required_capacity_with_buffer
+    )
+
+    # Stages import scipy lazily; load it here so the first timed run of
+    # align_packet_loss does not pay for the import
+    import scipy.signal  # noqa: F401
+
+    state = {}
+
+    def run_load():
+        return load_packet_stats(tmp_dir)
+
+    def run_align():
+        state["aligned"] = {
+            c: align_packet_loss(throughput[c], packets[c])[0] for c in packets
+        }
+
+    def run_events():
+        state["events"] = {
+            c: extract_windowed_congestion_events(df) for c, df in state["aligned"].items()
+        }
+
+    def run_correlation():
+        state["corr"] = compute_correlation_matrix(build_congestion_matrix(state["events"]))
+
+    def run_graph():
+        state["graph"] = build_correlation_graph(state["corr"])
+
+    def run_communities():
+        return detect_link_communities(state["graph"], max_links=len(link_mapping))
+
+    def run_aggregation():
+        state["links"] = aggregate_link_throughput(throughput, link_mapping)
+
+    def run_capacity():
+        for df in state["links"].values():
+            required_capacity_no_buffer(df)
+            required_capacity_with_buffer(df)
+
+    return [
+        ("load_packet_stats", run_load),
+        ("align_packet_loss", run_align),
+        ("extract_windowed_congestion_events", run_events),
+        ("compute_correlation_matrix", run_correlation),
+        ("build_correlation_graph", run_graph),
+        ("detect_link_communities", run_communities),
+        ("aggregate_link_throughput", run_aggregation),
+        ("capacity_estimation", run_capacity),
+    ]
+
+
+def measure(func, repeat):
+    """
+    Best-of-`repeat` wall time; peak traced memory from a separate run so
+    tracemalloc overhead does not distort the timings.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return best, peak / 1024 ** 2
+
+
+def run_benchmarks(scale, repeat=3, stages=None, max_cell_slots=MAX_CELL_SLOTS):
+    results = []
+
+    for n_cells in SCALES[scale]["cells"]:
+        for n_slots in SCALES[scale]["slots"]:
+            if n_cells * n_slots > max_cell_slots:
+                results.append({"cells": n_cells, "slots": n_slots, "stage": "*", "status": "skipped"})
+                print(f"⏭️  {n_cells} cells x {n_slots} slots: skipped (over --max-cell-slots)")
+                continue
+
+            packets, throughput, link_mapping = make_inputs(n_cells, n_slots)
+
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                if stages is None or "load_packet_stats" in stages:
+                    write_packet_files(packets, tmp_dir)
+
+                for name, func in stage_benchmarks(packets, throughput, link_mapping, tmp_dir):
+                    # Dependent stages still run, only unselected ones are not timed
+                    if stages is not None and name not in stages:
+                        if name != "load_packet_stats":
+                            func()
+                        continue
+
+                    seconds, peak_mb = measure(func, repeat)
+                    results.append({
+                        "stage": name,
+                        "cells": n_cells,
+                        "slots": n_slots,
+                        "status": "ok",
+                        "seconds": seconds,
+                        "cell_slots_per_s": n_cells * n_slots / seconds if seconds else None,
+                        "peak_mb": peak_mb,
+                    })
+                    print(f"   {name:<36} {n_cells:>5} x {n_slots:<10} "
+                          f"{seconds:8.3f}s  {peak_mb:9.1f} MB")
+
+    return results
+
+
+# -------------------------
+# Baselines
+# -------------------------
+def _key(r):
+    return f"{r['stage']}|{r['cells']}|{r['slots']}"
+
+
+# Absolute slack so millisecond-scale stages do not flap on timer noise
+MIN_DELTA = {"seconds": 0.05, "peak_mb": 1.0}
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Returns a list of human-readable regressions (empty if none).
+    """
+    base = {_key(r): r for r in baseline["results"] if r.get("status") == "ok"}
+    regressions = []
+
+    for r in results:
+        if r.get("status") != "ok" or _key(r) not in base:
+            continue
+        b = base[_key(r)]
+
+        for metric in ("seconds", "peak_mb"):
+            limit = max(b[metric] * (1 + tolerance), b[metric] + MIN_DELTA[metric])
+            if r[metric] > limit:
+                regressions.append(
+                    f"{r['stage']} @ {r['cells']}x{r['slots']}: {metric} "
+                    f"{r[metric]:.3f} vs baseline {b[metric]:.3f}"
+                )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FronthaulIQ stage benchmarks")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--stages", nargs="*", help="Only time these stages")
+    parser.add_argument("--max-cell-slots", type=float, default=MAX_CELL_SLOTS)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"Also write results to {DEFAULT_BASELINE}")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown / memory growth")
+    args = parser.parse_args()
+
+    print(f"🏋️  Benchmarking pipeline stages ({args.scale})...\n")
+    results = run_benchmarks(args.scale, args.repeat, args.stages, args.max_cell_slots)
+
+    payload = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "scale": args.scale,
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(payload, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, "w") as f:
+            json.dump(payload, f, indent=2)
+        print(f"Baseline saved to {DEFAULT_BASELINE}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+
+"""
+Memory Report
+=============
+
+Runs the full main.py pipeline on a dataset once per memory configuration,
+each in a fresh process, and reports the process peak RSS and wall time:
+
+    default                       every intermediate kept alive
+    --low-memory                  one run, intermediates released, no copies
+    --compact-dtypes              float32 / uint16 / uint8 storage
+    --low-memory --compact-dtypes both
+
+    python src/benchmarks/memory_report.py
+    python src/benchmarks/memory_report.py --throughput-dir site/throughput \
+        --packet-dir site/packet_stats --output memory_report.json
+
+The bundled dataset (data/raw) only has packet stats. Without
+--throughput-dir, a throughput trace is synthesized from them first:
+one row per packet-stats row, rxPackets * SYNTH_BYTES_PER_PACKET bytes at
+the row's timestamp. The committed memory_report.json was produced by the
+default invocation.
+
+The artifact cache is disabled so every configuration does the same work.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from pipeline.stages import DEFAULT_PARAMS
+
+MAIN = Path(__file__).resolve().parents[1] / "main.py"
+REPORT = Path(__file__).resolve().parent / "memory_report.json"
+
+# Bytes per received packet in the synthesized throughput trace
+SYNTH_BYTES_PER_PACKET = 800
+
+CONFIGS = {
+    "default": [],
+    "low-memory": ["--low-memory"],
+    "compact-dtypes": ["--compact-dtypes"],
+    "low-memory + compact-dtypes": ["--low-memory", "--compact-dtypes"],
+}
+
+# Runs main.py in this interpreter, then reports its own peak RSS
+WRAPPER = """
+import resource, runpy, sys
+sys.argv = sys.argv[1:]
+sys.path.insert(0, str(__import__("pathlib").Path(sys.argv[0]).parent))
+try:
+    runpy.run_path(sys.argv[0], run_name="__main__")
+finally:
+    print("__PEAK_RSS_KB__", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def synthesize_throughput(packet_dir, out_dir, bytes_per_packet=SYNTH_BYTES_PER_PACKET):
+    """
+    Writes throughput-cell-N.dat files for every packet stats file: one
+    "<time> <bytes>" row per packet row, bytes = rxPackets * bytes_per_packet.
+    """
+    import pandas as pd
+
+    os.makedirs(out_dir, exist_ok=True)
+    for file in sorted(os.listdir(packet_dir)):
+        match = re.search(r"cell[-_]?(\d+)", file, re.IGNORECASE)
+        if not file.endswith(".dat") or not match:
+            continue
+
+        raw = pd.read_csv(os.path.join(packet_dir, file), sep=r"\s+", header=None, comment="<")
+        pd.DataFrame({
+            "time": raw[0].map("{:.5f}".format),
+            "bytes": raw[2].astype("int64") * bytes_per_packet,
+        }).to_csv(
+            os.path.join(out_dir, f"throughput-cell-{match.group(1)}.dat"),
+            sep=" ", header=False, index=False
+        )
+
+
+def measure(flags, throughput_dir, packet_dir):
+    """
+    Returns:
+        dict(peak_rss_mb, wall_s)
+    """
+    cmd = [
+        sys.executable, "-c", WRAPPER, str(MAIN),
+        "--throughput-dir", throughput_dir,
+        "--packet-dir", packet_dir,
+        "--no-cache", "--no-bundle",
+        *flags,
+    ]
+
+    start = time.perf_counter()
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+
+    if result.returncode != 0:
+        raise RuntimeError(f"main.py {' '.join(flags)} failed:\n{result.stderr[-2000:]}")
+
+    peak_kb = next(
+        int(line.split()[1]) for line in result.stdout.splitlines()
+        if line.startswith("__PEAK_RSS_KB__")
+    )
+
+    return {"peak_rss_mb": peak_kb / 1024, "wall_s": wall}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory per pipeline memory mode")
+    parser.add_argument("--throughput-dir", default=None,
+                        help="Throughput traces (default: synthesized from the packet stats)")
+    parser.add_argument("--packet-dir", default=DEFAULT_PARAMS["packet_dir"])
+    parser.add_argument("--output", default=str(REPORT), help="JSON report path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        throughput_dir = args.throughput_dir
+        if throughput_dir is None:
+            throughput_dir = os.path.join(tmp, "throughput")
+            print(f"🧪 Synthesizing throughput from {args.packet_dir} "
+                  f"({SYNTH_BYTES_PER_PACKET} bytes per received packet)...")
+            synthesize_throughput(args.packet_dir, throughput_dir)
+
+        print("🧠 Measuring peak memory per configuration...\n")
+
+        report = {}
+        for name, flags in CONFIGS.items():
+            report[name] = measure(flags, throughput_dir, args.packet_dir)
+            print(f"   {name}: {report[name]['peak_rss_mb']:.0f} MB peak RSS, "
+                  f"{report[name]['wall_s']:.1f}s")
+
+    baseline = report["default"]["peak_rss_mb"]
+    print("\n📉 Peak RSS vs default:\n")
+    for name, row in report.items():
+        print(f"   {name:<28} {row['peak_rss_mb']:>8.0f} MB  "
+              f"({row['peak_rss_mb'] / baseline:.0%} of default)")
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "throughput_dir": args.throughput_dir or (
+                f"synthesized: rxPackets * {SYNTH_BYTES_PER_PACKET} bytes"
+            ),
+            "packet_dir": args.packet_dir,
+            "configs": report,
+        }, f, indent=2)
+    print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+
+"""
+Hierarchical Multiplexing Tree
+==============================
+
+Aggregates traffic up the transport hierarchy:
+
+    cells -> fronthaul links -> aggregation switch -> uplink
+
+The tree is a nested dict. Inner nodes map child names to subtrees and the
+lowest level maps link names to their cell lists, e.g.
+
+    {"Uplink": {"Switch1": {"Link1": ["cell-1", "cell-2"],
+                            "Link2": ["cell-3"]}}}
+
+A single bottom-up pass computes every node's per-slot traffic from its
+children's arrays (raw cells are only summed once, at the link level), the
+required capacity with and without buffering, and the statistical
+multiplexing gain: sum of the children's required capacities divided by
+the node's own.
+"""
+
+import numpy as np
+import pandas as pd
+
+from capacity.stats import fast_percentile, rolling_mean
+from preprocessing.normalize import slot_matrix
+from preprocessing.symbol_to_slot import SLOT_DURATION_SEC
+
+DEFAULT_TIERS = ["uplink", "switch", "link", "cell"]
+
+
+def tree_from_link_mapping(link_mapping, switches=None, uplink="Uplink"):
+    """
+    Builds a tree definition from a PS1 link mapping.
+
+    Args:
+        switches: optional dict[switch] -> list of links; by default all
+                  links hang off a single switch
+    """
+    if switches is None:
+        switches = {"Switch1": list(link_mapping)}
+
+    return {
+        uplink: {
+            switch: {link: list(link_mapping[link]) for link in links}
+            for switch, links in switches.items()
+        }
+    }
+
+
+def aggregate_hierarchy(slot_throughput, tree, buffer_slots=2, percentile=99,
+                        tier_names=None):
+    """
+    Computes per-slot traffic and required capacity at every tree node.
+
+    Args:
+        slot_throughput: dict[cell_id] -> DataFrame(slot, throughput) in BYTES
+        tree: nested dict, see module docstring
+        buffer_slots: buffer window for the buffered capacity
+        percentile: capacity percentile
+        tier_names: names per depth (defaults to DEFAULT_TIERS)
+
+    Returns:
+        (report, node_series)
+        report: DataFrame, one row per node (cells included) with
+            node, tier, parent, n_cells, required_no_buffer,
+            required_with_buffer, children_sum, mux_gain
+        node_series: dict[node] -> np.ndarray Gbps per slot
+    """
+    tier_names = tier_names or DEFAULT_TIERS
+
+    cells = []
+    _collect_cells(tree, cells)
+
+    matrix, _, cells = slot_matrix(slot_throughput, "throughput", cells=cells)
+    matrix *= 8 / SLOT_DURATION_SEC / 1e9
+    row = {cell: i for i, cell in enumerate(cells)}
+
+    node_series = {}
+    rows = []
+
+    def capacities(series):
+        no_buf = float(fast_percentile(series, percentile))
+        buf = float(fast_percentile(rolling_mean(series[None, :], buffer_slots)[0], percentile))
+        return no_buf, buf
+
+    def visit(name, subtree, depth, parent):
+        tier = tier_names[depth] if depth < len(tier_names) else f"tier{depth}"
+
+        if isinstance(subtree, dict):
+            child_caps = [
+                visit(child, child_tree, depth + 1, name)
+                for child, child_tree in subtree.items()
+            ]
+            # Reuse the children's arrays instead of re-summing cells
+            series = np.sum([node_series[c["node"]] for c in child_caps], axis=0)
+            n_cells = sum(c["n_cells"] for c in child_caps)
+        else:
+            child_tier = tier_names[depth + 1] if depth + 1 < len(tier_names) else f"tier{depth + 1}"
+            child_caps = []
+            for cell in subtree:
+                cell_series = matrix[row[cell]]
+                node_series[cell] = cell_series
+                no_buf, buf = capacities(cell_series)
+                child_caps.append({
+                    "node": cell, "tier": child_tier, "parent": name, "n_cells": 1,
+                    "required_no_buffer": no_buf, "required_with_buffer": buf,
+                    "children_sum": np.nan, "mux_gain": np.nan
+                })
+            rows.extend(child_caps)
+
+            series = matrix[[row[c] for c in subtree]].sum(axis=0)
+            n_cells = len(subtree)
+
+        node_series[name] = series
+        no_buf, buf = capacities(series)
+        children_sum = sum(c["required_no_buffer"] for c in child_caps)
+
+        node_row = {
+            "node": name,
+            "tier": tier,
+            "parent": parent,
+            "n_cells": n_cells,
+            "required_no_buffer": no_buf,
+            "required_with_buffer": buf,
+            "children_sum": children_sum,
+            "mux_gain": children_sum / no_buf if no_buf > 0 else np.nan
+        }
+        rows.append(node_row)
+
+        return node_row
+
+    for root, subtree in tree.items():
+        visit(root, subtree, 0, None)
+
+    return pd.DataFrame(rows), node_series
+
+
+def tier_multiplexing_gain(report):
+    """
+    Multiplexing gain per tier: capacity needed if every child were sized
+    on its own, divided by the capacity the tier actually needs.
+    """
+    inner = report.dropna(subset=["mux_gain"])
+
+    summary = inner.groupby("tier", sort=False).agg(
+        nodes=("node", "count"),
+        children_sum=("children_sum", "sum"),
+        required=("required_no_buffer", "sum")
+    )
+    summary["mux_gain"] = summary["children_sum"] / summary["required"]
+
+    return summary.reset_index()
+
+
+def _collect_cells(subtree, out):
+    if isinstance(subtree, dict):
+        for child in subtree.values():
+            _collect_cells(child, out)
+    else:
+        out.extend(subtree)
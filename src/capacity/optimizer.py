@@ -0,0 +1,207 @@
+
+"""
+What-If Re-homing Optimizer
+===========================
+
+Evaluates moving cells between fronthaul links without re-running
+aggregate_link_throughput and the capacity functions from scratch.
+
+Every cell's slot series (Gbps) and its buffer-smoothed version are kept
+as rows of a matrix on a shared slot grid. A move only touches two link
+series: the cell's row is subtracted from the source link and added to the
+destination link, and only those two capacities are recomputed.
+
+Capacities use the same definitions as ps2.capacity_estimation, with one
+difference: all links share the global slot grid, so slots where none of a
+link's cells reported are counted as zero traffic.
+"""
+
+import numpy as np
+
+from capacity.stats import fast_percentile, rolling_mean
+from preprocessing.normalize import slot_matrix
+from preprocessing.symbol_to_slot import SLOT_DURATION_SEC
+
+
+class WhatIfEngine:
+    """
+    Incremental link capacity engine for cell re-homing.
+
+    Args:
+        slot_throughput (dict): cell_id -> DataFrame(slot, throughput) in BYTES
+        link_mapping (dict): link -> list of cells
+        buffer_slots (int | None): buffer smoothing window as in
+            required_capacity_with_buffer; None sizes without buffer
+        percentile (float): capacity percentile
+    """
+
+    def __init__(self, slot_throughput, link_mapping, buffer_slots=2, percentile=99):
+        cells = [c for cells in link_mapping.values() for c in cells]
+
+        matrix, self.slots, self.cells = slot_matrix(slot_throughput, "throughput", cells=cells)
+
+        # BYTES/slot -> Gbps
+        matrix *= 8 / SLOT_DURATION_SEC / 1e9
+
+        if buffer_slots:
+            matrix = rolling_mean(matrix, buffer_slots)
+
+        self.matrix = matrix
+        self.percentile = percentile
+        self.row = {cell: i for i, cell in enumerate(self.cells)}
+
+        self.assignment = {
+            cell: link for link, members in link_mapping.items() for cell in members
+        }
+        self.links = list(link_mapping)
+
+        self.link_series = {
+            link: self.matrix[[self.row[c] for c in members]].sum(axis=0)
+            for link, members in link_mapping.items()
+        }
+        self.link_size = {link: len(members) for link, members in link_mapping.items()}
+        self.capacity = {
+            link: self._capacity(series) for link, series in self.link_series.items()
+        }
+
+    def _capacity(self, series):
+        if len(series) == 0:
+            return 0.0
+        return float(fast_percentile(series, self.percentile))
+
+    def link_mapping(self):
+        mapping = {link: [] for link in self.links}
+        for cell, link in self.assignment.items():
+            mapping[link].append(cell)
+        return {link: sorted(cells) for link, cells in mapping.items()}
+
+    def objective(self, kind="total", capacity=None):
+        capacity = self.capacity if capacity is None else capacity
+        values = list(capacity.values())
+        return max(values) if kind == "peak" else sum(values)
+
+    def evaluate_move(self, cell, dst):
+        """
+        Capacities of the two affected links if `cell` moved to `dst`.
+
+        Returns:
+            dict[link] -> capacity for the source and destination links
+        """
+        src = self.assignment[cell]
+        if src == dst:
+            return {src: self.capacity[src]}
+
+        vec = self.matrix[self.row[cell]]
+
+        return {
+            src: self._capacity(self.link_series[src] - vec),
+            dst: self._capacity(self.link_series[dst] + vec)
+        }
+
+    def move_delta(self, cell, dst, kind="total"):
+        """
+        Change in the objective if `cell` moved to `dst` (negative is better).
+        """
+        changed = self.evaluate_move(cell, dst)
+        after = {**self.capacity, **changed}
+
+        return self.objective(kind, after) - self.objective(kind)
+
+    def move_deltas(self, cell, kind="total"):
+        """
+        Objective change for moving `cell` to every other link.
+
+        The source link without the cell is evaluated once and shared by
+        all destinations, so each extra candidate costs one percentile.
+
+        Returns:
+            dict[dst_link] -> objective delta (negative is better)
+        """
+        src = self.assignment[cell]
+        vec = self.matrix[self.row[cell]]
+
+        src_cap = self._capacity(self.link_series[src] - vec)
+        before = self.objective(kind)
+
+        deltas = {}
+        for dst in self.links:
+            if dst == src:
+                continue
+
+            after = dict(self.capacity)
+            after[src] = src_cap
+            after[dst] = self._capacity(self.link_series[dst] + vec)
+
+            deltas[dst] = self.objective(kind, after) - before
+
+        return deltas
+
+    def apply_move(self, cell, dst):
+        src = self.assignment[cell]
+        if src == dst:
+            return
+
+        changed = self.evaluate_move(cell, dst)
+        vec = self.matrix[self.row[cell]]
+
+        self.link_series[src] = self.link_series[src] - vec
+        self.link_series[dst] = self.link_series[dst] + vec
+        self.link_size[src] -= 1
+        self.link_size[dst] += 1
+        self.assignment[cell] = dst
+        self.capacity.update(changed)
+
+
+def optimize_assignment(slot_throughput, link_mapping, objective="total",
+                        buffer_slots=2, percentile=99, max_moves=1000,
+                        max_cells_per_link=None, seed=0):
+    """
+    Local search over cell-to-link assignments.
+
+    Sweeps the cells in random order and applies the best improving move for
+    each, until a full sweep finds no improvement or `max_moves` moves were
+    made. Links are never emptied.
+
+    Args:
+        objective: "total" (sum of link capacities) or "peak" (largest link)
+
+    Returns:
+        (link_mapping, history) where history lists the applied moves as
+        dicts(cell, src, dst, objective)
+    """
+    engine = WhatIfEngine(slot_throughput, link_mapping, buffer_slots, percentile)
+    rng = np.random.default_rng(seed)
+
+    history = []
+    improved = True
+
+    while improved and len(history) < max_moves:
+        improved = False
+
+        for cell in rng.permutation(engine.cells):
+            src = engine.assignment[cell]
+            if engine.link_size[src] <= 1:
+                continue
+
+            best_dst, best_delta = None, -1e-9
+            for dst, delta in engine.move_deltas(cell, objective).items():
+                if max_cells_per_link and engine.link_size[dst] >= max_cells_per_link:
+                    continue
+
+                if delta < best_delta:
+                    best_dst, best_delta = dst, delta
+
+            if best_dst is not None:
+                engine.apply_move(cell, best_dst)
+                history.append({
+                    "cell": cell,
+                    "src": src,
+                    "dst": best_dst,
+                    "objective": engine.objective(objective)
+                })
+                improved = True
+
+                if len(history) >= max_moves:
+                    break
+
+    return engine.link_mapping(), history
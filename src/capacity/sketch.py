@@ -0,0 +1,103 @@
+
+"""
+Mergeable Quantile Sketch
+=========================
+
+Log-bucket quantile sketch in the style of DDSketch: a value x > 0 falls in
+bucket ceil(log_gamma(x)) with gamma = (1 + a) / (1 - a), so every quantile
+comes back within relative error `a` of the true sample value. Sketches of
+disjoint chunks of a series merge by adding bucket counts, which is what
+lets capacity percentiles be computed per time shard (pipeline.sharding).
+
+Values <= 0 (idle slots) are counted in a separate zero bucket.
+"""
+
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    Args:
+        relative_accuracy (float): Target relative error of quantiles.
+    """
+
+    def __init__(self, relative_accuracy=0.005):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+
+        self.offset = 0
+        self.bins = np.zeros(0, dtype=np.int64)
+        self.zero_count = 0
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def add(self, values):
+        v = np.asarray(values, dtype=np.float64).ravel()
+        v = v[~np.isnan(v)]
+        if v.size == 0:
+            return self
+
+        self.count += v.size
+        self.min = min(self.min, v.min())
+        self.max = max(self.max, v.max())
+
+        positive = v[v > 0]
+        self.zero_count += v.size - positive.size
+
+        if positive.size:
+            idx = np.ceil(np.log(positive) / self._log_gamma).astype(np.int64)
+            lo = idx.min()
+            self._add_bins(lo, np.bincount(idx - lo))
+
+        return self
+
+    def _add_bins(self, offset, counts):
+        if self.bins.size == 0:
+            self.offset, self.bins = offset, counts.astype(np.int64)
+            return
+
+        lo = min(self.offset, offset)
+        hi = max(self.offset + self.bins.size, offset + counts.size)
+        merged = np.zeros(hi - lo, dtype=np.int64)
+        merged[self.offset - lo:self.offset - lo + self.bins.size] += self.bins
+        merged[offset - lo:offset - lo + counts.size] += counts
+
+        self.offset, self.bins = lo, merged
+
+    def merge(self, other):
+        """
+        Folds another sketch (same accuracy) into this one.
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+
+        if other.bins.size:
+            self._add_bins(other.offset, other.bins)
+
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+        return self
+
+    def quantile(self, percentile):
+        """
+        Value at `percentile` (0-100), same rank convention as np.percentile.
+        """
+        if self.count == 0:
+            return float("nan")
+
+        rank = (self.count - 1) * percentile / 100
+        if rank < self.zero_count:
+            return min(0.0, self.max)
+
+        cumulative = np.cumsum(self.bins)
+        i = int(np.searchsorted(cumulative, rank - self.zero_count, side="right"))
+        i = min(i, self.bins.size - 1)
+
+        value = 2 * self.gamma ** (self.offset + i) / (self.gamma + 1)
+
+        return float(np.clip(value, self.min, self.max))
@@ -0,0 +1,45 @@
+"""
+Capacity Statistics
+===================
+
+Array helpers shared by the capacity modules (what-if optimizer,
+hierarchical aggregation): a partial-sort percentile and a row-wise
+trailing mean, matching np.percentile and pandas rolling(...).mean().
+"""
+
+import numpy as np
+
+
+def fast_percentile(values, percentile):
+    """
+    np.percentile (linear interpolation) via a partial sort.
+
+    Returns:
+        float; NaN for an empty series
+    """
+    if len(values) == 0:
+        return float("nan")
+
+    k = (len(values) - 1) * percentile / 100
+    lo, hi = int(np.floor(k)), int(np.ceil(k))
+
+    # A single-kth partition is much cheaper than partitioning on [lo, hi];
+    # the lo-th value is then the largest element left of hi
+    part = np.partition(values, hi)
+    upper = part[hi]
+    lower = part[:hi].max() if lo < hi else upper
+
+    return lower + (upper - lower) * (k - lo)
+
+
+def rolling_mean(matrix, window):
+    """
+    Row-wise trailing mean, same as rolling(window, min_periods=1).mean().
+    """
+    csum = np.cumsum(matrix, axis=1)
+    shifted = np.zeros_like(csum)
+    shifted[:, window:] = csum[:, :-window]
+
+    counts = np.minimum(np.arange(1, matrix.shape[1] + 1), window)
+
+    return (csum - shifted) / counts
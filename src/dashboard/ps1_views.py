@@ -1,32 +1,96 @@
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-import networkx as nx
 import pandas as pd
-from simulation.animator import prepare_animation_frames
 
 
 # -------------------------
 # PS1: Correlation Heatmap
 # -------------------------
-def show_correlation_heatmap(corr_matrix: pd.DataFrame):
+def _link_outlines(fig, blocks):
+    # One square per inferred link on the diagonal
+    for _, a, b in blocks:
+        fig.add_shape(type="rect", x0=a - 0.5, x1=b - 0.5, y0=a - 0.5, y1=b - 0.5,
+                      line=dict(color="black", width=1))
+
+
+def show_correlation_heatmap(corr_matrix: pd.DataFrame, link_mapping=None):
     st.subheader("📊 Congestion Correlation Heatmap")
 
+    from visualization.heatmaps import MAX_PIXELS, downsample, ordered_matrix, tile
+
+    # Cells grouped by inferred link, so links show up as diagonal blocks
+    ordered, blocks = ordered_matrix(corr_matrix, link_mapping)
+    n = len(ordered)
+
+    if n <= MAX_PIXELS:
+        fig = px.imshow(
+            ordered.to_numpy(),
+            x=list(ordered.columns),
+            y=list(ordered.index),
+            color_continuous_scale="RdBu",
+            zmin=-1,
+            zmax=1,
+            aspect="auto",
+            labels=dict(color="Correlation")
+        )
+        _link_outlines(fig, blocks)
+        fig.update_layout(
+            height=600,
+            title="Cell-to-Cell Congestion Correlation",
+            title_x=0.5
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        return
+
+    # Overview: block-averaged raster, size independent of n
+    raster, r_edges, c_edges = downsample(ordered.to_numpy(), MAX_PIXELS)
+    fig = go.Figure(go.Heatmap(
+        z=raster,
+        x=(c_edges[:-1] + c_edges[1:] - 1) / 2,
+        y=(r_edges[:-1] + r_edges[1:] - 1) / 2,
+        colorscale="RdBu",
+        zmin=-1,
+        zmax=1,
+        colorbar=dict(title="Correlation"),
+        hovertemplate="cells ~%{y:.0f} × ~%{x:.0f}<br>mean corr %{z:.2f}<extra></extra>"
+    ))
+    _link_outlines(fig, blocks)
+    fig.update_layout(
+        height=600,
+        title=f"Cell-to-Cell Congestion Correlation ({n} cells, {len(raster)}² block means)",
+        title_x=0.5,
+        yaxis=dict(autorange="reversed")
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Zoom: full resolution only for the selected tile
+    st.markdown("**🔍 Zoomed tile (full resolution)**")
+    targets = ["Custom range"] + [link for link, _, _ in blocks]
+    target = st.selectbox("Zoom to", targets)
+    if target == "Custom range":
+        rows = st.slider("Rows (cell index)", 0, n, (0, min(n, MAX_PIXELS // 2)))
+        cols = st.slider("Columns (cell index)", 0, n, rows)
+    else:
+        _, a, b = next(block for block in blocks if block[0] == target)
+        rows = cols = (a, b)
+
+    # Clamp the tile to the screen budget
+    rows = (rows[0], min(rows[1], rows[0] + MAX_PIXELS))
+    cols = (cols[0], min(cols[1], cols[0] + MAX_PIXELS))
+
+    zoom = tile(ordered, rows, cols)
     fig = px.imshow(
-        corr_matrix,
+        zoom.to_numpy(),
+        x=list(zoom.columns),
+        y=list(zoom.index),
         color_continuous_scale="RdBu",
         zmin=-1,
         zmax=1,
         aspect="auto",
         labels=dict(color="Correlation")
     )
-
-    fig.update_layout(
-        height=600,
-        title="Cell-to-Cell Congestion Correlation",
-        title_x=0.5
-    )
-
+    fig.update_layout(height=500)
     st.plotly_chart(fig, use_container_width=True)
 
 
@@ -37,17 +101,11 @@ def show_topology_graph(link_mapping):
     st.subheader("🕸️ Inferred Fronthaul Topology (Hub-and-Spoke)")
     st.markdown("Each **Link** acts as a central hub for its connected **Cells**.")
 
-    G = nx.Graph()
+    from visualization.topology_graph import build_hub_spoke_graph, hub_spoke_layout
 
-    # Build Hub-and-Spoke Graph
-    for link, cells in link_mapping.items():
-        G.add_node(link, type="link")  # Hub
-        for cell in cells:
-            G.add_node(cell, type="cell")  # Spoke
-            G.add_edge(link, cell)
-
-    # Use spring layout for aesthetics, but we could enforce star shape if needed
-    pos = nx.spring_layout(G, seed=42, k=0.3)
+    # Cached per link mapping, shared with the simulator
+    G = build_hub_spoke_graph(link_mapping)
+    pos = hub_spoke_layout(link_mapping)
 
     node_x, node_y, node_color, node_text, node_size = [], [], [], [], []
     
@@ -142,8 +200,17 @@ def show_network_animation(link_mapping, packet_data, throughput_data=None):
     st.subheader("🎥 Network Congestion Simulation")
     st.markdown("Visualizing traffic flow and congestion over time.")
     
-    with st.spinner("Preparing animation frames... this may take a moment"):
-        df_anim = prepare_animation_frames(link_mapping, packet_data, throughput_data, steps=100)
+    from simulation.animator import prepare_animation_frames
+
+    col1, col2 = st.columns(2)
+    with col1:
+        steps = st.slider("Frames", 100, 5000, 500, 100)
+    with col2:
+        bucket = st.select_slider("Slots per frame (max congestion)", [1, 2, 5, 10, 20, 50, 100], 1)
+
+    with st.spinner("Preparing animation frames..."):
+        df_anim = prepare_animation_frames(link_mapping, packet_data, throughput_data,
+                                           steps=steps, bucket=bucket)
 
     if df_anim.empty:
         st.warning("No data available for animation.")
@@ -183,6 +250,97 @@ def show_network_animation(link_mapping, packet_data, throughput_data=None):
     st.plotly_chart(fig, use_container_width=True)
 
 
+# -------------------------
+# Congestion Incidents
+# -------------------------
+INCIDENT_WINDOWS = {
+    "Whole run": None,
+    "Last hour": 3600,
+    "Last minute": 60,
+    "Last 10 s": 10,
+}
+
+
+def show_congestion_episodes(index):
+    """
+    Args:
+        index (EpisodeIndex): interval index over congestion episodes
+    """
+    st.subheader("🚨 Congestion Incidents")
+
+    if index is None or len(index) == 0:
+        st.info("No congestion episodes recorded.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        k = st.slider("Incidents", 10, 200, 50, 10)
+    with col2:
+        window = st.selectbox("Window", list(INCIDENT_WINDOWS))
+    with col3:
+        scope = st.radio("Scope", ["Links", "Cells", "All"], horizontal=True)
+    scope = {"Links": "link", "Cells": "cell", "All": None}[scope]
+
+    duration = INCIDENT_WINDOWS[window]
+    if duration is None:
+        top = index.top(k, scope=scope)
+    else:
+        top = index.recent(duration, k=k, scope=scope)
+
+    table = top.assign(cells=top["cells"].map(", ".join))
+    st.dataframe(table, use_container_width=True, hide_index=True)
+
+    slot = st.number_input(
+        "What was congested at slot (s)?",
+        min_value=index.start, max_value=index.end, value=index.start,
+        step=0.0005, format="%.5f"
+    )
+    active = index.at(slot)
+    st.markdown(
+        f"**{len(active[active['scope'] == 'cell'])} cells** and "
+        f"**{len(active[active['scope'] == 'link'])} links** in an episode at {slot:.5f}s"
+    )
+    st.dataframe(active.assign(cells=active["cells"].map(", ".join)),
+                 use_container_width=True, hide_index=True)
+
+
+# -------------------------
+# Traffic Explorer
+# -------------------------
+def show_traffic_explorer(pyramids, pixels=1200):
+    """
+    Args:
+        pyramids (dict): series name -> TimePyramid (links first)
+    """
+    st.subheader("📈 Traffic Explorer")
+
+    if not pyramids:
+        st.info("No throughput available.")
+        return
+
+    from preprocessing.symbol_to_slot import SLOT_DURATION_SEC
+    from visualization.traffic_plots import plot_traffic_window
+
+    name = st.selectbox("Series", list(pyramids))
+    pyramid = pyramids[name]
+
+    t0 = pyramid.start * SLOT_DURATION_SEC
+    t1 = pyramid.end * SLOT_DURATION_SEC
+    start, end = st.slider(
+        "Window (s)", t0, t1, (t0, t1), step=SLOT_DURATION_SEC, format="%.4f"
+    )
+
+    fig, level = plot_traffic_window(
+        pyramid,
+        int(round(start / SLOT_DURATION_SEC)),
+        int(round(end / SLOT_DURATION_SEC)),
+        pixels=pixels,
+        title=f"{name} throughput"
+    )
+    st.caption(f"Resolution: {level} buckets")
+    st.plotly_chart(fig, use_container_width=True)
+
+
 # -------------------------
 # PS1: Link Mapping Table
 # -------------------------
@@ -0,0 +1,105 @@
+
+"""
+Hidden Demand Reconstruction
+============================
+
+Slot throughput only shows the traffic that made it through the fronthaul.
+Packets that were dropped on a congested link were still offered by the
+cell. This module adds that hidden part back so capacity can be sized on
+offered load instead of carried load.
+
+Per cell and slot:
+    lost     = txPackets - rxPackets
+    offered  = carried_bytes + lost * bytes_per_packet[cell]
+
+Packets that arrived too late were still carried by the link, so their
+bytes are already in carried_bytes; tooLateRxPackets is not used here.
+Offered load is capped at txPackets * bytes_per_packet (but never below
+carried_bytes).
+
+bytes_per_packet is estimated per cell from slots where packets were
+received. Everything runs on the full cells x slots matrix at once.
+"""
+
+import numpy as np
+import pandas as pd
+
+from preprocessing.normalize import slot_matrix
+
+
+COUNTER_COLUMNS = ["tx_packets", "rx_packets", "too_late_packets"]
+
+# Counters that enter the offered load
+OFFERED_COLUMNS = ["tx_packets", "rx_packets"]
+
+
+def shift_rows(df, lag):
+    """
+    Applies an align_packet_loss lag to a cell's counter rows.
+
+    The lag counts packet-stats rows (not slots), so the counters are
+    shifted row-wise before they are placed on the slot grid. Vacated rows
+    are filled with 0.
+    """
+    shifted = df.copy()
+    shifted[COUNTER_COLUMNS] = df[COUNTER_COLUMNS].shift(-lag, fill_value=0)
+
+    return shifted
+
+
+def offered_load_matrix(slot_throughput, packet_counters, lags=None):
+    """
+    Reconstructs offered per-slot load for every cell.
+
+    Args:
+        slot_throughput: dict[cell_id] -> DataFrame(slot, throughput) in bytes
+        packet_counters: dict[cell_id] -> DataFrame(slot, tx_packets,
+                         rx_packets, too_late_packets), see load_packet_counters
+        lags: optional dict[cell_id] -> lag from align_packet_loss (rows)
+
+    Returns:
+        (offered[cells x slots], carried[cells x slots], slots, cells)
+    """
+    cells = sorted(set(slot_throughput) & set(packet_counters))
+
+    carried, slots, _ = slot_matrix(slot_throughput, "throughput", cells=cells)
+
+    if lags:
+        packet_counters = {
+            c: shift_rows(packet_counters[c], lags[c]) if lags.get(c) else packet_counters[c]
+            for c in cells
+        }
+
+    tx, rx = (
+        slot_matrix(packet_counters, col, cells=cells, slots=slots)[0]
+        for col in OFFERED_COLUMNS
+    )
+    lost = np.clip(tx - rx, 0, None)
+
+    # Bytes per received packet (on time or late), per cell
+    received = np.where(rx > 0, carried, 0).sum(axis=1)
+    bytes_per_packet = (received / np.maximum(rx.sum(axis=1), 1))[:, None]
+
+    offered = carried + lost * bytes_per_packet
+    # Never more than what was sent, never less than what got through
+    offered = np.minimum(offered, np.maximum(tx * bytes_per_packet, carried))
+
+    return offered, carried, slots, cells
+
+
+def reconstruct_offered_load(slot_throughput, packet_counters, lags=None):
+    """
+    Offered load in the same layout as the slot throughput input, so it can
+    be passed straight to aggregate_link_throughput.
+
+    Returns:
+        dict[cell_id] -> DataFrame(slot, throughput)
+    """
+    offered, _, slots, cells = offered_load_matrix(
+        slot_throughput, packet_counters, lags
+    )
+
+    return {
+        cell: pd.DataFrame({"slot": slots, "throughput": offered[row]})
+        for row, cell in enumerate(cells)
+    }
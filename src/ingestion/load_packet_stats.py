@@ -2,6 +2,8 @@ import os
 import re
 import pandas as pd
 
+from preprocessing.symbol_to_slot import time_to_slot
+
 def load_packet_stats(directory: str):
     packet_data = {}
 
@@ -30,3 +32,64 @@ def load_packet_stats(directory: str):
         packet_data[cell_id] = df.reset_index(drop=True)
 
     return packet_data
+
+
+def load_packet_tables(directory: str):
+    """
+    Parses each packet stats file once into both packet tables.
+
+    Rows hold four fields, as in real captures (data/raw/packet_stats),
+    whatever the header line lists:
+        <slotStart> <txPackets> <rxPackets> <tooLateRxPackets>
+
+    Returns:
+        (packet_data, counters):
+        packet_data: dict[cell_id] -> DataFrame(slot, packet_loss), the
+            load_packet_stats layout with slot in seconds and
+            packet_loss = txPackets - rxPackets (packets dropped)
+        counters: dict[cell_id] -> DataFrame(slot, tx_packets, rx_packets,
+            too_late_packets) where slot is the integer slot index of
+            slotStart (see time_to_slot)
+    """
+    packet_data, counters = {}, {}
+
+    for file in os.listdir(directory):
+        if not file.endswith(".dat"):
+            continue
+
+        match = re.search(r"cell[-_]?(\d+)", file, re.IGNORECASE)
+        if not match:
+            print(f"[WARN] Could not extract cell id from {file}")
+            continue
+
+        cell_id = f"cell-{match.group(1)}"
+        file_path = os.path.join(directory, file)
+
+        # The "<slot> <slotStart> ..." header line is skipped as a comment
+        raw = pd.read_csv(file_path, sep=r"\s+", header=None, comment="<")
+        raw = raw[[0, 1, 2, 3]].apply(pd.to_numeric, errors="coerce")
+        raw.columns = ["time", "tx_packets", "rx_packets", "too_late_packets"]
+
+        lost = (raw["tx_packets"] - raw["rx_packets"]).fillna(0).clip(lower=0)
+        packets = pd.DataFrame({"slot": raw["time"], "packet_loss": lost})
+        packet_data[cell_id] = packets.reset_index(drop=True)
+
+        df = raw.dropna(subset=["time"]).fillna(0)
+        df.insert(0, "slot", time_to_slot(df.pop("time")))
+        counters[cell_id] = df.reset_index(drop=True)
+
+    return packet_data, counters
+
+
+def load_packet_counters(directory: str):
+    """
+    Loads the full per-slot packet counters.
+
+    load_packet_stats only keeps the first counter; hidden-demand
+    reconstruction needs all of them.
+
+    Returns:
+        dict[cell_id] -> DataFrame(slot, tx_packets, rx_packets, too_late_packets)
+        (see load_packet_tables)
+    """
+    return load_packet_tables(directory)[1]
@@ -1,7 +1,10 @@
 import os
 import re
+import numpy as np
 import pandas as pd
 
+from preprocessing.symbol_to_slot import time_to_slot
+
 def load_throughput_data(directory: str):
     throughput_data = {}
 
@@ -28,3 +31,85 @@ def load_throughput_data(directory: str):
         throughput_data[cell_id] = df.reset_index(drop=True)
 
     return throughput_data
+
+
+def load_slot_throughput(directory: str, chunksize=1_000_000):
+    """
+    Loads throughput files straight to slot level.
+
+    Fused version of load_throughput_data + convert_to_slot_level: symbol
+    rows are streamed in chunks, mapped to integer slot indices and summed
+    with np.bincount, so the symbol-level table is never materialised.
+
+    Returns:
+        dict[cell_id] -> DataFrame(slot, throughput)
+        (same layout as convert_to_slot_level)
+    """
+    throughput_data = {}
+
+    for file in os.listdir(directory):
+        if not file.endswith(".dat"):
+            continue
+
+        match = re.search(r"cell[-_]?(\d+)", file, re.IGNORECASE)
+        if not match:
+            print(f"[WARN] Could not extract cell id from {file}")
+            continue
+
+        cell_id = f"cell-{match.group(1)}"
+        file_path = os.path.join(directory, file)
+
+        throughput_data[cell_id] = _accumulate_slot_bytes(file_path, chunksize)
+
+    return throughput_data
+
+
+def _accumulate_slot_bytes(file_path, chunksize):
+    """
+    Scatter-adds symbol bytes into a growing per-slot accumulator.
+
+    The accumulator starts at the first slot seen (`base`), so its size
+    follows the trace length rather than the absolute timestamps.
+    """
+    totals = np.zeros(0, dtype=np.float64)
+    counts = np.zeros(0, dtype=np.int64)
+    base = None
+
+    reader = pd.read_csv(file_path, sep=r"\s+", header=None, chunksize=chunksize)
+
+    for chunk in reader:
+        time = pd.to_numeric(chunk.iloc[:, 0], errors="coerce").to_numpy()
+        nbytes = pd.to_numeric(chunk.iloc[:, -1], errors="coerce").fillna(0).to_numpy()
+
+        # Rows without a time are dropped
+        valid = np.isfinite(time)
+        slot = time_to_slot(time[valid])
+        nbytes = nbytes[valid]
+
+        if slot.size == 0:
+            continue
+
+        low = int(slot.min())
+        if base is None:
+            base = low
+        elif low < base:
+            # Chunk reaching back before the first one: grow to the left
+            totals = np.pad(totals, (base - low, 0))
+            counts = np.pad(counts, (base - low, 0))
+            base = low
+
+        size = int(slot.max()) - base + 1
+        if size > totals.size:
+            totals = np.pad(totals, (0, size - totals.size))
+            counts = np.pad(counts, (0, size - counts.size))
+
+        totals[:size] += np.bincount(slot - base, weights=nbytes, minlength=size)
+        counts[:size] += np.bincount(slot - base, minlength=size)
+
+    # Keep only slots that actually had symbols, as groupby would
+    present = np.flatnonzero(counts)
+
+    return pd.DataFrame({
+        "slot": present + (base or 0),
+        "throughput": totals[present]
+    })
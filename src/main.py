@@ -2,55 +2,124 @@
 # FronthaulIQ Main Pipeline
 # =========================
 
-from ingestion.load_throughput import load_throughput_data
-from ingestion.load_packet_stats import load_packet_stats
-from alignment.time_shift import align_packet_loss
-
-from topology.graph_builder import build_correlation_graph
-from topology.clustering import detect_link_communities
-from topology.infer_links import infer_link_mapping
-
-from topology.congestion_events import extract_windowed_congestion_events
-from topology.correlation import (
-    build_congestion_matrix,
-    compute_correlation_matrix
-)
+import argparse
+import json
+import math
+
+# Only light modules at the top: numpy/pandas/scipy/networkx load when the
+# stage that needs them runs, so quick operations start instantly
+from pipeline.stages import DEFAULT_PARAMS, build_pipeline
+from outputs.bundle import read_link_mapping
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="FronthaulIQ PS1/PS2 pipeline")
+    parser.add_argument("--throughput-dir", default=DEFAULT_PARAMS["throughput_dir"])
+    parser.add_argument("--packet-dir", default=DEFAULT_PARAMS["packet_dir"])
+    parser.add_argument("--threshold", type=float, default=DEFAULT_PARAMS["threshold"],
+                        help="Correlation threshold for graph edges")
+    parser.add_argument("--max-links", type=int, default=DEFAULT_PARAMS["max_links"])
+    parser.add_argument("--cache-dir", default="data/cache",
+                        help="Artifact cache directory")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Recompute every stage without touching the cache")
+    parser.add_argument("--bundle-dir", default="data/processed/bundle",
+                        help="Where to write the dashboard results bundle")
+    parser.add_argument("--no-bundle", action="store_true",
+                        help="Skip writing the results bundle")
+    parser.add_argument("--profile", action="store_true",
+                        help="Record per-stage time, CPU and memory")
+    parser.add_argument("--profile-output", default="data/processed/profile.json",
+                        help="JSON report written when --profile is set")
+    parser.add_argument("--truth", default=None,
+                        help="Ground-truth link mapping (topology_truth.json) to score against")
+    parser.add_argument("--export-dir", default=None,
+                        help="Also export results as Parquet/Arrow/CSV tables here")
+    parser.add_argument("--export-format", default="auto",
+                        choices=["auto", "parquet", "arrow", "csv"],
+                        help="auto = Parquet if pyarrow is installed, else CSV")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="Split the slot timeline into this many shards for "
+                             "correlation and capacity (run in parallel)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes for --shards (default: CPU count)")
+    parser.add_argument("--low-memory", action="store_true",
+                        help="Produce everything in one pipeline run, releasing "
+                             "intermediates and skipping defensive copies")
+    parser.add_argument("--compact-dtypes", action="store_true",
+                        help="Store series as float32/uint16/uint8")
+    parser.add_argument("--top-incidents", type=int, default=0,
+                        help="Print the N largest congestion episodes")
+    parser.add_argument("--incident-window", type=float, default=None,
+                        help="Only rank episodes from the last SECONDS of data")
+    parser.add_argument("--show-topology", action="store_true",
+                        help="Print the topology from the last results bundle and exit")
+    return parser.parse_args()
+
+
+def show_topology(bundle_dir):
+    link_mapping = read_link_mapping(bundle_dir)
+    if link_mapping is None:
+        print(f"❌ No results bundle in {bundle_dir}. Run the pipeline first.")
+        return
 
-from ps2.link_aggregation import aggregate_link_throughput
-from ps2.capacity_estimation import (
-    required_capacity_no_buffer,
-    required_capacity_with_buffer
-)
+    print("🔗 Cached Fronthaul Topology:")
+    for link, cells in link_mapping.items():
+        print(f"{link} → Cells: {cells}")
 
 
 def main():
-    print("🚀 Starting FronthaulIQ pipeline...\n")
+    args = parse_args()
 
-    # -------------------------
-    # Load raw data
-    # -------------------------
-    throughput_data = load_throughput_data("data/raw/throughput")
-    packet_data = load_packet_stats("data/raw/packet_stats")
-
-    print(f"Loaded throughput files: {len(throughput_data)}")
-    print(f"Loaded packet stat files: {len(packet_data)}\n")
+    if args.show_topology:
+        show_topology(args.bundle_dir)
+        return
 
-    # -------------------------
-    # Debug: print keys
-    # -------------------------
-    throughput_cells = sorted(throughput_data.keys())
-    packet_cells = sorted(packet_data.keys())
+    print("🚀 Starting FronthaulIQ pipeline...\n")
 
-    print("📦 Throughput cell IDs:")
-    print(throughput_cells, "\n")
+    params = {
+        **DEFAULT_PARAMS,
+        "throughput_dir": args.throughput_dir,
+        "packet_dir": args.packet_dir,
+        "threshold": args.threshold,
+        "max_links": args.max_links,
+        "compact_dtypes": args.compact_dtypes,
+    }
+    pipeline = build_pipeline(
+        None if args.no_cache else args.cache_dir, low_memory=args.low_memory
+    )
 
-    print("📦 Packet-stats cell IDs:")
-    print(packet_cells, "\n")
+    profiler = None
+    if args.profile:
+        from pipeline.profiling import StageProfiler
+
+        profiler = StageProfiler(trace_memory=True)
+        profiler.attach(pipeline)
+
+    # Low-memory mode produces every artifact main needs in a single run, so
+    # each intermediate is dropped as soon as its last reader has finished
+    prefetched = None
+    if args.low_memory and args.shards <= 1:
+        targets = ["cells", "lags", "corr_matrix", "graph", "link_mapping",
+                   "capacity", "tree_report"]
+        if args.export_dir or not args.no_bundle:
+            targets.append("throughput")
+        if not args.no_bundle:
+            targets.append("congestion_state")
+        if args.top_incidents or not args.no_bundle:
+            targets.append("episodes")
+        prefetched = pipeline.run(targets, params)
+
+    def fetch(names):
+        if prefetched is None:
+            return pipeline.run(names, params)
+        return {name: prefetched[name] for name in names}
 
     # -------------------------
-    # Find common cells
+    # Load raw data + time-shift alignment
     # -------------------------
-    common_cells = sorted(set(throughput_cells) & set(packet_cells))
+    result = fetch(["cells", "lags"])
+    common_cells, lags = result["cells"], result["lags"]
 
     if not common_cells:
         print("❌ ERROR: No matching cell IDs found.")
@@ -58,42 +127,35 @@ def main():
 
     print(f"✅ Common cells found: {len(common_cells)}\n")
 
-    # -------------------------
-    # Time-shift alignment
-    # -------------------------
-    aligned_packet_data = {}
-
-    print("⏱️  Detecting DU–RU time shift per cell...\n")
-
+    print("⏱️  DU–RU time shift per cell:\n")
     for cell in common_cells:
-        aligned_pkt, lag = align_packet_loss(
-            throughput_data[cell],
-            packet_data[cell]
-        )
-
-        aligned_packet_data[cell] = aligned_pkt
-        print(f"   {cell}: lag = {lag} slots")
+        print(f"   {cell}: lag = {lags[cell]} slots")
 
     print("\n✅ Time-shift alignment complete\n")
 
+    # Sharded mode: correlation, topology and capacity from time shards
+    sharded = None
+    if args.shards > 1:
+        from pipeline.sharding import run_sharded
+
+        print(f"🧩 Running correlation and capacity over {args.shards} time shards...\n")
+        sharded = run_sharded(pipeline, params, n_shards=args.shards, workers=args.workers)
+
     # -------------------------
     # PS1: Congestion-event correlation
     # -------------------------
     print("📊 Building congestion-event correlation matrix...\n")
 
-    event_data = {
-        cell: extract_windowed_congestion_events(
-            aligned_packet_data[cell],
-            loss_threshold=1,
-            window=5
-        )
-        for cell in common_cells
-    }
-
-    event_matrix = build_congestion_matrix(event_data)
-    corr_matrix = compute_correlation_matrix(event_matrix)
-
-    print("Event matrix shape:", event_matrix.shape)
+    if sharded is not None:
+        corr_matrix = sharded["corr_matrix"]
+        print("Event matrix shape:", (sharded["event_rows"], corr_matrix.shape[1]))
+    elif prefetched is not None:
+        corr_matrix = prefetched["corr_matrix"]
+        print("Event matrix: released after correlation (--low-memory)")
+    else:
+        result = fetch(["event_matrix", "corr_matrix"])
+        corr_matrix = result["corr_matrix"]
+        print("Event matrix shape:", result["event_matrix"].shape)
     print("\nCorrelation matrix (rounded):")
     print(corr_matrix.round(2))
 
@@ -104,56 +166,161 @@ def main():
     # -------------------------
     print("🕸️ Building correlation graph...")
 
-    G = build_correlation_graph(
-        corr_matrix,
-        threshold=0.25
-    )
+    if sharded is None:
+        result = fetch(["graph", "link_mapping"])
+        G, link_mapping = result["graph"], result["link_mapping"]
+    else:
+        G, link_mapping = sharded["graph"], sharded["link_mapping"]
 
     print(f"Graph nodes: {G.number_of_nodes()}")
     print(f"Graph edges: {G.number_of_edges()}")
 
-    communities = detect_link_communities(G, max_links=3)
-
-    if not communities:
+    if not link_mapping:
         print("❌ No communities detected. Try lowering threshold.")
         return
 
-    link_mapping = infer_link_mapping(communities)
-
     print("\n🔗 Inferred Fronthaul Topology:")
     for link, cells in link_mapping.items():
         print(f"{link} → Cells: {cells}")
 
+    if args.truth:
+        from topology.infer_links import score_link_mapping
+
+        with open(args.truth) as f:
+            score = score_link_mapping(link_mapping, json.load(f))
+        print(f"\n🎯 Topology accuracy vs ground truth: {score['accuracy']:.1%}")
+        if score["misplaced"]:
+            print(f"   Misplaced cells: {score['misplaced']}")
+
     print("\n🏁 PS1 TOPOLOGY IDENTIFICATION COMPLETE ✅")
 
-        # -------------------------
+    # -------------------------
+    # Congestion episodes
+    # -------------------------
+    def fetch_episodes():
+        if sharded is None:
+            return fetch(["episodes"])["episodes"]
+
+        from pipeline.stages import episodes
+
+        # Link episodes follow the sharded topology
+        return episodes(
+            fetch(["aligned"])["aligned"], link_mapping, params["loss_threshold"]
+        )["episodes"]
+
+    if args.top_incidents:
+        from topology.congestion_episodes import EpisodeIndex
+
+        index = EpisodeIndex(fetch_episodes())
+        if args.incident_window:
+            top = index.recent(args.incident_window, k=args.top_incidents)
+            label = f"last {args.incident_window:g}s"
+        else:
+            top = index.top(args.top_incidents)
+            label = "whole run"
+
+        print(f"\n🚨 Top {len(top)} congestion incidents ({label}, {len(index)} episodes):\n")
+        for _, ep in top.iterrows():
+            print(f"   {ep['name']:<8} {ep['start']:.5f}–{ep['end']:.5f}s  "
+                  f"peak {ep['peak_loss']:.0f}  dropped {ep['dropped']:.0f}  "
+                  f"cells {len(ep['cells'])}")
+
+    # -------------------------
     # PS2: Capacity Estimation
     # -------------------------
     print("\n📈 PS2: Estimating fronthaul link capacities...\n")
 
-    # Convert throughput to slot-level if not already
-    from preprocessing.symbol_to_slot import convert_to_slot_level
+    if sharded is None:
+        result = fetch(["capacity", "tree_report"])
+        capacity, tree_report = result["capacity"], result["tree_report"]
+    else:
+        from pipeline.stages import hierarchy
 
-    slot_throughput = {
-        cell: convert_to_slot_level(throughput_data[cell])
-        for cell in throughput_data
-    }
-
-    link_throughput = aggregate_link_throughput(
-        slot_throughput,
-        link_mapping
-    )
+        # Offered-load capacity is not sharded (hidden demand needs whole series)
+        capacity = sharded["capacity"].reindex(
+            columns=["link", "no_buffer", "with_buffer", "offered_with_buffer"]
+        )
+        tree_report = hierarchy(
+            fetch(["throughput"])["throughput"],
+            link_mapping,
+            params["buffer_slots"],
+            params["percentile"]
+        )["tree_report"]
 
     print("🔢 Required Capacity per Link:\n")
 
-    for link, df in link_throughput.items():
-        cap_no_buf = required_capacity_no_buffer(df)
-        cap_buf = required_capacity_with_buffer(df)
+    for _, row in capacity.iterrows():
+        print(f"{row['link']}:")
+        print(f"  ▸ Required capacity (no buffer): {row['no_buffer']:.2f} Gbps")
+        print(f"  ▸ Required capacity (with buffer): {row['with_buffer']:.2f} Gbps")
+        if not math.isnan(row["offered_with_buffer"]):
+            print(f"  ▸ Required capacity (offered load, with buffer): {row['offered_with_buffer']:.2f} Gbps")
+        print()
+
+    # -------------------------
+    # PS2: Multiplexing up the transport tree
+    # -------------------------
+    from capacity.aggregate import tier_multiplexing_gain
 
-        print(f"{link}:")
-        print(f"  ▸ Required capacity (no buffer): {cap_no_buf:.2f} Gbps")
-        print(f"  ▸ Required capacity (with buffer): {cap_buf:.2f} Gbps\n")
+    print("🌳 Statistical multiplexing gain per tier:\n")
+
+    for _, tier in tier_multiplexing_gain(tree_report).iterrows():
+        print(f"  ▸ {tier['tier']}: {tier['required']:.2f} Gbps "
+              f"(gain {tier['mux_gain']:.2f}x over {tier['children_sum']:.2f} Gbps)")
+
+    # -------------------------
+    # Columnar export
+    # -------------------------
+    if args.export_dir:
+        from outputs.export import export_results
+
+        if sharded is not None:
+            link_throughput = sharded["link_throughput"]
+        elif prefetched is not None:
+            from ps2.link_aggregation import iter_link_throughput
+
+            # Each link is aggregated as the writer asks for it
+            link_throughput = iter_link_throughput(fetch(["throughput"])["throughput"], link_mapping)
+        else:
+            link_throughput = fetch(["link_throughput"])["link_throughput"]
+        paths = export_results(
+            args.export_dir,
+            link_mapping,
+            corr_matrix,
+            link_throughput,
+            capacity,
+            fmt=args.export_format,
+            metadata={
+                "params": {k: params[k] for k in ("threshold", "max_links", "buffer_slots", "percentile")},
+            }
+        )
+        print("\n💾 Exported:")
+        for name, path in paths.items():
+            print(f"   {name}: {path}")
+
+    # -------------------------
+    # Results bundle for the dashboard
+    # -------------------------
+    if not args.no_bundle:
+        from outputs.bundle import input_fingerprint, write_bundle
+
+        result = fetch(["congestion_state", "throughput"])
+        write_bundle(
+            args.bundle_dir,
+            corr_matrix,
+            link_mapping,
+            result["congestion_state"],
+            result["throughput"],
+            episodes=fetch_episodes(),
+            inputs=input_fingerprint(args.throughput_dir, args.packet_dir)
+        )
+        print(f"\n📦 Results bundle written to {args.bundle_dir}")
 
+    if profiler is not None:
+        profiler.write_json(args.profile_output)
+        print("\n⏱️  Stage profile:\n")
+        print(profiler.summary_table())
+        print(f"\nProfile written to {args.profile_output}")
 
 
 if __name__ == "__main__":
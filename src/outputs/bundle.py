@@ -0,0 +1,328 @@
+
+"""
+Results Bundle
+==============
+
+A compact, versioned directory of pipeline results that the dashboard can
+open without re-running anything. Each write goes to a new version
+directory and then atomically swaps a pointer file, so readers see either
+the old bundle or the new one, never a partial one:
+
+    bundle/CURRENT         name of the live version directory
+    bundle/v-<ns>-<pid>/   one bundle version:
+
+    manifest.json          format version, cell/link lists, array shapes,
+                           fingerprint of the raw inputs
+    link_mapping.json      link -> cells
+    corr_matrix.npy        float32 [cells x cells]
+    congestion_state.npy   int8    [slots x cells]
+    congestion_slots.npy   slot index of congestion_state rows
+    slot_throughput.npy    float32 [cells x slots] (BYTES per slot)
+    throughput_slots.npy   slot index of slot_throughput columns
+    episode_*.npy          congestion episodes, one array per column
+                           (optional; names/cells index manifest
+                           "episode_names", cells as CSR ptr + indices,
+                           last data slot in "episode_data_end")
+
+Arrays are plain .npy files so they can be memory-mapped on load.
+numpy/pandas are imported inside the functions that touch arrays, so
+read_link_mapping stays a plain JSON read for quick CLI lookups.
+"""
+
+import json
+import os
+import re
+import shutil
+import time
+
+BUNDLE_FORMAT = "fronthauliq-bundle"
+BUNDLE_VERSION = 2
+
+CURRENT_FILE = "CURRENT"
+VERSION_DIR = re.compile(r"v-\d+-\d+")
+
+
+def input_fingerprint(*directories):
+    """
+    Fingerprint of the raw input directories a bundle is built from
+    (resolved paths, file names, sizes and mtimes).
+    """
+    from pipeline.dag import directory_fingerprint
+
+    return directory_fingerprint(*(os.path.realpath(d) for d in directories))
+
+
+def _current_version(bundle_dir):
+    try:
+        with open(os.path.join(bundle_dir, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def resolve_bundle(bundle_dir):
+    """
+    Directory holding the live bundle version, or None if there is none.
+    """
+    version = _current_version(bundle_dir)
+    return os.path.join(bundle_dir, version) if version else None
+
+
+def write_bundle(bundle_dir, corr_matrix, link_mapping, congestion_state,
+                 slot_throughput, episodes=None, inputs=None):
+    """
+    Writes a new bundle version and atomically makes it the live one.
+
+    Args:
+        corr_matrix: DataFrame[cell x cell]
+        link_mapping: dict[link] -> list of cells
+        congestion_state: DataFrame[slot x cell] of congestion levels
+        slot_throughput: dict[cell] -> DataFrame(slot, throughput)
+        episodes: DataFrame of congestion episodes (extract_episodes)
+        inputs: input_fingerprint of the raw data, checked by load_bundle
+    """
+    import numpy as np
+    from preprocessing.normalize import slot_matrix
+
+    version = f"v-{time.time_ns()}-{os.getpid()}"
+    version_dir = os.path.join(bundle_dir, version)
+    os.makedirs(version_dir)
+
+    tp_cells = sorted(slot_throughput)
+    tp_matrix, tp_slots, _ = slot_matrix(
+        slot_throughput, "throughput", cells=tp_cells, dtype=np.float32
+    )
+
+    arrays = {
+        "corr_matrix": corr_matrix.to_numpy(dtype=np.float32),
+        "congestion_state": congestion_state.to_numpy(dtype=np.int8),
+        "congestion_slots": congestion_state.index.to_numpy(dtype=np.float64),
+        "slot_throughput": tp_matrix,
+        "throughput_slots": tp_slots,
+    }
+    episode_names, episode_data_end = [], None
+    if episodes is not None:
+        episode_data_end = episodes.attrs.get("data_end")
+        episode_arrays, episode_names = _episode_arrays(episodes)
+        arrays.update(episode_arrays)
+
+    for name, arr in arrays.items():
+        np.save(os.path.join(version_dir, f"{name}.npy"), np.ascontiguousarray(arr))
+
+    with open(os.path.join(version_dir, "link_mapping.json"), "w") as f:
+        json.dump(link_mapping, f, indent=2)
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "inputs": inputs,
+        "corr_cells": list(corr_matrix.columns),
+        "congestion_cells": list(congestion_state.columns),
+        "throughput_cells": tp_cells,
+        "episode_names": episode_names,
+        "episode_data_end": episode_data_end,
+        "shapes": {name: list(arr.shape) for name, arr in arrays.items()},
+    }
+    with open(os.path.join(version_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Atomic swap: readers resolve CURRENT to either the old or the new version
+    previous = _current_version(bundle_dir)
+    pointer_tmp = os.path.join(bundle_dir, f"{CURRENT_FILE}.{os.getpid()}.tmp")
+    with open(pointer_tmp, "w") as f:
+        f.write(version)
+    os.replace(pointer_tmp, os.path.join(bundle_dir, CURRENT_FILE))
+
+    # Older versions go; the previous one stays for readers that resolved
+    # CURRENT just before the swap
+    for entry in os.listdir(bundle_dir):
+        if VERSION_DIR.fullmatch(entry) and entry not in (version, previous):
+            shutil.rmtree(os.path.join(bundle_dir, entry), ignore_errors=True)
+
+    _remove_flat_bundle(bundle_dir)
+
+    return version_dir
+
+
+def _remove_flat_bundle(bundle_dir):
+    """
+    Deletes the files of an unversioned (version 1) bundle written straight
+    into bundle_dir: only the files its own manifest lists, nothing else.
+    """
+    manifest_path = os.path.join(bundle_dir, "manifest.json")
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return
+
+    if not isinstance(manifest, dict) or manifest.get("format") != BUNDLE_FORMAT:
+        return
+
+    names = [f"{name}.npy" for name in manifest.get("shapes", {})]
+    for name in names + ["link_mapping.json", "manifest.json"]:
+        try:
+            os.remove(os.path.join(bundle_dir, name))
+        except FileNotFoundError:
+            pass
+
+
+def _episode_arrays(episodes):
+    """
+    Column arrays of an episodes frame; names and member cells become
+    indices into one shared name list.
+    """
+    import numpy as np
+
+    names = sorted(set(episodes["name"]) | {c for cells in episodes["cells"] for c in cells})
+    code = {name: i for i, name in enumerate(names)}
+    sizes = [len(cells) for cells in episodes["cells"]]
+
+    arrays = {
+        "episode_start": episodes["start"].to_numpy(dtype=np.float64),
+        "episode_end": episodes["end"].to_numpy(dtype=np.float64),
+        "episode_peak_loss": episodes["peak_loss"].to_numpy(dtype=np.float64),
+        "episode_dropped": episodes["dropped"].to_numpy(dtype=np.float64),
+        "episode_n_slots": episodes["n_slots"].to_numpy(dtype=np.int64),
+        "episode_is_link": (episodes["scope"] == "link").to_numpy(),
+        "episode_name": np.array([code[n] for n in episodes["name"]], dtype=np.int32),
+        "episode_cells_ptr": np.r_[0, np.cumsum(sizes)].astype(np.int64),
+        "episode_cells": np.array(
+            [code[c] for cells in episodes["cells"] for c in cells], dtype=np.int32
+        ),
+    }
+
+    return arrays, names
+
+
+class ResultsBundle:
+    """
+    Read-only view of a results bundle; arrays are memory-mapped.
+    """
+
+    def __init__(self, bundle_dir, manifest, arrays, link_mapping):
+        self.bundle_dir = bundle_dir
+        self.manifest = manifest
+        self.arrays = arrays
+        self.link_mapping = link_mapping
+
+    @property
+    def corr_matrix(self):
+        import pandas as pd
+
+        cells = self.manifest["corr_cells"]
+        return pd.DataFrame(self.arrays["corr_matrix"], index=cells, columns=cells, copy=False)
+
+    @property
+    def congestion_state(self):
+        import pandas as pd
+
+        return pd.DataFrame(
+            self.arrays["congestion_state"],
+            index=pd.Index(self.arrays["congestion_slots"], name="slot"),
+            columns=pd.Index(self.manifest["congestion_cells"], name="cell_id"),
+            copy=False
+        )
+
+    @property
+    def slot_throughput(self):
+        """
+        (matrix[cells x slots], slots, cells), BYTES per slot.
+        """
+        return (
+            self.arrays["slot_throughput"],
+            self.arrays["throughput_slots"],
+            self.manifest["throughput_cells"],
+        )
+
+
+    @property
+    def episodes(self):
+        """
+        Congestion episodes DataFrame, or None for bundles written without.
+        """
+        if "episode_start" not in self.arrays:
+            return None
+
+        import numpy as np
+        import pandas as pd
+
+        a = self.arrays
+        names = np.array(self.manifest["episode_names"], dtype=object)
+        ptr, members = a["episode_cells_ptr"], names[a["episode_cells"]]
+
+        episodes = pd.DataFrame({
+            "scope": np.where(a["episode_is_link"], "link", "cell"),
+            "name": names[a["episode_name"]],
+            "start": a["episode_start"],
+            "end": a["episode_end"],
+            "peak_loss": a["episode_peak_loss"],
+            "dropped": a["episode_dropped"],
+            "n_slots": a["episode_n_slots"],
+            "cells": [tuple(members[ptr[i]:ptr[i + 1]]) for i in range(len(ptr) - 1)],
+        })
+        if self.manifest.get("episode_data_end") is not None:
+            episodes.attrs["data_end"] = self.manifest["episode_data_end"]
+
+        return episodes
+
+
+def read_link_mapping(bundle_dir):
+    """
+    Reads only the topology of a bundle, without loading any arrays.
+
+    Returns:
+        dict[link] -> list of cells, or None if there is no bundle
+    """
+    version_dir = resolve_bundle(bundle_dir)
+    if version_dir is None:
+        return None
+
+    path = os.path.join(version_dir, "link_mapping.json")
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_bundle(bundle_dir, inputs=None):
+    """
+    Opens the live bundle written by write_bundle.
+
+    Args:
+        inputs: input_fingerprint of the raw data the caller expects; a
+            bundle built from different inputs is rejected as stale
+
+    Returns:
+        ResultsBundle, or None if there is no bundle, it was written by an
+        incompatible version, or it is stale.
+    """
+    version_dir = resolve_bundle(bundle_dir)
+    manifest_path = os.path.join(version_dir or bundle_dir, "manifest.json")
+    if version_dir is None or not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    if manifest.get("format") != BUNDLE_FORMAT or manifest.get("version") != BUNDLE_VERSION:
+        print(f"[WARN] Ignoring bundle {bundle_dir}: unsupported version")
+        return None
+
+    if inputs is not None and manifest.get("inputs") != inputs:
+        print(f"[WARN] Ignoring bundle {bundle_dir}: raw data changed since it was written")
+        return None
+
+    import numpy as np
+
+    arrays = {
+        name: np.load(os.path.join(version_dir, f"{name}.npy"), mmap_mode="r")
+        for name in manifest["shapes"]
+    }
+
+    with open(os.path.join(version_dir, "link_mapping.json")) as f:
+        link_mapping = json.load(f)
+
+    return ResultsBundle(version_dir, manifest, arrays, link_mapping)
@@ -0,0 +1,275 @@
+
+"""
+Columnar Export
+===============
+
+Writes pipeline results as self-describing files for downstream tools:
+
+    link_mapping.<ext>      link, cell
+    corr_matrix.<ext>       cell_a, cell_b, correlation
+    link_throughput.<ext>   link, slot, throughput_gbps   (streamed per link)
+    capacity.<ext>          link, *_gbps
+
+Formats: Parquet or Arrow IPC (pyarrow, optional) with the declared
+schema and metadata embedded in the file, or CSV with the same
+information in a `<file>.schema.json` sidecar. Large tables are written
+one row group at a time, and readers can pull one link's rows without
+loading the rest (see read_table).
+
+link_throughput can be a dict or an iterable of (link, frame) pairs. With
+a producer such as ps2.link_aggregation.iter_link_throughput each link's
+series is aggregated, written and released before the next one is built.
+With a dict, the series already sit in memory and only the write is
+incremental.
+
+    paths = export_results("data/processed/export", link_mapping, corr_matrix,
+                           link_throughput, capacity, fmt="parquet")
+"""
+
+import json
+import os
+import time
+
+import pandas as pd
+
+from outputs.schemas import (
+    NUMPY_DTYPES,
+    SCHEMA_VERSION,
+    SCHEMAS,
+    arrow_schema,
+    column_names,
+)
+
+EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+DEFAULT_ROW_GROUP_SIZE = 1_000_000
+
+
+def resolve_format(fmt="auto"):
+    """
+    "auto" picks Parquet when pyarrow is installed, CSV otherwise.
+    """
+    if fmt != "auto":
+        if fmt not in EXTENSIONS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        return fmt
+
+    try:
+        import pyarrow  # noqa: F401
+        return "parquet"
+    except ImportError:
+        return "csv"
+
+
+class TableWriter:
+    """
+    Streams one declared table to disk; every write() adds row groups.
+
+    The file is written under a temporary name and moved into place on
+    close, so readers never see a half-written export.
+    """
+
+    def __init__(self, path, name, fmt="csv", metadata=None,
+                 row_group_size=DEFAULT_ROW_GROUP_SIZE):
+        self.path = path
+        self.name = name
+        self.fmt = fmt
+        self.metadata = metadata or {}
+        self.row_group_size = row_group_size
+        self.rows = 0
+
+        self._tmp_path = path + ".tmp"
+        self._columns = column_names(name)
+        self._dtypes = {col: NUMPY_DTYPES[dtype] for col, dtype in SCHEMAS[name]["columns"]}
+        self._writer = None
+        self._schema = arrow_schema(name, self.metadata) if fmt != "csv" else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._abort()
+
+    def write(self, frame):
+        """
+        Appends rows; `frame` must have the declared columns.
+        """
+        frame = frame[self._columns].astype(self._dtypes, copy=False)
+
+        for start in range(0, len(frame), self.row_group_size):
+            self._write_group(frame.iloc[start:start + self.row_group_size])
+
+        if len(frame) == 0 and self._writer is None:
+            self._open()
+
+    def _open(self):
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(self._tmp_path, self._schema)
+        elif self.fmt == "arrow":
+            import pyarrow as pa
+            self._writer = pa.ipc.new_file(self._tmp_path, self._schema)
+        else:
+            self._writer = open(self._tmp_path, "w", newline="")
+            self._writer.write(",".join(self._columns) + "\n")
+
+    def _write_group(self, chunk):
+        if self._writer is None:
+            self._open()
+
+        if self.fmt == "csv":
+            chunk.to_csv(self._writer, header=False, index=False)
+        else:
+            import pyarrow as pa
+            table = pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False)
+            self._writer.write_table(table)
+
+        self.rows += len(chunk)
+
+    def close(self):
+        if self._writer is None:
+            self._open()
+        self._writer.close()
+
+        if self.fmt == "csv":
+            _write_sidecar(self.path, self.name, self.metadata, self.rows)
+
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+    def _abort(self):
+        if self._writer is not None:
+            self._writer.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+def _write_sidecar(path, name, metadata, rows):
+    spec = SCHEMAS[name]
+    sidecar = {
+        "schema_name": name,
+        "schema_version": SCHEMA_VERSION,
+        "description": spec["description"],
+        "columns": [{"name": col, "type": dtype} for col, dtype in spec["columns"]],
+        "rows": rows,
+        "metadata": metadata,
+    }
+    with open(path + ".schema.json", "w") as f:
+        json.dump(sidecar, f, indent=2)
+
+
+def export_results(out_dir, link_mapping, corr_matrix, link_throughput, capacity,
+                   fmt="auto", metadata=None, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """
+    Exports the main PS1/PS2 results.
+
+    Args:
+        link_mapping: dict[link] -> list of cells
+        corr_matrix: DataFrame[cell x cell]
+        link_throughput: dict[link] -> DataFrame(slot, total_throughput) in
+            Gbps, or an iterable of (link, DataFrame) consumed lazily
+        capacity: DataFrame(link, no_buffer, with_buffer, offered_with_buffer)
+        fmt (str): "parquet", "arrow", "csv" or "auto"
+        metadata (dict): Extra run metadata stored with every file.
+
+    Returns:
+        dict[table name] -> written path
+    """
+    fmt = resolve_format(fmt)
+    os.makedirs(out_dir, exist_ok=True)
+
+    metadata = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        **(metadata or {}),
+    }
+
+    def writer(name):
+        path = os.path.join(out_dir, name + EXTENSIONS[fmt])
+        return TableWriter(path, name, fmt, metadata, row_group_size)
+
+    paths = {}
+
+    with writer("link_mapping") as w:
+        w.write(pd.DataFrame(
+            [(link, cell) for link, cells in link_mapping.items() for cell in cells],
+            columns=["link", "cell"]
+        ))
+    paths["link_mapping"] = w.path
+
+    # One block of cell_a rows per write keeps the long form bounded
+    cells = list(corr_matrix.columns)
+    block = max(1, row_group_size // max(len(cells), 1))
+    with writer("corr_matrix") as w:
+        for start in range(0, len(cells), block):
+            part = corr_matrix.iloc[start:start + block]
+            w.write(pd.DataFrame({
+                "cell_a": pd.Series(part.index).repeat(len(cells)).to_numpy(),
+                "cell_b": cells * len(part),
+                "correlation": part.to_numpy(dtype="float32").ravel(),
+            }))
+    paths["corr_matrix"] = w.path
+
+    if isinstance(link_throughput, dict):
+        link_throughput = link_throughput.items()
+
+    with writer("link_throughput") as w:
+        for link, df in link_throughput:
+            w.write(pd.DataFrame({
+                "link": link,
+                "slot": df["slot"].to_numpy(),
+                "throughput_gbps": df["total_throughput"].to_numpy(),
+            }))
+    paths["link_throughput"] = w.path
+
+    with writer("capacity") as w:
+        w.write(capacity.rename(columns={
+            "no_buffer": "no_buffer_gbps",
+            "with_buffer": "with_buffer_gbps",
+            "offered_with_buffer": "offered_with_buffer_gbps",
+        }))
+    paths["capacity"] = w.path
+
+    return paths
+
+
+def read_table(path, link=None, columns=None):
+    """
+    Reads an exported table back, optionally only the rows of one link.
+
+    Parquet filters row groups on `link`; CSV is scanned in chunks, so
+    neither loads the other links into memory at once.
+
+    Returns:
+        pd.DataFrame with the declared dtypes
+    """
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        filters = [("link", "==", link)] if link is not None else None
+        return pq.read_table(path, columns=columns, filters=filters).to_pandas()
+
+    if path.endswith(".arrow"):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+        if link is not None:
+            table = table.filter(pc.equal(table["link"], link))
+        if columns is not None:
+            table = table.select(columns)
+        return table.to_pandas()
+
+    with open(path + ".schema.json") as f:
+        sidecar = json.load(f)
+    dtypes = {c["name"]: NUMPY_DTYPES[c["type"]] for c in sidecar["columns"]}
+
+    if link is None:
+        return pd.read_csv(path, dtype=dtypes, usecols=columns)
+
+    parts = [
+        chunk[chunk["link"] == link]
+        for chunk in pd.read_csv(path, dtype=dtypes, chunksize=DEFAULT_ROW_GROUP_SIZE)
+    ]
+    df = pd.concat(parts, ignore_index=True)
+    return df[columns] if columns is not None else df
@@ -0,0 +1,85 @@
+
+"""
+Export Schemas
+==============
+
+Declared column layouts for everything outputs.export writes. Each table
+is long-format so it can be streamed in row groups and read back one link
+or one cell pair at a time.
+
+Types are Arrow type names; the CSV fallback stores the same schema in a
+sidecar file, so both formats describe themselves identically.
+"""
+
+SCHEMA_VERSION = 1
+
+SCHEMAS = {
+    "link_mapping": {
+        "description": "Inferred link -> cell assignment",
+        "columns": [
+            ("link", "string"),
+            ("cell", "string"),
+        ],
+    },
+    "corr_matrix": {
+        "description": "Pairwise congestion-event correlation",
+        "columns": [
+            ("cell_a", "string"),
+            ("cell_b", "string"),
+            ("correlation", "float32"),
+        ],
+    },
+    "link_throughput": {
+        "description": "Aggregated carried throughput per link and slot",
+        "columns": [
+            ("link", "string"),
+            ("slot", "int64"),
+            ("throughput_gbps", "float64"),
+        ],
+    },
+    "capacity": {
+        "description": "Required link capacity at the configured percentile",
+        "columns": [
+            ("link", "string"),
+            ("no_buffer_gbps", "float64"),
+            ("with_buffer_gbps", "float64"),
+            ("offered_with_buffer_gbps", "float64"),
+        ],
+    },
+}
+
+# numpy dtype used when a column is coerced before writing
+NUMPY_DTYPES = {
+    "string": object,
+    "int64": "int64",
+    "float32": "float32",
+    "float64": "float64",
+}
+
+
+def column_names(name):
+    return [col for col, _ in SCHEMAS[name]["columns"]]
+
+
+def arrow_schema(name, metadata=None):
+    """
+    Builds the pyarrow schema for a declared table.
+
+    Args:
+        name (str): Key of SCHEMAS.
+        metadata (dict): Extra key/value metadata (values are JSON-encoded).
+    """
+    import json
+    import pyarrow as pa
+
+    spec = SCHEMAS[name]
+    fields = [pa.field(col, getattr(pa, dtype)()) for col, dtype in spec["columns"]]
+
+    meta = {
+        "schema_name": name,
+        "schema_version": str(SCHEMA_VERSION),
+        "description": spec["description"],
+    }
+    meta.update({key: json.dumps(value) for key, value in (metadata or {}).items()})
+
+    return pa.schema(fields, metadata=meta)
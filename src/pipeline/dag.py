@@ -0,0 +1,276 @@
+
+"""
+Stage DAG Runner
+================
+
+A small pipeline framework with content-addressed artifact caching.
+
+Each Stage declares the artifacts it consumes and produces, and the
+parameters it depends on. A stage's cache key is the hash of its name,
+version, parameter values and the content digests of its input artifacts.
+Outputs are pickled under that key together with their own content
+digests, so a downstream stage whose inputs did not change (even if an
+upstream stage re-ran) is a cache hit as well.
+
+Cached artifacts are only unpickled when a stage that actually runs, or
+the caller, needs them. Within one Pipeline instance, results are also
+memoised in memory, so consecutive run() calls share work even with the
+disk cache disabled.
+
+A low_memory pipeline keeps no memo and drops every intermediate artifact
+as soon as the last stage of the run that reads it is done. Stages that
+declare `inplace` inputs are then called with copy=False when nothing
+later in the run reads those inputs, so they can skip defensive copies.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import time
+
+
+class Stage:
+    """
+    One pipeline step.
+
+    Args:
+        name (str): Stage name, also the cache sub-directory.
+        func (callable): Called as func(**inputs, **params); must return a
+            dict with exactly the declared outputs.
+        inputs (list[str]): Artifact names consumed.
+        outputs (list[str]): Artifact names produced.
+        params (list[str]): Parameter names the stage depends on.
+        fingerprint (callable): Optional func(**params) -> str describing
+            external state (e.g. raw files) that should invalidate the cache.
+        version (int): Bump to invalidate cached results after a code change.
+        inplace (list[str]): Inputs func may modify when called with
+            copy=False (only done by low_memory pipelines).
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), params=(),
+                 fingerprint=None, version=1, inplace=()):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = list(params)
+        self.fingerprint = fingerprint
+        self.version = version
+        self.inplace = list(inplace)
+
+
+def directory_fingerprint(*directories):
+    """
+    Cheap fingerprint of raw data directories: file names, sizes and mtimes.
+    """
+    entries = []
+    for directory in directories:
+        if not os.path.isdir(directory):
+            entries.append((directory, None))
+            continue
+        for file in sorted(os.listdir(directory)):
+            st = os.stat(os.path.join(directory, file))
+            entries.append((directory, file, st.st_size, st.st_mtime_ns))
+
+    return hashlib.sha256(repr(entries).encode()).hexdigest()
+
+
+def _digest(payload: bytes):
+    return hashlib.sha256(payload).hexdigest()
+
+
+class Pipeline:
+    """
+    Runs stages in dependency order with on-disk artifact caching.
+
+    Args:
+        stages (list[Stage]): Stage definitions (any order).
+        cache_dir (str | None): Cache root; None disables caching.
+        low_memory (bool): Release intermediates eagerly (see module doc).
+    """
+
+    def __init__(self, stages, cache_dir="data/cache", low_memory=False):
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache_dir = cache_dir
+        self.low_memory = low_memory
+        self.producer = {
+            out: stage.name for stage in stages for out in stage.outputs
+        }
+        self.last_run = []
+        self.history = []
+        self.hooks = []
+        self._memo = {}
+
+    # -------------------------
+    # Graph helpers
+    # -------------------------
+    def _order(self, targets):
+        """
+        Stages needed for the target artifacts, in topological order.
+        """
+        order, seen = [], set()
+
+        def visit(stage_name):
+            if stage_name in seen:
+                return
+            seen.add(stage_name)
+            for artifact in self.stages[stage_name].inputs:
+                if artifact not in self.producer:
+                    raise KeyError(f"No stage produces artifact '{artifact}'")
+                visit(self.producer[artifact])
+            order.append(stage_name)
+
+        for target in targets:
+            if target not in self.producer:
+                raise KeyError(f"No stage produces artifact '{target}'")
+            visit(self.producer[target])
+
+        return order
+
+    def _key(self, stage, params, digests):
+        spec = {
+            "stage": stage.name,
+            "version": stage.version,
+            "params": {p: repr(params[p]) for p in stage.params},
+            "inputs": {a: digests[a] for a in stage.inputs}
+        }
+        if stage.fingerprint is not None:
+            spec["fingerprint"] = stage.fingerprint(**{p: params[p] for p in stage.params})
+
+        return _digest(json.dumps(spec, sort_keys=True).encode())[:24]
+
+    def _paths(self, stage, key):
+        base = os.path.join(self.cache_dir, stage.name, key)
+        return base + ".pkl", base + ".json"
+
+    def add_hook(self, hook):
+        """
+        Registers hook(stage, func) -> func, used to wrap every stage that
+        actually runs (e.g. for profiling).
+        """
+        self.hooks.append(hook)
+
+    # -------------------------
+    # Execution
+    # -------------------------
+    def run(self, targets, params):
+        """
+        Produces the requested artifacts.
+
+        Args:
+            targets (list[str]): Artifact names wanted by the caller.
+            params (dict): Parameter values for all stages.
+
+        Returns:
+            dict[artifact] -> value for the requested targets.
+            self.last_run lists (stage, status, seconds) for this run;
+            self.history accumulates it over all runs.
+        """
+        digests = {}
+        values = {}
+        cached_at = {}
+        self.last_run = []
+
+        def load(artifact):
+            if artifact not in values:
+                with open(cached_at[artifact], "rb") as f:
+                    payloads = pickle.load(f)
+                if self.low_memory:
+                    values[artifact] = pickle.loads(payloads[artifact])
+                else:
+                    values.update({a: pickle.loads(p) for a, p in payloads.items()})
+            return values[artifact]
+
+        order = self._order(targets)
+
+        # Readers left per artifact, to release intermediates in low_memory mode
+        readers = {}
+        for name in order:
+            for artifact in self.stages[name].inputs:
+                readers[artifact] = readers.get(artifact, 0) + 1
+
+        def release(stage):
+            for artifact in stage.inputs:
+                readers[artifact] -= 1
+            if self.low_memory:
+                for artifact in stage.inputs + stage.outputs:
+                    if readers.get(artifact, 0) == 0 and artifact not in targets:
+                        values.pop(artifact, None)
+
+        for name in order:
+            stage = self.stages[name]
+            key = self._key(stage, params, digests)
+
+            if key in self._memo:
+                stage_digests, stage_values = self._memo[key]
+                digests.update(stage_digests)
+                values.update(stage_values)
+                self.last_run.append((name, "memo", 0.0))
+                release(stage)
+                continue
+
+            if self.cache_dir is not None:
+                pkl_path, meta_path = self._paths(stage, key)
+                if os.path.exists(pkl_path) and os.path.exists(meta_path):
+                    with open(meta_path) as f:
+                        digests.update(json.load(f))
+                    for artifact in stage.outputs:
+                        cached_at[artifact] = pkl_path
+                    self.last_run.append((name, "cached", 0.0))
+                    release(stage)
+                    continue
+
+            kwargs = {a: load(a) for a in stage.inputs}
+            kwargs.update({p: params[p] for p in stage.params})
+            if self.low_memory and stage.inplace and all(
+                readers[a] == 1 and a not in targets for a in stage.inplace
+            ):
+                kwargs["copy"] = False
+
+            start = time.perf_counter()
+            func = stage.func
+            for hook in self.hooks:
+                func = hook(stage, func)
+            outputs = func(**kwargs)
+            elapsed = time.perf_counter() - start
+
+            missing = set(stage.outputs) - set(outputs)
+            if missing:
+                raise ValueError(f"Stage '{name}' did not produce {sorted(missing)}")
+
+            payloads = {
+                a: pickle.dumps(outputs[a], protocol=pickle.HIGHEST_PROTOCOL)
+                for a in stage.outputs
+            }
+            stage_digests = {a: _digest(p) for a, p in payloads.items()}
+
+            digests.update(stage_digests)
+            values.update({a: outputs[a] for a in stage.outputs})
+            if not self.low_memory:
+                self._memo[key] = (stage_digests, {a: outputs[a] for a in stage.outputs})
+            del kwargs, outputs
+
+            if self.cache_dir is not None:
+                self._store(stage, key, payloads, stage_digests)
+            del payloads
+
+            self.last_run.append((name, "ran", elapsed))
+            release(stage)
+
+        self.history.extend(self.last_run)
+
+        return {t: load(t) for t in targets}
+
+    def _store(self, stage, key, payloads, stage_digests):
+        pkl_path, meta_path = self._paths(stage, key)
+        os.makedirs(os.path.dirname(pkl_path), exist_ok=True)
+
+        # Write-then-rename so an interrupted run never leaves a bad entry
+        with open(pkl_path + ".tmp", "wb") as f:
+            pickle.dump(payloads, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(pkl_path + ".tmp", pkl_path)
+
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(stage_digests, f)
+        os.replace(meta_path + ".tmp", meta_path)
@@ -0,0 +1,194 @@
+
+"""
+Stage Profiling
+===============
+
+Per-stage instrumentation for the pipeline runner: wall time, CPU time,
+peak RSS, traced allocation peak (optional, tracemalloc) and how many
+rows/cells each stage produced.
+
+    profiler = StageProfiler(trace_memory=True)
+    profiler.attach(pipeline)
+    pipeline.run(...)
+    profiler.write_json("profile.json")
+    print(profiler.summary_table())
+"""
+
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# numpy/pandas are imported where needed, so attaching a profiler does not
+# load them before the first stage does
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return float("nan")
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes elsewhere
+    return peak / 1024 ** 2 if platform.system() == "Darwin" else peak / 1024
+
+
+def _size(value):
+    """
+    (rows, cells) processed, as far as they can be read off an artifact.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(value, pd.DataFrame):
+        return len(value), value.shape[1]
+    if isinstance(value, np.ndarray):
+        return value.shape[0], value.shape[1] if value.ndim > 1 else 1
+    if isinstance(value, dict) and value:
+        rows = sum(len(v) for v in value.values() if isinstance(v, (pd.DataFrame, np.ndarray)))
+        return rows, len(value)
+    if hasattr(value, "number_of_nodes"):
+        return value.number_of_edges(), value.number_of_nodes()
+    return 0, 0
+
+
+class StageProfiler:
+    """
+    Collects one record per executed stage.
+
+    Args:
+        trace_memory (bool): Also track Python allocations with tracemalloc.
+            More precise than RSS, but slows allocation-heavy stages down.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.records = []
+        self._pipelines = []
+
+    def attach(self, pipeline):
+        pipeline.add_hook(self.wrap)
+        self._pipelines.append(pipeline)
+        return pipeline
+
+    def wrap(self, stage, func):
+        def profiled(**kwargs):
+            if self.trace_memory:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                tracemalloc.reset_peak()
+                traced_before = tracemalloc.get_traced_memory()[0]
+
+            rss_before = _peak_rss_mb()
+            wall = time.perf_counter()
+            cpu = time.process_time()
+
+            outputs = func(**kwargs)
+
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            rss_after = _peak_rss_mb()
+
+            rows = cells = 0
+            for value in outputs.values():
+                r, c = _size(value)
+                rows, cells = rows + r, max(cells, c)
+
+            record = {
+                "stage": stage.name,
+                "status": "ran",
+                "wall_s": wall,
+                "cpu_s": cpu,
+                "peak_rss_mb": rss_after,
+                "rss_growth_mb": rss_after - rss_before,
+                "rows": rows,
+                "cells": cells,
+            }
+            if self.trace_memory:
+                record["traced_peak_mb"] = (
+                    tracemalloc.get_traced_memory()[1] - traced_before
+                ) / 1024 ** 2
+
+            self.records.append(record)
+            return outputs
+
+        return profiled
+
+    def report(self):
+        """
+        Records for executed stages plus cache hits from attached pipelines.
+
+        Returns:
+            pd.DataFrame, one row per stage execution
+        """
+        import pandas as pd
+
+        records = list(self.records)
+        seen = {r["stage"] for r in records}
+
+        # In-memory reuse within the same process ("memo") is not reported
+        for pipeline in self._pipelines:
+            for stage, status, _ in pipeline.history:
+                if status == "cached" and stage not in seen:
+                    records.append({"stage": stage, "status": status})
+                    seen.add(stage)
+
+        report = pd.DataFrame(records)
+        for col in ("rows", "cells"):
+            if col in report.columns:
+                report[col] = report[col].astype("Int64")
+
+        return report
+
+    def write_json(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        report = self.report()
+        payload = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "trace_memory": self.trace_memory,
+            "stages": json.loads(report.to_json(orient="records")),
+        }
+        with open(path, "w") as f:
+            json.dump(payload, f, indent=2)
+
+        return path
+
+    def summary_table(self):
+        report = self.report()
+        if report.empty:
+            return "(no stages ran)"
+
+        columns = [c for c in (
+            "stage", "status", "wall_s", "cpu_s", "peak_rss_mb",
+            "rss_growth_mb", "traced_peak_mb", "rows", "cells"
+        ) if c in report.columns]
+
+        table = report[columns].astype(object).where(report[columns].notna(), "-")
+
+        return table.to_string(
+            index=False,
+            formatters={c: lambda v: v if v == "-" else f"{v:.2f}"
+                        for c in columns if c.endswith(("_s", "_mb"))}
+        )
+
+
+def load_profile(path):
+    """
+    Reads a JSON report written by StageProfiler.write_json.
+
+    Returns:
+        pd.DataFrame, or None if the file does not exist
+    """
+    if not os.path.exists(path):
+        return None
+
+    import pandas as pd
+
+    with open(path) as f:
+        return pd.DataFrame(json.load(f)["stages"])
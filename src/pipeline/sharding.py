@@ -0,0 +1,290 @@
+
+"""
+Time-Sharded Execution
+======================
+
+Runs the slot-range-heavy part of the pipeline on separate cores by
+splitting the timeline into shards:
+
+    pass 1  per shard: DU-RU shift + windowed events + correlation sums
+            merge:     n, sum(x), X^T X  ->  Pearson correlation
+    (serial) graph + community detection on the merged matrix
+    pass 2  per shard: link aggregation + capacity quantile sketches
+            merge:     add sketch buckets -> percentiles
+
+Each shard reads a halo around its core range so window operations see
+the same neighbours as in the serial run:
+
+    events:    window + max |lag| rows per cell (shift, then centred max)
+    capacity:  buffer_slots - 1 rows per cell (trailing mean)
+
+Only core rows contribute to the partial results, so merging gives the
+serial answers: correlation up to float rounding, capacity within the
+sketch's relative accuracy. Alignment lags are still detected serially
+over the full series (pipeline "lags" artifact).
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_RELATIVE_ACCURACY = 0.005
+
+
+def shard_bounds(lo, hi, n_shards):
+    """
+    Splits [lo, hi] into n_shards half-open core ranges (last one open-ended).
+
+    Returns:
+        list of (start, end)
+    """
+    edges = np.linspace(lo, hi, n_shards + 1)
+    return [
+        (edges[i] if i else -np.inf, edges[i + 1] if i < n_shards - 1 else np.inf)
+        for i in range(n_shards)
+    ]
+
+
+def _map(func, tasks, workers):
+    if workers == 1:
+        return [func(*task) for task in tasks]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, *zip(*tasks)))
+
+
+# -------------------------
+# Pass 1: events + correlation statistics
+# -------------------------
+def _event_shard(cells, loss_threshold, window):
+    """
+    Args:
+        cells: dict[cell] -> (slots, packet_loss, core_lo, core_hi, lag),
+            arrays including halo rows; core_* are positions in them
+
+    Returns:
+        (n, column sums, X^T X) of this shard's rows of the event matrix
+    """
+    from topology.congestion_events import extract_windowed_congestion_events
+
+    series = []
+    for cell, (slots, loss, core_lo, core_hi, lag) in cells.items():
+        df = pd.DataFrame({"slot": slots, "packet_loss": loss})
+
+        # Same shift as alignment.time_shift.align_packet_loss
+        if lag > 0:
+            df["packet_loss"] = df["packet_loss"].shift(-lag)
+        elif lag < 0:
+            df["packet_loss"] = df["packet_loss"].shift(abs(lag))
+        df["packet_loss"] = df["packet_loss"].fillna(0)
+
+        events = extract_windowed_congestion_events(
+            df, loss_threshold=loss_threshold, window=window
+        ).iloc[core_lo:core_hi]
+
+        s = events.set_index("slot")["congestion_event"]
+        s.name = cell
+        series.append(s)
+
+    x = pd.concat(series, axis=1).fillna(0).to_numpy(dtype=np.float64)
+
+    return len(x), x.sum(axis=0), x.T @ x
+
+
+def _pearson(n, sums, products):
+    if n < 2:
+        return np.full(products.shape, np.nan)
+
+    cov = products - np.outer(sums, sums) / n
+    var = np.diag(cov).copy()
+    var[var <= 1e-12 * n] = np.nan
+
+    return np.clip(cov / np.sqrt(np.outer(var, var)), -1.0, 1.0)
+
+
+def sharded_correlation(packets, lags, loss_threshold=1, window=5,
+                        n_shards=4, workers=None):
+    """
+    Congestion-event correlation computed shard by shard.
+
+    Args:
+        packets: dict[cell] -> DataFrame(slot, packet_loss), unaligned,
+            slot values increasing
+        lags: dict[cell] -> DU-RU lag in rows (alignment "lags")
+
+    Returns:
+        (corr_matrix DataFrame[cell x cell], number of event-matrix rows)
+    """
+    cells = sorted(lags)
+    slots = {c: packets[c]["slot"].to_numpy() for c in cells}
+
+    for cell in cells:
+        if np.any(np.diff(slots[cell]) < 0):
+            raise ValueError(f"Sharded mode needs time-ordered packet stats ({cell})")
+
+    lo = min(s[0] for s in slots.values() if len(s))
+    hi = max(s[-1] for s in slots.values() if len(s))
+    halo = window + max(abs(lag) for lag in lags.values())
+
+    tasks = []
+    for start, end in shard_bounds(lo, hi, n_shards):
+        shard = {}
+        for cell in cells:
+            core_lo, core_hi = np.searchsorted(slots[cell], [start, end])
+            a, b = max(0, core_lo - halo), min(len(slots[cell]), core_hi + halo)
+            shard[cell] = (
+                slots[cell][a:b],
+                packets[cell]["packet_loss"].to_numpy()[a:b],
+                core_lo - a,
+                core_hi - a,
+                lags[cell],
+            )
+        tasks.append((shard, loss_threshold, window))
+
+    parts = _map(_event_shard, tasks, workers)
+
+    n = sum(p[0] for p in parts)
+    sums = sum(p[1] for p in parts)
+    products = sum(p[2] for p in parts)
+
+    corr = pd.DataFrame(_pearson(n, sums, products), index=cells, columns=cells)
+
+    return corr, n
+
+
+# -------------------------
+# Pass 2: link aggregation + capacity sketches
+# -------------------------
+def _capacity_shard(cells, core_start, link_mapping, buffer_slots,
+                    relative_accuracy, keep_series):
+    """
+    Args:
+        cells: dict[cell] -> DataFrame(slot, throughput) incl. halo rows
+        core_start: first slot of the core range
+
+    Returns:
+        dict[link] -> (no-buffer sketch, with-buffer sketch, core series or None)
+    """
+    from capacity.sketch import QuantileSketch
+    from ps2.link_aggregation import aggregate_link_throughput
+
+    out = {}
+    for link, df in aggregate_link_throughput(cells, link_mapping).items():
+        smoothed = df["total_throughput"].rolling(window=buffer_slots, min_periods=1).mean()
+        core = (df["slot"] >= core_start).to_numpy()
+
+        out[link] = (
+            QuantileSketch(relative_accuracy).add(df["total_throughput"].to_numpy()[core]),
+            QuantileSketch(relative_accuracy).add(smoothed.to_numpy()[core]),
+            df[core].reset_index(drop=True) if keep_series else None,
+        )
+
+    return out
+
+
+def sharded_capacity(throughput, link_mapping, buffer_slots=2, percentile=99,
+                     n_shards=4, workers=None,
+                     relative_accuracy=DEFAULT_RELATIVE_ACCURACY, keep_series=False):
+    """
+    Per-link required capacity (as ps2.capacity_estimation) from shards.
+
+    Args:
+        throughput: dict[cell] -> DataFrame(slot, throughput) in BYTES per slot
+        keep_series: also return the merged per-link slot series
+
+    Returns:
+        (DataFrame(link, no_buffer, with_buffer) in Gbps,
+         dict[link] -> DataFrame(slot, total_throughput) or None)
+    """
+    cells = sorted({c for members in link_mapping.values() for c in members})
+    slots = {c: throughput[c]["slot"].to_numpy() for c in cells}
+
+    lo = min(s[0] for s in slots.values() if len(s))
+    hi = max(s[-1] for s in slots.values() if len(s))
+    halo = buffer_slots - 1
+
+    tasks = []
+    for start, end in shard_bounds(lo, hi, n_shards):
+        shard = {}
+        for cell in cells:
+            core_lo, core_hi = np.searchsorted(slots[cell], [start, end])
+            shard[cell] = throughput[cell].iloc[max(0, core_lo - halo):core_hi]
+        tasks.append((shard, start, link_mapping, buffer_slots,
+                      relative_accuracy, keep_series))
+
+    parts = _map(_capacity_shard, tasks, workers)
+
+    rows, series = [], {} if keep_series else None
+    for link in link_mapping:
+        no_buffer, with_buffer = parts[0][link][0], parts[0][link][1]
+        for part in parts[1:]:
+            no_buffer.merge(part[link][0])
+            with_buffer.merge(part[link][1])
+
+        rows.append({
+            "link": link,
+            "no_buffer": no_buffer.quantile(percentile),
+            "with_buffer": with_buffer.quantile(percentile),
+        })
+        if keep_series:
+            series[link] = pd.concat([part[link][2] for part in parts], ignore_index=True)
+
+    return pd.DataFrame(rows), series
+
+
+# -------------------------
+# Full sharded run
+# -------------------------
+def run_sharded(pipeline, params, n_shards=4, workers=None,
+                relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+    """
+    Sharded counterpart of the correlation/topology/capacity stages.
+
+    Ingestion and lag detection come from `pipeline` (and its cache).
+
+    Returns:
+        dict with corr_matrix, event_rows, link_mapping, capacity,
+        link_throughput
+    """
+    from topology.clustering import detect_link_communities
+    from topology.graph_builder import build_correlation_graph
+    from topology.infer_links import infer_link_mapping
+
+    base = pipeline.run(["throughput", "packets", "lags"], params)
+
+    corr_matrix, event_rows = sharded_correlation(
+        base["packets"],
+        base["lags"],
+        loss_threshold=params["loss_threshold"],
+        window=params["window"],
+        n_shards=n_shards,
+        workers=workers,
+    )
+
+    graph = build_correlation_graph(corr_matrix, threshold=params["threshold"])
+    link_mapping = infer_link_mapping(
+        detect_link_communities(graph, max_links=params["max_links"])
+    )
+
+    capacity, link_throughput = None, None
+    if link_mapping:
+        capacity, link_throughput = sharded_capacity(
+            base["throughput"],
+            link_mapping,
+            buffer_slots=params["buffer_slots"],
+            percentile=params["percentile"],
+            n_shards=n_shards,
+            workers=workers,
+            relative_accuracy=relative_accuracy,
+            keep_series=True,
+        )
+
+    return {
+        "corr_matrix": corr_matrix,
+        "event_rows": event_rows,
+        "graph": graph,
+        "link_mapping": link_mapping,
+        "capacity": capacity,
+        "link_throughput": link_throughput,
+    }
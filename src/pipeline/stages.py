@@ -0,0 +1,242 @@
+
+"""
+FronthaulIQ Pipeline Stages
+===========================
+
+The PS1/PS2 flow declared once as a stage DAG, shared by main.py and the
+dashboard. Changing a parameter only re-runs the stages that depend on it,
+e.g. a new `threshold` re-runs graph building and clustering, while
+parsing, alignment and correlation come from the cache.
+"""
+
+from pipeline.dag import Pipeline, Stage, directory_fingerprint
+
+DEFAULT_PARAMS = {
+    "throughput_dir": "data/raw/throughput",
+    "packet_dir": "data/raw/packet_stats",
+    "loss_threshold": 1,
+    "window": 5,
+    "threshold": 0.25,
+    "max_links": 3,
+    "buffer_slots": 2,
+    "percentile": 99,
+    "compact_dtypes": False,
+}
+
+
+# -------------------------
+# Stage functions
+# -------------------------
+def ingest(throughput_dir, packet_dir, compact_dtypes):
+    from ingestion.load_throughput import load_slot_throughput
+    from ingestion.load_packet_stats import load_packet_tables
+    from preprocessing.normalize import downcast_columns
+
+    throughput = load_slot_throughput(throughput_dir)
+    # One parse of the packet stats gives both the loss series and the counters
+    packets, counters = load_packet_tables(packet_dir)
+
+    # float32 throughput, uint16 packet counts
+    if compact_dtypes:
+        for frames in (throughput, packets):
+            for df in frames.values():
+                downcast_columns(df)
+
+    # Sorted keys keep artifact digests stable across runs
+    return {
+        "throughput": {c: throughput[c] for c in sorted(throughput)},
+        "packets": {c: packets[c] for c in sorted(packets)},
+        "packet_counters": {c: counters[c] for c in sorted(counters)},
+    }
+
+
+def align(throughput, packets, copy=True):
+    from alignment.time_shift import align_packet_loss
+
+    cells = sorted(set(throughput) & set(packets))
+
+    aligned, lags = {}, {}
+    for cell in cells:
+        aligned[cell], lags[cell] = align_packet_loss(
+            throughput[cell], packets[cell], copy=copy
+        )
+
+    return {"cells": cells, "aligned": aligned, "lags": lags}
+
+
+def events(aligned, loss_threshold, window, compact_dtypes):
+    import numpy as np
+    from topology.congestion_events import extract_windowed_congestion_events
+    from topology.correlation import build_congestion_matrix
+
+    event_data = {
+        cell: extract_windowed_congestion_events(
+            df, loss_threshold=loss_threshold, window=window
+        )
+        for cell, df in aligned.items()
+    }
+
+    return {"event_matrix": build_congestion_matrix(
+        event_data, dtype=np.uint8 if compact_dtypes else None
+    )}
+
+
+def correlation(event_matrix):
+    from topology.correlation import compute_correlation_matrix
+
+    return {"corr_matrix": compute_correlation_matrix(event_matrix)}
+
+
+def graph(corr_matrix, threshold):
+    from topology.graph_builder import build_correlation_graph
+
+    return {"graph": build_correlation_graph(corr_matrix, threshold=threshold)}
+
+
+def communities(graph, max_links):
+    from topology.clustering import detect_link_communities
+    from topology.infer_links import infer_link_mapping
+
+    found = detect_link_communities(graph, max_links=max_links)
+
+    return {"link_mapping": infer_link_mapping(found)}
+
+
+def aggregation(throughput, link_mapping):
+    from ps2.link_aggregation import aggregate_link_throughput
+
+    return {"link_throughput": aggregate_link_throughput(throughput, link_mapping)}
+
+
+def demand(throughput, packet_counters, lags, link_mapping):
+    from demand.hidden_demand import reconstruct_offered_load
+    from ps2.link_aggregation import aggregate_link_throughput
+
+    offered = reconstruct_offered_load(throughput, packet_counters, lags)
+
+    return {"offered_link_throughput": aggregate_link_throughput(offered, link_mapping)}
+
+
+def capacity(link_throughput, offered_link_throughput, buffer_slots, percentile):
+    import pandas as pd
+    from ps2.capacity_estimation import (
+        required_capacity_no_buffer,
+        required_capacity_with_buffer
+    )
+
+    rows = []
+    for link, df in link_throughput.items():
+        rows.append({
+            "link": link,
+            "no_buffer": required_capacity_no_buffer(df, percentile=percentile),
+            "with_buffer": required_capacity_with_buffer(
+                df, buffer_slots=buffer_slots, percentile=percentile
+            ),
+            "offered_with_buffer": required_capacity_with_buffer(
+                offered_link_throughput[link],
+                buffer_slots=buffer_slots,
+                percentile=percentile
+            ),
+        })
+
+    return {"capacity": pd.DataFrame(rows)}
+
+
+def hierarchy(throughput, link_mapping, buffer_slots, percentile):
+    from capacity.aggregate import aggregate_hierarchy, tree_from_link_mapping
+
+    report, _ = aggregate_hierarchy(
+        throughput,
+        tree_from_link_mapping(link_mapping),
+        buffer_slots=buffer_slots,
+        percentile=percentile
+    )
+
+    return {"tree_report": report}
+
+
+def congestion(aligned):
+    from simulation.congestion_state import build_congestion_state
+
+    return {"congestion_state": build_congestion_state(aligned)}
+
+
+def episodes(aligned, link_mapping, loss_threshold):
+    from topology.congestion_episodes import extract_episodes
+
+    return {"episodes": extract_episodes(aligned, link_mapping, loss_threshold=loss_threshold)}
+
+
+# -------------------------
+# DAG
+# -------------------------
+def _raw_fingerprint(**params):
+    return directory_fingerprint(*(v for k, v in params.items() if k.endswith("_dir")))
+
+
+STAGES = [
+    Stage("ingest", ingest,
+          outputs=["throughput", "packets", "packet_counters"],
+          params=["throughput_dir", "packet_dir", "compact_dtypes"],
+          fingerprint=_raw_fingerprint,
+          version=3),
+    Stage("align", align,
+          inputs=["throughput", "packets"],
+          outputs=["cells", "aligned", "lags"],
+          inplace=["packets"]),
+    Stage("events", events,
+          inputs=["aligned"],
+          outputs=["event_matrix"],
+          params=["loss_threshold", "window", "compact_dtypes"]),
+    Stage("correlation", correlation,
+          inputs=["event_matrix"],
+          outputs=["corr_matrix"]),
+    Stage("graph", graph,
+          inputs=["corr_matrix"],
+          outputs=["graph"],
+          params=["threshold"]),
+    Stage("communities", communities,
+          inputs=["graph"],
+          outputs=["link_mapping"],
+          params=["max_links"]),
+    Stage("aggregation", aggregation,
+          inputs=["throughput", "link_mapping"],
+          outputs=["link_throughput"]),
+    Stage("demand", demand,
+          inputs=["throughput", "packet_counters", "lags", "link_mapping"],
+          outputs=["offered_link_throughput"]),
+    Stage("capacity", capacity,
+          inputs=["link_throughput", "offered_link_throughput"],
+          outputs=["capacity"],
+          params=["buffer_slots", "percentile"]),
+    Stage("hierarchy", hierarchy,
+          inputs=["throughput", "link_mapping"],
+          outputs=["tree_report"],
+          params=["buffer_slots", "percentile"]),
+    Stage("congestion", congestion,
+          inputs=["aligned"],
+          outputs=["congestion_state"],
+          version=2),
+    Stage("episodes", episodes,
+          inputs=["aligned", "link_mapping"],
+          outputs=["episodes"],
+          params=["loss_threshold"],
+          version=2),
+]
+
+
+def build_pipeline(cache_dir="data/cache", low_memory=False):
+    return Pipeline(STAGES, cache_dir=cache_dir, low_memory=low_memory)
+
+
+def run_pipeline(targets, cache_dir="data/cache", low_memory=False, **overrides):
+    """
+    Runs the shared pipeline with DEFAULT_PARAMS plus any overrides.
+
+    Returns:
+        (artifacts dict, pipeline) - pipeline.last_run has per-stage status
+    """
+    params = {**DEFAULT_PARAMS, **overrides}
+    pipeline = build_pipeline(cache_dir, low_memory=low_memory)
+
+    return pipeline.run(targets, params), pipeline
@@ -0,0 +1,105 @@
+import numpy as np
+
+
+def slot_grid(frames: dict, slot_col="slot"):
+    """
+    Union of slot values across all cells, sorted.
+    """
+    if not frames:
+        return np.array([])
+
+    return np.unique(np.concatenate([
+        df[slot_col].to_numpy() for df in frames.values()
+    ]))
+
+
+def slot_matrix(frames: dict, value_col, slot_col="slot", cells=None,
+                slots=None, dtype=np.float64, agg="sum"):
+    """
+    Scatters per-cell slot series into a dense cells x slots array.
+
+    Args:
+        frames: dict[cell_id] -> DataFrame(slot_col, value_col)
+        value_col: column to scatter
+        cells: row order (defaults to sorted cell IDs)
+        slots: shared slot grid (defaults to the union of all slots);
+               values outside the grid are dropped
+        dtype: dtype of the preallocated output
+        agg: how duplicate slots combine, "sum" or "max"
+
+    Returns:
+        (matrix[cells x slots], slots, cells)
+    """
+    if cells is None:
+        cells = sorted(frames)
+    if slots is None:
+        slots = slot_grid({c: frames[c] for c in cells if c in frames}, slot_col)
+
+    slots = np.asarray(slots)
+    matrix = np.zeros((len(cells), len(slots)), dtype=dtype)
+
+    for row, cell in enumerate(cells):
+        if cell not in frames:
+            continue
+
+        df = frames[cell]
+        s = df[slot_col].to_numpy()
+        v = df[value_col].to_numpy()
+
+        idx = np.searchsorted(slots, s)
+        idx = np.minimum(idx, len(slots) - 1)
+        on_grid = slots[idx] == s if len(slots) else np.zeros(len(s), bool)
+        idx, v = idx[on_grid], v[on_grid]
+
+        if agg == "sum":
+            matrix[row] = np.bincount(idx, weights=v, minlength=len(slots))
+        elif agg == "max":
+            np.maximum.at(matrix[row], idx, v.astype(dtype, copy=False))
+        else:
+            raise ValueError(f"Unknown agg: {agg}")
+
+    return matrix, slots, list(cells)
+
+
+# Narrow storage dtypes for low-memory runs (slot columns are never touched:
+# packet-stats slots are float seconds and need float64)
+COMPACT_DTYPES = {
+    "throughput": np.float32,
+    "packet_loss": np.uint16,
+    "congestion_event": np.uint8,
+}
+
+
+def downcast_columns(df, dtypes=None):
+    """
+    Stores value columns in narrower dtypes, replacing them in `df`.
+
+    An integer target is only used when every value is a whole number in
+    its range; otherwise the column falls back to float32.
+
+    Args:
+        df: DataFrame to modify.
+        dtypes: dict[column] -> dtype (defaults to COMPACT_DTYPES); columns
+                missing from df are ignored.
+
+    Returns:
+        df
+    """
+    for col, dtype in (dtypes or COMPACT_DTYPES).items():
+        if col not in df.columns:
+            continue
+
+        values = df[col].to_numpy()
+        if np.issubdtype(dtype, np.integer):
+            info = np.iinfo(dtype)
+            fits = (
+                len(values) == 0
+                or (np.all(np.mod(values, 1) == 0)
+                    and values.min() >= info.min and values.max() <= info.max)
+            )
+            if not fits:
+                dtype = np.float32
+
+        df[col] = values.astype(dtype)
+
+    return df
@@ -3,14 +3,33 @@ import numpy as np
 
 SLOT_DURATION_SEC = 0.0005  # 500 microseconds
 
+# Slack (in slots) for timestamps on a slot boundary that land just below
+# it in floating point, e.g. 1.0015 / 0.0005 = 3002.9999999999995
+SLOT_EPSILON = 1e-6
 
-def convert_to_slot_level(throughput_df):
-    df = throughput_df.copy()
 
-    df = df.rename(columns={
+def time_to_slot(time):
+    """
+    Integer slot index of each timestamp (seconds): floor with SLOT_EPSILON
+    slack, so boundary timestamps stay in their own slot.
+    """
+    slots = np.asarray(time, dtype=np.float64) / SLOT_DURATION_SEC
+    return np.floor(slots + SLOT_EPSILON).astype(np.int64)
+
+
+def convert_to_slot_level(throughput_df, copy=True):
+    """
+    Sums symbol-level throughput into slots.
+
+    copy=False renames and converts the columns of `throughput_df` in place
+    instead of working on a copy (the input is modified).
+    """
+    df = throughput_df.copy() if copy else throughput_df
+
+    df.rename(columns={
         df.columns[0]: "time",
         df.columns[1]: "throughput"
-    })
+    }, inplace=True)
 
     df["time"] = pd.to_numeric(df["time"], errors="coerce")
     df["throughput"] = pd.to_numeric(df["throughput"], errors="coerce").fillna(0)
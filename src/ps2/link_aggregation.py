@@ -13,8 +13,8 @@ def aggregate_link_throughput(slot_throughput_data, link_mapping):
         dfs = []
 
         for cell in cells:
-            df = slot_throughput_data[cell].copy()
-            df = df.rename(columns={"throughput": cell})
+            # rename/set_index return new frames; no defensive copy needed
+            df = slot_throughput_data[cell].rename(columns={"throughput": cell})
             dfs.append(df.set_index("slot"))
 
         merged = pd.concat(dfs, axis=1).fillna(0)
@@ -30,3 +30,15 @@ def aggregate_link_throughput(slot_throughput_data, link_mapping):
         link_data[link] = merged[["total_throughput"]].reset_index()
 
     return link_data
+
+
+def iter_link_throughput(slot_throughput_data, link_mapping):
+    """
+    aggregate_link_throughput one link at a time.
+
+    Yields (link, DataFrame(slot, total_throughput)); only the link being
+    consumed is held in memory, so a streaming writer can take each
+    series as it is produced.
+    """
+    for link, cells in link_mapping.items():
+        yield link, aggregate_link_throughput(slot_throughput_data, {link: cells})[link]
@@ -4,21 +4,50 @@ Simulation Animator
 ===================
 
 Controls the Streamlit animation loop for the congestion simulation.
+
+Playback walks a CongestionTimeline: seeking to the window start is a
+binary search and only slots where some cell changes level are drawn,
+so long windows scrub without touching the dense state.
+
+"Cached frames" mode pre-renders the window once with NetworkFrameRenderer
+(static topology drawn once, collections recoloured and blitted) and
+replays the PNGs; "Redraw each frame" is the original full redraw.
 """
 
+import hashlib
 import time
+
+import numpy as np
 import streamlit as st
 import matplotlib.pyplot as plt
-from simulation.graph_frames import draw_network_frame
+from simulation.graph_frames import NetworkFrameRenderer, draw_network_frame, format_time
+
+RENDER_MODES = ["Cached frames", "Redraw each frame"]
+
+# Frames pre-rendered per window in cached mode
+MAX_WINDOW_FRAMES = 1000
+
+
+def _frame_renderer(G, pos):
+    # One renderer (and its frame cache) per topology and layout for the session
+    coords = np.asarray([pos[n] for n in G.nodes()], dtype=np.float64)
+    key = (tuple(G.nodes()), tuple(G.edges()), hashlib.sha1(coords.tobytes()).hexdigest())
+    cached = st.session_state.get("frame_renderer")
+    if cached is None or cached[0] != key:
+        cached = (key, NetworkFrameRenderer(G, pos))
+        st.session_state["frame_renderer"] = cached
 
-def render_simulation_ui(G, pos, congestion_state):
+    return cached[1]
+
+
+def render_simulation_ui(G, pos, timeline):
     """
     Renders the simulation UI and handles the animation loop.
     
     Args:
         G (nx.Graph): Network topology.
         pos (dict): Node positions.
-        congestion_state (pd.DataFrame): Time-series congestion data (Index=Slot, Columns=Cells).
+        timeline (CongestionTimeline): Run-length encoded congestion state.
     """
     st.markdown("### 🚦 Fronthaul Congestion Propagation Simulator")
     
@@ -30,39 +59,70 @@ def render_simulation_ui(G, pos, congestion_state):
         stop_sim = st.button("⏹️ Stop")
         
     with col2:
-        speed = st.slider("Animation Speed (sec/frame)", 0.05, 1.0, 0.1, 0.05)
+        speed = st.slider("Animation Speed (sec/frame)", 0.0, 1.0, 0.1, 0.05)
+        mode = st.radio("Rendering", RENDER_MODES, horizontal=True)
         
     with col3:
         # Time Window Selection
-        min_slot = int(congestion_state.index.min())
-        max_slot = int(congestion_state.index.max())
+        min_slot = float(timeline.start)
+        max_slot = float(timeline.end)
+        span = max_slot - min_slot
         start_slot, end_slot = st.slider(
-            "Time Window", 
+            "Time Window (s)", 
             min_slot, max_slot, 
-            (min_slot, min(min_slot + 100, max_slot))
+            (min_slot, min_slot + span / 10),
+            step=span / 1000 if span > 0 else None
         )
 
+    congested = timeline.congested_cells(start_slot, end_slot)
+    st.caption(f"{len(congested)} of {len(timeline.cells)} cells congested in this window")
+
     # --- Animation Area ---
     plot_placeholder = st.empty()
+
+    if mode == RENDER_MODES[0]:
+        renderer = _frame_renderer(G, pos)
+        with st.spinner("Rendering frames..."):
+            frames = renderer.render_window(
+                timeline, start_slot, end_slot, max_frames=MAX_WINDOW_FRAMES
+            )
+        if len(frames) >= MAX_WINDOW_FRAMES:
+            st.caption(
+                f"{len(frames)} frames cached; playback stops at {format_time(frames[-1][0])} "
+                f"(first {MAX_WINDOW_FRAMES} changes). Narrow the window to see the rest."
+            )
+        else:
+            st.caption(f"{len(frames)} frames cached for this window")
+
+        plot_placeholder.image(frames[0][1])
+
+        if run_sim:
+            for slot, png in frames:
+                if stop_sim:
+                    break
+                plot_placeholder.image(png)
+                if speed:
+                    time.sleep(speed)
+
+            st.success("Simulation Complete")
+        return
     
     # Initialize Plot
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    # Initial Frame (Static)
-    draw_network_frame(G, pos, {}, start_slot, ax=ax)
+    # Initial Frame (Static): state at the window start
+    current_state = timeline.seek(start_slot)
+    draw_network_frame(G, pos, current_state, start_slot, ax=ax)
     plot_placeholder.pyplot(fig)
     
     # --- Animation Loop ---
     if run_sim:
-        for slot in range(start_slot, end_slot + 1):
+        for slot, changes in timeline.iter_changes(start_slot, end_slot):
             if stop_sim:
                 break
             
-            # Get current state
-            if slot in congestion_state.index:
-                current_state = congestion_state.loc[slot].to_dict()
-            else:
-                current_state = {}
+            # Apply only the cells that changed level
+            current_state.update(changes)
                 
             # Draw Frame
             draw_network_frame(G, pos, current_state, slot, ax=ax)
@@ -1,8 +1,33 @@
+"""
+Animation Frames
+================
 
+Builds the long-form frame table for the Plotly network animation: one
+row per (frame, node). The table is assembled column-wise from dense
+cells x slots loss/throughput matrices, with np.tile / np.repeat for
+the per-node and per-frame columns, so 10k+ frames of hundreds of nodes
+take seconds.
+"""
+
+import numpy as np
 import pandas as pd
-import networkx as nx
+from preprocessing.normalize import slot_matrix
+from visualization.topology_graph import build_hub_spoke_graph, hub_spoke_layout
+
 
-def prepare_animation_frames(link_mapping, packet_data, throughput_data=None, steps=200):
+def _pool(matrix, starts, how):
+    """
+    Pools consecutive slot columns into frame buckets beginning at `starts`.
+    """
+    if how == "max":
+        return np.maximum.reduceat(matrix, starts, axis=1)
+
+    counts = np.diff(np.r_[starts, matrix.shape[1]])
+    return np.add.reduceat(matrix, starts, axis=1) / counts
+
+
+def prepare_animation_frames(link_mapping, packet_data, throughput_data=None, steps=200,
+                             bucket=1):
     """
     Prepares a DataFrame for Plotly animation.
     
@@ -10,101 +35,81 @@ def prepare_animation_frames(link_mapping, packet_data, throughput_data=None, st
         link_mapping (dict): Map of Link -> [Cells]
         packet_data (dict): Map of Cell -> DataFrame[slot, packet_loss]
         throughput_data (dict): Map of Cell -> DataFrame[slot, throughput] (Optional)
-        steps (int): Number of time steps to check for animation (to limit range)
+        steps (int): Number of frames (None for the whole series)
+        bucket (int): Slots per frame; loss is max-pooled and throughput
+            averaged over each bucket, Time is the bucket's first slot
         
     Returns:
-        pd.DataFrame: DataFrame with columns [Time, Node, Type, Value, Label, X, Y]
+        pd.DataFrame: DataFrame with columns [Time, Node, Type, Value, Label, X, Y, Size]
     """
     
-    # 1. Build a static graph layout for consistent positions
-    G = nx.Graph()
-    for link, cells in link_mapping.items():
-        G.add_node(link, type="link")
-        for cell in cells:
-            G.add_node(cell, type="cell")
-            G.add_edge(link, cell)
-            
-    # Use spring layout but fix link nodes to be central if possible
-    pos = nx.spring_layout(G, seed=42, k=0.5)
+    # 1. Static hub-and-spoke layout, shared with the other topology views
+    G = build_hub_spoke_graph(link_mapping)
+    pos = hub_spoke_layout(link_mapping)
+
+    nodes = list(G.nodes())
+    is_cell = np.array([G.nodes[n]["type"] == "cell" for n in nodes])
     
-    # 2. Collect timestamps (slots)
-    # intersection of slots across all cells is ideal, but union is safer
-    # For demo, we take the first cell's slots and limit to 'steps'
+    # 2. Collect timestamps (slots): the first cell's slots, limited to
+    # steps frames of `bucket` slots each
     first_cell = list(packet_data.keys())[0]
-    available_slots = packet_data[first_cell]['slot'].sort_values().unique()
-    
-    # If too many slots, subsample or slice
-    if len(available_slots) > steps:
-        target_slots = available_slots[:steps]
-    else:
-        target_slots = available_slots
-        
-    animation_rows = []
-    
-    # Pre-process data for fast lookup
-    # Pivot packet data: index=slot, columns=cell
-    combined_packets = []
-    for cell, df in packet_data.items():
-        temp = df.copy()
-        temp['cell'] = cell
-        combined_packets.append(temp)
-    
-    big_df = pd.concat(combined_packets)
-    # Pivot to get a matrix of packet loss: index=slot, cols=cells
-    loss_matrix = big_df.pivot_table(index='slot', columns='cell', values='packet_loss', fill_value=0)
-    
-    # Same for throughput if available
-    tp_matrix = None
+    available_slots = np.unique(packet_data[first_cell]['slot'].to_numpy())
+
+    if steps is not None:
+        available_slots = available_slots[:steps * bucket]
+
+    starts = np.arange(0, len(available_slots), bucket)
+    times = available_slots[starts]
+
+    # 3. Node values per frame: nodes x frames (link hubs stay 0)
+    loss, _, _ = slot_matrix(packet_data, "packet_loss", cells=nodes,
+                             slots=available_slots, agg="max")
+    loss = _pool(loss, starts, "max") if len(starts) else loss
+    loss[~is_cell] = 0
+
+    tp = None
     if throughput_data:
-        combined_tp = []
-        for cell, df in throughput_data.items():
-            temp = df.copy()
-            temp['cell'] = cell
-            combined_tp.append(temp)
-        if combined_tp:
-            big_tp = pd.concat(combined_tp)
-            # Ensure slot column is correct
-            # Throughput might be symbol level, need agg if not already done. 
-            # Assuming input is already slot-aligned or we just take raw match
-            tp_matrix = big_tp.pivot_table(index='slot', columns='cell', values='throughput', fill_value=0)
-
-    # 3. Generate frames
-    for t in target_slots:
-        # For each node in the graph
-        for node in G.nodes():
-            node_type = G.nodes[node]['type']
-            x, y = pos[node]
-            
-            val = 0
-            label = f"{node}"
-            
-            if node_type == 'cell':
-                # Get packet loss for this cell at time t
-                if t in loss_matrix.index and node in loss_matrix.columns:
-                    val = loss_matrix.loc[t, node]
-                
-                # Append throughput info to label if available
-                if tp_matrix is not None and t in tp_matrix.index and node in tp_matrix.columns:
-                    tp_val = tp_matrix.loc[t, node]
-                    label += f"<br>Loss: {val:.1f}<br>T-put: {tp_val:.2f}"
-                else:
-                    label += f"<br>Loss: {val:.1f}"
-
-            elif node_type == 'link':
-                # Link value could be aggregate of connected cells
-                # For now, keep it static or average
-                val = 0 
-                label = f"{node}<br>(Hub)"
-
-            animation_rows.append({
-                "Time": t,
-                "Node": node,
-                "Type": node_type,
-                "Value": val,  # Used for color (congestion)
-                "Label": label,
-                "X": x,
-                "Y": y,
-                "Size": 25 if node_type == 'link' else 15
-            })
-            
-    return pd.DataFrame(animation_rows)
+        tp, _, _ = slot_matrix(throughput_data, "throughput", cells=nodes,
+                               slots=available_slots)
+        tp = _pool(tp, starts, "mean") if len(starts) else tp
+
+        # T-put is labelled only where the cell has throughput at that time
+        has_tp = np.zeros((len(nodes), len(available_slots)), dtype=bool)
+        for row, node in enumerate(nodes):
+            if node in throughput_data:
+                has_tp[row] = np.isin(available_slots, throughput_data[node]["slot"].to_numpy())
+        has_tp = np.maximum.reduceat(has_tp, starts, axis=1) if len(starts) else has_tp
+
+    # 4. Frame table, time-major: frame f holds rows f*n_nodes .. +n_nodes
+    n_frames, n_nodes = len(times), len(nodes)
+    node_names = np.array(nodes, dtype=object)
+    value = loss.T.ravel()
+
+    label = np.char.add(
+        np.tile(np.array(nodes, dtype=str), n_frames),
+        np.char.mod("<br>Loss: %.1f", value)
+    )
+    if tp is not None:
+        cell_tp = (has_tp & is_cell[:, None]).T.ravel()
+        label = np.where(
+            cell_tp,
+            np.char.add(label, np.char.mod("<br>T-put: %.2f", tp.T.ravel())),
+            label
+        )
+    label = np.where(
+        np.tile(is_cell, n_frames), label,
+        np.char.add(np.tile(np.array(nodes, dtype=str), n_frames), "<br>(Hub)")
+    )
+
+    xy = np.array([pos[n] for n in nodes]).reshape(n_nodes, 2)
+
+    return pd.DataFrame({
+        "Time": np.repeat(times, n_nodes),
+        "Node": np.tile(node_names, n_frames),
+        "Type": np.tile(np.where(is_cell, "cell", "link").astype(object), n_frames),
+        "Value": value,
+        "Label": label.astype(object),
+        "X": np.tile(xy[:, 0], n_frames),
+        "Y": np.tile(xy[:, 1], n_frames),
+        "Size": np.tile(np.where(is_cell, 15, 25), n_frames),
+    })
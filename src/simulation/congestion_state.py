@@ -4,56 +4,84 @@ Congestion State Model
 ======================
 
 Converts raw packet loss data into a time-series congestion state model.
-Congestion Levels:
+Congestion Levels (DEFAULT_LEVELS):
     0: No Congestion (Loss < 1)
     1: Mild Congestion (1 <= Loss < 5)
     2: Severe Congestion (Loss >= 5)
+
+Levels are scattered straight into a preallocated int8 cells x slots
+array on the shared slot grid, one byte per cell-slot.
 """
 
 import pandas as pd
 import numpy as np
 
-def build_congestion_state(packet_data):
+from preprocessing.normalize import slot_grid
+
+# (minimum loss, level) rows, ascending; loss below the first row is level 0
+DEFAULT_LEVELS = ((1, 1), (5, 2))
+
+
+def classify_levels(loss, levels=DEFAULT_LEVELS):
+    """
+    Maps loss values to congestion levels in one vectorized pass.
+
+    Returns:
+        np.ndarray[int8]
+    """
+    thresholds = np.array([t for t, _ in levels], dtype=np.float64)
+    table = np.array([0] + [lvl for _, lvl in levels], dtype=np.int8)
+
+    loss = np.asarray(loss, dtype=np.float64)
+    state = table[np.searchsorted(thresholds, loss, side="right")]
+    state[np.isnan(loss)] = 0
+
+    return state
+
+
+def build_congestion_state(packet_data, levels=DEFAULT_LEVELS):
     """
     Converts packet data into a time-indexed congestion state dictionary.
-    
+
     Args:
         packet_data (dict): Dictionary mapping cell_id -> DataFrame(slot, packet_loss)
-        
+        levels (tuple): (minimum loss, level) rows, ascending by loss.
+
     Returns:
         pd.DataFrame: A DataFrame where index is time slot, columns are cell IDs,
-                      and values are congestion levels (0, 1, 2).
+                      and values are congestion levels (int8).
     """
-    # 1. Collect all data into a single DataFrame
-    combined_data = []
-    
-    for cell_id, df in packet_data.items():
-        temp = df.copy()
-        temp['cell_id'] = cell_id
-        combined_data.append(temp)
-        
-    if not combined_data:
+    if not packet_data:
         return pd.DataFrame()
-        
-    full_df = pd.concat(combined_data)
-    
-    # 2. Pivot to generic matrix form (Index=Slot, Columns=Cell)
-    # We use max() in case of duplicates, filling missing with 0 loss
-    loss_matrix = full_df.pivot_table(
-        index='slot', 
-        columns='cell_id', 
-        values='packet_loss', 
-        aggfunc='max'
-    ).fillna(0)
-    
-    # 3. Apply Congestion Logic
-    # Level 0: < 1
-    # Level 1: >= 1 AND < 5
-    # Level 2: >= 5
-    
-    congestion_state = pd.DataFrame(0, index=loss_matrix.index, columns=loss_matrix.columns)
-    
-    congestion_state[loss_matrix >= 1] = 1
-    congestion_state[loss_matrix >= 5] = 2
-    
-    return congestion_state
+
+    cells = sorted(packet_data)
+
+    slots = slot_grid(packet_data)
+    if slots.dtype.kind == "f":
+        slots = slots[~np.isnan(slots)]
+
+    state = np.zeros((len(cells), len(slots)), dtype=np.int8)
+
+    for row, cell in enumerate(cells):
+        df = packet_data[cell]
+        s = df["slot"].to_numpy()
+        lvl = classify_levels(df["packet_loss"].to_numpy(), levels)
+
+        idx = np.searchsorted(slots, s)
+        on_grid = idx < len(slots)
+        on_grid[on_grid] = slots[idx[on_grid]] == s[on_grid]
+        idx, lvl = idx[on_grid], lvl[on_grid]
+
+        # Levels grow with loss, so max level == level of the max loss
+        if np.all(np.diff(idx) > 0):
+            state[row, idx] = lvl
+        else:
+            np.maximum.at(state[row], idx, lvl)
+
+    # slots x cells view of the same buffer (no copy)
+    return pd.DataFrame(
+        state.T,
+        index=pd.Index(slots, name="slot"),
+        columns=pd.Index(cells, name="cell_id"),
+        copy=False
+    )
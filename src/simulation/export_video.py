@@ -0,0 +1,232 @@
+# =========================
+# FronthaulIQ Animation Export
+# =========================
+"""
+Renders a slot range of the congestion simulation offscreen to a GIF, an
+MP4 or a PNG sequence, with the simulator's visuals.
+
+    python src/simulation/export_video.py --start 30 --end 35 --output incident.gif
+    python src/simulation/export_video.py --start 30 --end 35 --output frames/ --workers 8
+
+Frames come from the results bundle written by main.py (congestion state
++ link mapping). They are split into contiguous chunks across worker
+processes. Each worker builds one NetworkFrameRenderer (figure, static
+topology, label overlay) in its initializer and only recolours and
+blits per frame, writing numbered PNGs. GIF/MP4 output is assembled from
+those PNGs afterwards (MP4 needs ffmpeg on PATH).
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+FRAME_PATTERN = "frame_%06d.png"
+
+# Per-worker renderer, built once by _init_worker
+_renderer = None
+
+
+def _init_worker(link_mapping, figsize, dpi):
+    global _renderer
+
+    import matplotlib
+    matplotlib.use("Agg")
+
+    from simulation.graph_frames import NetworkFrameRenderer
+    from visualization.topology_graph import build_hub_spoke_graph, hub_spoke_layout
+
+    _renderer = NetworkFrameRenderer(
+        build_hub_spoke_graph(link_mapping), hub_spoke_layout(link_mapping),
+        figsize=figsize, dpi=dpi
+    )
+
+
+def _render_chunk(out_dir, first_index, slots, cells, levels):
+    """
+    Args:
+        slots: slot of each frame in this chunk
+        levels: int8 [frames x cells] congestion levels
+
+    Returns:
+        number of frames written
+    """
+    for i, (slot, row) in enumerate(zip(slots, levels)):
+        png = _renderer.render(dict(zip(cells, row.tolist())), slot)
+        with open(os.path.join(out_dir, FRAME_PATTERN % (first_index + i)), "wb") as f:
+            f.write(png)
+
+    return len(slots)
+
+
+def frame_states(timeline, start, end, step=1, changes_only=False, grid=None):
+    """
+    Slots and dense levels of the frames to render.
+
+    Args:
+        grid: slot grid to sample (every slot of the congestion state);
+            ignored when changes_only
+
+    Returns:
+        (slots array, int8 [frames x cells])
+    """
+    import numpy as np
+
+    if changes_only:
+        slots = np.array([slot for slot, _ in timeline.iter_changes(start, end)])
+    else:
+        grid = np.asarray(grid)
+        slots = grid[(grid >= start) & (grid <= end)]
+
+    slots = slots[::step]
+    state = timeline.to_state(slots)
+
+    return slots, state[timeline.cells].to_numpy(dtype=np.int8)
+
+
+def render_frames(out_dir, link_mapping, cells, slots, levels, workers=None,
+                  figsize=(10, 6), dpi=80, chunks_per_worker=4):
+    """
+    Renders frames into out_dir as a numbered PNG sequence.
+
+    Returns:
+        number of frames written
+    """
+    import numpy as np
+
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    n_chunks = max(1, min(len(slots), workers * chunks_per_worker))
+    bounds = np.linspace(0, len(slots), n_chunks + 1).astype(int)
+    tasks = [
+        (out_dir, a, slots[a:b], cells, levels[a:b])
+        for a, b in zip(bounds[:-1], bounds[1:]) if b > a
+    ]
+
+    if workers == 1:
+        _init_worker(link_mapping, figsize, dpi)
+        return sum(_render_chunk(*task) for task in tasks)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(link_mapping, figsize, dpi),
+    ) as pool:
+        return sum(pool.map(_render_chunk, *zip(*tasks)))
+
+
+def assemble(frame_dir, n_frames, output, fps):
+    """
+    Joins the PNG sequence into a GIF (Pillow) or MP4 (ffmpeg).
+    """
+    ext = os.path.splitext(output)[1].lower()
+    paths = [os.path.join(frame_dir, FRAME_PATTERN % i) for i in range(n_frames)]
+
+    if ext == ".gif":
+        from PIL import Image
+
+        # Frames are opened lazily while the GIF is written
+        first = Image.open(paths[0])
+        first.save(
+            output, save_all=True,
+            append_images=(Image.open(p) for p in paths[1:]),
+            duration=int(1000 / fps), loop=0
+        )
+    elif ext == ".mp4":
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("MP4 export needs ffmpeg on PATH (or export a .gif / PNG folder)")
+        subprocess.run([
+            ffmpeg, "-y", "-loglevel", "error", "-framerate", str(fps),
+            "-i", os.path.join(frame_dir, FRAME_PATTERN),
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p", output,
+        ], check=True)
+    else:
+        raise ValueError(f"Unsupported video format: {ext}")
+
+    return output
+
+
+def export_animation(output, bundle_dir="data/processed/bundle", start=None, end=None,
+                     step=1, changes_only=False, max_frames=None, fps=20,
+                     workers=None, dpi=80):
+    """
+    Renders [start, end] (seconds) of the bundle's congestion state to
+    `output`: a .gif, a .mp4, or a directory for a PNG sequence.
+
+    Returns:
+        number of frames
+    """
+    from outputs.bundle import load_bundle
+    from simulation.timeline import CongestionTimeline
+
+    bundle = load_bundle(bundle_dir)
+    if bundle is None:
+        raise FileNotFoundError(f"No results bundle in {bundle_dir}. Run main.py first.")
+
+    state = bundle.congestion_state
+    timeline = CongestionTimeline.from_state(state)
+    start = timeline.start if start is None else start
+    end = timeline.end if end is None else end
+
+    slots, levels = frame_states(timeline, start, end, step, changes_only,
+                                 grid=state.index.to_numpy())
+    if max_frames:
+        slots, levels = slots[:max_frames], levels[:max_frames]
+    if len(slots) == 0:
+        raise ValueError(f"No frames between {start} and {end}")
+
+    video = os.path.splitext(output)[1].lower() in (".gif", ".mp4")
+    frame_dir = tempfile.mkdtemp(prefix="frames_") if video else output
+
+    try:
+        n = render_frames(frame_dir, bundle.link_mapping, timeline.cells, slots, levels,
+                          workers=workers, dpi=dpi)
+        if video:
+            assemble(frame_dir, n, output, fps)
+    finally:
+        if video:
+            shutil.rmtree(frame_dir, ignore_errors=True)
+
+    return n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the congestion animation offscreen")
+    parser.add_argument("--bundle-dir", default="data/processed/bundle")
+    parser.add_argument("--output", required=True,
+                        help="out.gif, out.mp4, or a directory for a PNG sequence")
+    parser.add_argument("--start", type=float, default=None, help="First slot (s)")
+    parser.add_argument("--end", type=float, default=None, help="Last slot (s)")
+    parser.add_argument("--step", type=int, default=1, help="Render every Nth slot")
+    parser.add_argument("--changes-only", action="store_true",
+                        help="One frame per state change instead of per slot")
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--fps", type=float, default=20)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Render processes (default: CPU count)")
+    parser.add_argument("--dpi", type=int, default=80)
+    args = parser.parse_args()
+
+    print(f"🎬 Rendering congestion animation to {args.output}...")
+    started = time.perf_counter()
+
+    n = export_animation(
+        args.output, args.bundle_dir, args.start, args.end, args.step,
+        args.changes_only, args.max_frames, args.fps, args.workers, args.dpi
+    )
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {n} frames in {elapsed:.1f}s ({n / elapsed:.0f} frames/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,20 @@ Graph Frames Visualizer
 =======================
 
 Handles the Matplotlib drawing logic for a single frame of the simulation.
+
+draw_network_frame redraws the whole graph. NetworkFrameRenderer draws the
+static topology once and then only recolours/resizes the node and edge
+collections, blitting them over a cached background and keeping the
+encoded PNG frames of a window for replay.
 """
 
+import io
+from collections import OrderedDict
+
+import numpy as np
 import matplotlib.pyplot as plt
 import networkx as nx
+from matplotlib.colors import to_rgba
 
 # Visual Constants
 COLOR_MAP = {
@@ -22,6 +32,14 @@ SIZE_MAP = {
     2: 600
 }
 
+
+def format_time(current_slot):
+    """
+    Simulator time label; congestion-state slots are in seconds.
+    """
+    return f"{float(current_slot):.5f} s"
+
+
 def draw_network_frame(G, pos, active_congestion, current_slot, ax=None):
     """
     Draws the network graph on a Matplotlib axis for a given time step.
@@ -30,7 +48,7 @@ def draw_network_frame(G, pos, active_congestion, current_slot, ax=None):
         G (nx.Graph): The network topology graph.
         pos (dict): Node positions.
         active_congestion (pd.Series): Congestion levels for cells at this slot (index=cell, val=level).
-        current_slot (int): The current time slot being rendered.
+        current_slot (float): Start of the slot being rendered (seconds).
         ax (matplotlib.axes.Axes): Optional axis to draw on.
     
     Returns:
@@ -123,7 +141,177 @@ def draw_network_frame(G, pos, active_congestion, current_slot, ax=None):
     nx.draw_networkx_labels(G, pos, labels=labels, font_size=8, font_color="#333", ax=ax)
     
     # 4. Styling
-    ax.set_title(f"Simulation Time: Slot {current_slot}", fontsize=14, loc='left')
+    ax.set_title(f"Simulation Time: {format_time(current_slot)}", fontsize=14, loc='left')
     ax.axis('off')
     
     return fig
+
+
+# Edge style per level (colour, width), same as draw_network_frame
+EDGE_STYLE = {
+    0: ("#cccccc", 1.0),
+    1: ("#ff7f0e", 2.0),
+    2: ("#d62728", 3.0),
+}
+
+HUB_COLOR = "#7f7f7f"
+HUB_SIZE = 400
+
+
+class NetworkFrameRenderer:
+    """
+    Incremental renderer for congestion frames on a fixed topology.
+
+    Args:
+        G (nx.Graph): The network topology graph.
+        pos (dict): Node positions.
+        max_cached_windows (int): Frame windows kept for replay.
+    """
+
+    def __init__(self, G, pos, figsize=(10, 6), dpi=100, max_cached_windows=4):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.nodes = list(G.nodes())
+        self._index = {node: i for i, node in enumerate(self.nodes)}
+        self._is_hub = np.array([G.nodes[n].get("type") == "link" for n in self.nodes])
+        self._edges = np.array(
+            [(self._index[u], self._index[v]) for u, v in G.edges()], dtype=np.int64
+        ).reshape(-1, 2)
+        self.levels = np.zeros(len(self.nodes), dtype=np.int8)
+
+        # Per-level lookup tables; update() clips levels above the highest
+        # mapped one to it, gaps inside the range use the level-0 style
+        n_levels = max(max(COLOR_MAP), max(EDGE_STYLE)) + 1
+        self._node_rgba = np.array([to_rgba(COLOR_MAP.get(l, COLOR_MAP[0])) for l in range(n_levels)])
+        self._node_size = np.array([SIZE_MAP.get(l, SIZE_MAP[0]) for l in range(n_levels)], dtype=float)
+        self._edge_rgba = np.array([to_rgba(EDGE_STYLE.get(l, EDGE_STYLE[0])[0]) for l in range(n_levels)])
+        self._edge_width = np.array([EDGE_STYLE.get(l, EDGE_STYLE[0])[1] for l in range(n_levels)])
+
+        # Off-screen figure, never shown through pyplot
+        self.fig = plt.Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        self.ax.axis("off")
+
+        self.node_artist = nx.draw_networkx_nodes(
+            G, pos, nodelist=self.nodes, node_size=HUB_SIZE,
+            edgecolors="white", linewidths=1.5, ax=self.ax
+        )
+        self.edge_artist = nx.draw_networkx_edges(G, pos, ax=self.ax)
+        labels = {
+            n: n if G.nodes[n].get("type") == "link" else str(n).replace("cell-", "")
+            for n in self.nodes
+        }
+        self.label_artists = list(nx.draw_networkx_labels(
+            G, pos, labels=labels, font_size=8, font_color="#333", ax=self.ax
+        ).values())
+        self.title = self.ax.set_title("", fontsize=14, loc="left")
+
+        # Labels sit above the nodes but never change: render them once
+        # into an RGBA overlay and composite it after each blit
+        for artist in (self.edge_artist, self.node_artist, self.title):
+            if artist is not None:
+                artist.set_visible(False)
+        self.fig.patch.set_alpha(0)
+        self.canvas.draw()
+        overlay = np.asarray(self.canvas.buffer_rgba()).reshape(-1, 4)
+        # Text covers few pixels: keep just those
+        self._overlay_pixels = np.flatnonzero(overlay[:, 3])
+        text = overlay[self._overlay_pixels].astype(np.float32)
+        self._overlay_alpha = text[:, 3:] / 255.0
+        self._overlay_rgb = text[:, :3] * self._overlay_alpha
+
+        for artist in self.label_artists:
+            artist.set_visible(False)
+        self.fig.patch.set_alpha(1)
+
+        self._dynamic = [a for a in (self.edge_artist, self.node_artist) if a is not None]
+        self._dynamic.append(self.title)
+        for artist in self._dynamic:
+            artist.set_visible(True)
+            artist.set_animated(True)
+
+        # Background: figure and axes only
+        self.canvas.draw()
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+
+        self._frames = OrderedDict()
+        self.max_cached_windows = max_cached_windows
+
+    def update(self, changes, current_slot):
+        """
+        Applies {node: level} changes (partial or full) and redraws the
+        dynamic artists over the cached background.
+        """
+        for node, level in changes.items():
+            i = self._index.get(node)
+            if i is not None:
+                self.levels[i] = level
+
+        levels = np.where(self._is_hub, 0, np.clip(self.levels, 0, len(self._node_rgba) - 1))
+
+        colors = self._node_rgba[levels]
+        colors[self._is_hub] = to_rgba(HUB_COLOR)
+        sizes = np.where(self._is_hub, HUB_SIZE, self._node_size[levels])
+        self.node_artist.set_facecolor(colors)
+        self.node_artist.set_sizes(sizes)
+
+        if self.edge_artist is not None and len(self._edges):
+            edge_levels = np.maximum(levels[self._edges[:, 0]], levels[self._edges[:, 1]])
+            self.edge_artist.set_color(self._edge_rgba[edge_levels])
+            self.edge_artist.set_linewidth(self._edge_width[edge_levels])
+
+        self.title.set_text(f"Simulation Time: {format_time(current_slot)}")
+
+        self.canvas.restore_region(self._background)
+        for artist in self._dynamic:
+            self.ax.draw_artist(artist)
+        self.canvas.blit(self.fig.bbox)
+
+        frame = np.asarray(self.canvas.buffer_rgba()).reshape(-1, 4)
+        under = frame[self._overlay_pixels, :3]
+        frame[self._overlay_pixels, :3] = self._overlay_rgb + under * (1.0 - self._overlay_alpha)
+
+    def to_png(self):
+        """
+        PNG bytes of the current canvas (no re-render).
+        """
+        from PIL import Image
+
+        buf = io.BytesIO()
+        image = Image.frombuffer("RGBA", self.canvas.get_width_height(), self.canvas.buffer_rgba())
+        # Fast compression: frames are replayed, not archived
+        image.save(buf, format="png", compress_level=1)
+        return buf.getvalue()
+
+    def render(self, state, current_slot):
+        self.levels[:] = 0
+        self.update(state, current_slot)
+        return self.to_png()
+
+    def render_window(self, timeline, start_slot, end_slot, max_frames=1000):
+        """
+        Pre-renders every state change of a CongestionTimeline window,
+        stopping after max_frames.
+
+        Returns:
+            list of (slot, PNG bytes); cached per timeline and window
+        """
+        key = (timeline.digest, start_slot, end_slot, max_frames)
+        if key in self._frames:
+            self._frames.move_to_end(key)
+            return self._frames[key]
+
+        self.levels[:] = 0
+        frames = []
+        for slot, changes in timeline.iter_changes(start_slot, end_slot):
+            self.update(changes, slot)
+            frames.append((slot, self.to_png()))
+            if len(frames) >= max_frames:
+                break
+
+        self._frames[key] = frames
+        while len(self._frames) > self.max_cached_windows:
+            self._frames.popitem(last=False)
+
+        return frames
@@ -0,0 +1,207 @@
+
+"""
+Congestion Timeline
+===================
+
+Run-length (change-point) encoding of the congestion state. Each cell
+keeps only the slots where its level changes:
+
+    starts[cell]  slot at which each run begins (ascending)
+    values[cell]  level of that run (int8)
+
+A run lasts until the next change; the level before the first slot is 0.
+Congestion is sparse, so this is orders of magnitude smaller than the
+dense slots x cells state, and:
+
+    seek(slot)                   O(cells * log runs)
+    iter_changes(a, b)           yields only slots where something changes
+    congested_cells(a, b)        O(cells * log runs), via prefix counts
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+
+class CongestionTimeline:
+    """
+    Args:
+        starts (dict): cell -> ascending slot array of run starts
+        values (dict): cell -> int8 array of run levels
+        start, end: first and last slot of the underlying data
+    """
+
+    def __init__(self, starts, values, start, end):
+        self.cells = list(starts)
+        self.starts = starts
+        self.values = values
+        self.start = start
+        self.end = end
+
+        # Congested-run prefix counts per level: a window query is then two
+        # binary searches and a subtraction
+        self.max_level = int(max((v.max() for v in values.values() if len(v)), default=0))
+        self._congested = {
+            cell: {
+                level: np.concatenate([[0], np.cumsum(values[cell] >= level)])
+                for level in range(1, self.max_level + 1)
+            }
+            for cell in self.cells
+        }
+
+        # All changes merged in slot order, for iter_changes
+        slots = np.concatenate([starts[c] for c in self.cells]) if self.cells else np.array([])
+        cell_idx = np.concatenate([
+            np.full(len(starts[c]), i, dtype=np.int32) for i, c in enumerate(self.cells)
+        ]) if self.cells else np.array([], dtype=np.int32)
+        levels = np.concatenate([values[c] for c in self.cells]) if self.cells else np.array([])
+
+        order = np.argsort(slots, kind="stable")
+        self._change_slots = slots[order]
+        self._change_cells = cell_idx[order]
+        self._change_levels = levels[order]
+        self._digest = None
+
+    # -------------------------
+    # Construction
+    # -------------------------
+    @classmethod
+    def from_state(cls, congestion_state):
+        """
+        Encodes a dense congestion state (index slot, columns cells).
+        """
+        slots = congestion_state.index.to_numpy()
+        starts, values = {}, {}
+
+        for cell in congestion_state.columns:
+            starts[cell], values[cell] = _encode(slots, congestion_state[cell].to_numpy())
+
+        start, end = (slots[0], slots[-1]) if len(slots) else (0, 0)
+        return cls(starts, values, start, end)
+
+    @classmethod
+    def from_packet_data(cls, packet_data, levels=None):
+        """
+        Encodes straight from packet data, one cell at a time, so the dense
+        state never exists as a whole. Same levels as build_congestion_state.
+        """
+        from preprocessing.normalize import slot_grid
+        from simulation.congestion_state import DEFAULT_LEVELS, build_congestion_state
+
+        grid = slot_grid(packet_data)
+        if grid.dtype.kind == "f":
+            grid = grid[~np.isnan(grid)]
+
+        starts, values = {}, {}
+        for cell in sorted(packet_data):
+            state = build_congestion_state(
+                {cell: packet_data[cell]}, levels or DEFAULT_LEVELS
+            )
+            dense = np.zeros(len(grid), dtype=np.int8)
+            dense[np.searchsorted(grid, state.index.to_numpy())] = state[cell].to_numpy()
+            starts[cell], values[cell] = _encode(grid, dense)
+
+        start, end = (grid[0], grid[-1]) if len(grid) else (0, 0)
+        return cls(starts, values, start, end)
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def _run_index(self, cell, slot):
+        return int(np.searchsorted(self.starts[cell], slot, side="right")) - 1
+
+    def level(self, cell, slot):
+        i = self._run_index(cell, slot)
+        return int(self.values[cell][i]) if i >= 0 else 0
+
+    def seek(self, slot):
+        """
+        Returns:
+            dict[cell] -> level at `slot`
+        """
+        return {cell: self.level(cell, slot) for cell in self.cells}
+
+    def iter_changes(self, start, end):
+        """
+        Walks [start, end], yielding only when the state changes.
+
+        Yields:
+            (slot, dict[cell] -> new level); the first item is the full
+            state at `start`
+        """
+        yield start, self.seek(start)
+
+        lo = np.searchsorted(self._change_slots, start, side="right")
+        hi = np.searchsorted(self._change_slots, end, side="right")
+        if lo >= hi:
+            return
+
+        slots = self._change_slots[lo:hi]
+        cells = self._change_cells[lo:hi]
+        levels = self._change_levels[lo:hi]
+
+        bounds = np.flatnonzero(np.diff(slots)) + 1
+        for a, b in zip(np.r_[0, bounds], np.r_[bounds, len(slots)]):
+            yield slots[a], {self.cells[c]: int(l) for c, l in zip(cells[a:b], levels[a:b])}
+
+    def congested_cells(self, start, end, min_level=1):
+        """
+        Cells at or above `min_level` at any slot in [start, end].
+        """
+        if min_level > self.max_level:
+            return []
+
+        found = []
+        for cell in self.cells:
+            first = max(self._run_index(cell, start), 0)
+            last = int(np.searchsorted(self.starts[cell], end, side="right"))
+            counts = self._congested[cell][min_level]
+            if last > first and counts[last] - counts[first] > 0:
+                found.append(cell)
+
+        return found
+
+    def to_state(self, slots):
+        """
+        Dense slots x cells state sampled at `slots` (for plotting windows).
+        """
+        slots = np.asarray(slots)
+        data = {}
+        for cell in self.cells:
+            i = np.searchsorted(self.starts[cell], slots, side="right") - 1
+            col = self.values[cell][np.maximum(i, 0)] if len(self.values[cell]) else np.zeros(len(slots), np.int8)
+            data[cell] = np.where(i >= 0, col, 0).astype(np.int8)
+
+        return pd.DataFrame(data, index=pd.Index(slots, name="slot"))
+
+    @property
+    def n_runs(self):
+        return int(sum(len(v) for v in self.values.values()))
+
+    @property
+    def digest(self):
+        """
+        Content hash (cells, range and every change), e.g. for cache keys.
+        """
+        if self._digest is None:
+            h = hashlib.sha1(repr((self.cells, self.start, self.end)).encode())
+            for arr in (self._change_slots, self._change_cells, self._change_levels):
+                h.update(np.ascontiguousarray(arr).tobytes())
+            self._digest = h.hexdigest()
+
+        return self._digest
+
+
+def _encode(slots, dense):
+    """
+    Change points of one dense level series.
+    """
+    if len(dense) == 0:
+        return np.array([], dtype=slots.dtype), np.array([], dtype=np.int8)
+
+    change = np.flatnonzero(np.diff(dense)) + 1
+    # A leading run at level 0 is implicit
+    keep = np.r_[0, change] if dense[0] != 0 else change
+
+    return slots[keep], dense[keep].astype(np.int8)
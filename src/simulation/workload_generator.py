@@ -0,0 +1,313 @@
+
+"""
+Synthetic Fronthaul Workload Generator
+======================================
+
+Builds a configurable deployment (links, cells per link, link capacity,
+buffer depth) with bursty on/off traffic per cell, plus link-wide bursts
+that switch every cell behind the same link on together (cells served by
+one DU port share its scheduling pattern). Each link's aggregate is pushed
+through a finite-buffer queue (capacity.queue_simulator). The results
+are written in the on-disk formats the loaders read:
+
+    <out>/packet_stats/pkt-stats-cell-N.dat   one row per slot, the layout
+        of real captures (data/raw/packet_stats): PACKET_HEADER, then
+        <slotStart> <txPackets> <rxPackets> <tooLateRxPackets>
+        (load_packet_tables derives packet loss as tx - rx)
+    <out>/throughput/throughput-cell-N.dat    one row per OFDM symbol:
+        <time> <bytes>   (bytes leaving the link queue, 14 symbols per slot,
+        so a link never carries more than its capacity)
+    <out>/topology_truth.json                 true link -> cells mapping
+    <out>/deployment.json                     generator settings
+
+Timestamps sit inside their slot (packet rows PACKET_OFFSET_SEC after the
+slot start, symbols at their centres), never on a slot boundary.
+
+Cell IDs are shuffled across links so the mapping cannot be guessed from
+the numbering. Generation is vectorized per link and chunked over slots,
+so memory stays bounded at any scale.
+
+    python src/simulation/workload_generator.py --out data/synthetic/site-1 \
+        --links 3 --cells-per-link 8 --seconds 20
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from capacity.queue_simulator import simulate_link_queue
+from preprocessing.symbol_to_slot import SLOT_DURATION_SEC
+
+SYMBOLS_PER_SLOT = 14
+PACKET_HEADER = "<slot> <slotStart> <txPackets> <rxPackets> <tooLateRxPackets>"
+PACKET_OFFSET_SEC = 0.00001
+
+DEFAULT_CONFIG = {
+    "links": 3,
+    "cells_per_link": 8,
+    "seconds": 10.0,
+    "link_capacity_gbps": 10.0,
+    "buffer_us": 20.0,
+    "packet_bytes": 8000,
+    "late_budget_us": 10.0,
+    "on_gbps": 2.0,
+    "off_gbps": 0.0,
+    "mean_on_slots": 40,
+    "mean_off_slots": 400,
+    "mean_burst_slots": 20,
+    "mean_gap_slots": 200,
+    "start_time": 1.0,
+    "chunk_slots": 2 ** 18,
+    "seed": 0,
+}
+
+
+def _gbps_to_bytes_per_slot(gbps):
+    return gbps * 1e9 / 8 * SLOT_DURATION_SEC
+
+
+def _onoff(rng, n, state, mean_on, mean_off):
+    """
+    On/off Markov source for one cell over n slots, built from geometric
+    run lengths. `state` = (value of the current run, slots left in it)
+    is carried between chunks.
+    """
+    is_on, left = state
+    out = np.empty(n, dtype=bool)
+
+    pos = min(left, n)
+    out[:pos] = is_on
+    if left > n:
+        return out, (is_on, left - n)
+
+    current = not is_on
+    while pos < n:
+        k = max(8, 2 * (n - pos) // (mean_on + mean_off) + 2)
+        flags = current ^ (np.arange(k) % 2 == 1)
+        lengths = rng.geometric(1.0 / np.where(flags, mean_on, mean_off))
+        ends = pos + np.cumsum(lengths)
+
+        runs = np.repeat(flags, lengths)
+        take = min(len(runs), n - pos)
+        out[pos:pos + take] = runs[:take]
+
+        if ends[-1] > n:
+            # The run crossing the chunk boundary continues in the next chunk
+            i = np.searchsorted(ends, n, side="right")
+            return out, (bool(flags[i]), int(ends[i] - n))
+
+        pos = int(ends[-1])
+        current = not flags[-1]
+
+    return out, (bool(out[-1]), 0)
+
+
+def _served_per_cell(accepted, queue, backlog):
+    """
+    Splits each slot's link departures between cells in FIFO order (fluid
+    approximation, bytes of one slot mixed in proportion).
+
+    The link has sent D[t] = backlog + cumsum(accepted) - queue[t] bytes by
+    the end of slot t; under FIFO those are the first D[t] bytes of the
+    arrival stream, so each cell's cumulative departures are its cumulative
+    arrivals read off at D[t] (np.interp). Where the queue is empty, every
+    accepted byte leaves in its own slot. `backlog` (bytes per cell still
+    queued, oldest first) is carried between chunks.
+
+    Returns:
+        (served[cells x n], backlog)
+    """
+    arrived = np.cumsum(accepted, axis=1)
+    total = arrived.sum(axis=0)
+    start = backlog.sum()
+
+    # Arrival curve knots: the carried backlog, then every slot
+    knots = np.r_[0.0, start, start + total]
+    sent = np.clip(start + total - queue, 0.0, knots[-1])
+
+    departed = np.empty_like(arrived)
+    for i in range(len(accepted)):
+        curve = np.r_[0.0, backlog[i], backlog[i] + arrived[i]]
+        departed[i] = np.interp(sent, knots, curve)
+
+    served = np.diff(departed, axis=1, prepend=0.0).clip(min=0.0)
+    backlog = np.maximum(backlog + arrived[:, -1] - departed[:, -1], 0.0)
+
+    return served, backlog
+
+
+def generate_workload(out_dir, **overrides):
+    """
+    Generates a synthetic site into `out_dir`.
+
+    Returns:
+        dict[link] -> list of cells (the ground-truth mapping)
+    """
+    cfg = {**DEFAULT_CONFIG, **overrides}
+    rng = np.random.default_rng(cfg["seed"])
+
+    n_links = cfg["links"]
+    per_link = cfg["cells_per_link"]
+    if np.isscalar(per_link):
+        per_link = [int(per_link)] * n_links
+
+    n_cells = sum(per_link)
+    cell_ids = rng.permutation(np.arange(1, n_cells + 1))
+
+    truth, offset = {}, 0
+    for l, count in enumerate(per_link):
+        truth[f"Link{l + 1}"] = [f"cell-{i}" for i in sorted(cell_ids[offset:offset + count])]
+        offset += count
+
+    pkt_dir = os.path.join(out_dir, "packet_stats")
+    tp_dir = os.path.join(out_dir, "throughput")
+    os.makedirs(pkt_dir, exist_ok=True)
+    os.makedirs(tp_dir, exist_ok=True)
+
+    n_slots = int(round(cfg["seconds"] / SLOT_DURATION_SEC))
+    capacity = _gbps_to_bytes_per_slot(cfg["link_capacity_gbps"])
+    buffer = capacity * cfg["buffer_us"] * 1e-6 / SLOT_DURATION_SEC
+    late_budget = capacity * cfg["late_budget_us"] * 1e-6 / SLOT_DURATION_SEC
+    on_bytes = _gbps_to_bytes_per_slot(cfg["on_gbps"])
+    off_bytes = _gbps_to_bytes_per_slot(cfg["off_gbps"])
+
+    for link, cells in truth.items():
+        _generate_link(
+            rng, cells, n_slots, cfg, capacity, buffer, late_budget,
+            on_bytes, off_bytes, pkt_dir, tp_dir
+        )
+
+    with open(os.path.join(out_dir, "topology_truth.json"), "w") as f:
+        json.dump(truth, f, indent=2)
+    with open(os.path.join(out_dir, "deployment.json"), "w") as f:
+        json.dump({**cfg, "cells_per_link": per_link, "slots": n_slots}, f, indent=2)
+
+    return truth
+
+
+def _generate_link(rng, cells, n_slots, cfg, capacity, buffer, late_budget,
+                   on_bytes, off_bytes, pkt_dir, tp_dir):
+    handles = {
+        cell: (
+            open(os.path.join(pkt_dir, f"pkt-stats-{cell}.dat"), "w"),
+            open(os.path.join(tp_dir, f"throughput-{cell}.dat"), "w"),
+        )
+        for cell in cells
+    }
+    for pkt_f, _ in handles.values():
+        pkt_f.write(PACKET_HEADER + "\n")
+
+    states = {cell: (bool(rng.random() < 0.1), 0) for cell in cells}
+    link_state = (False, 0)
+    q = 0.0
+    backlog = np.zeros(len(cells))
+
+    try:
+        for start in range(0, n_slots, cfg["chunk_slots"]):
+            n = min(cfg["chunk_slots"], n_slots - start)
+
+            # Offered bytes per cell and slot (cells x n)
+            burst, link_state = _onoff(
+                rng, n, link_state, cfg["mean_burst_slots"], cfg["mean_gap_slots"]
+            )
+            offered = np.empty((len(cells), n))
+            for i, cell in enumerate(cells):
+                on, states[cell] = _onoff(
+                    rng, n, states[cell], cfg["mean_on_slots"], cfg["mean_off_slots"]
+                )
+                on |= burst
+                scale = np.where(on, on_bytes, off_bytes)
+                offered[i] = rng.gamma(4.0, np.maximum(scale, 1e-9) / 4.0) * (scale > 0)
+
+            arrivals = offered.sum(axis=0)
+            queue, dropped = simulate_link_queue(arrivals, capacity, buffer, q0=q)
+            prev_q = np.concatenate([[q], queue[:-1]])
+            q = queue[-1]
+
+            # Drops are shared in proportion to each cell's offered bytes
+            share = np.divide(offered, arrivals, out=np.zeros_like(offered), where=arrivals > 0)
+            cell_drop = share * dropped
+            carried, backlog = _served_per_cell(offered - cell_drop, queue, backlog)
+
+            tx = np.ceil(offered / cfg["packet_bytes"])
+            lost = np.minimum(np.round(cell_drop / cfg["packet_bytes"]), tx)
+            rx = tx - lost
+
+            # Packets that join behind more than the latency budget's worth of
+            # backlog arrive too late; the backlog moves linearly over the slot
+            hi, lo = np.maximum(prev_q, queue), np.minimum(prev_q, queue)
+            late_frac = np.where(
+                hi > lo,
+                np.clip((hi - late_budget) / np.maximum(hi - lo, 1e-9), 0.0, 1.0),
+                (hi > late_budget).astype(float)
+            )
+            too_late = np.round(rx * late_frac)
+
+            # Timestamps are identical for every cell, so format them once per chunk
+            slot_times = cfg["start_time"] + (start + np.arange(n)) * SLOT_DURATION_SEC
+            symbol_times = (
+                slot_times[:, None]
+                + (np.arange(SYMBOLS_PER_SLOT)[None, :] + 0.5) * SLOT_DURATION_SEC / SYMBOLS_PER_SLOT
+            ).ravel()
+            slot_times = np.char.mod("%.5f", slot_times + PACKET_OFFSET_SEC).astype(object)
+            symbol_times = np.char.mod("%.7f", symbol_times).astype(object)
+
+            for i, cell in enumerate(cells):
+                pkt_f, tp_f = handles[cell]
+
+                pd.DataFrame({
+                    "time": slot_times,
+                    "tx": tx[i].astype(np.int64),
+                    "rx": rx[i].astype(np.int64),
+                    "late": too_late[i].astype(np.int64),
+                }).to_csv(pkt_f, sep=" ", header=False, index=False)
+
+                weights = rng.random((n, SYMBOLS_PER_SLOT))
+                weights /= weights.sum(axis=1, keepdims=True)
+                symbol_bytes = np.round(carried[i][:, None] * weights).ravel()
+
+                pd.DataFrame({
+                    "time": symbol_times,
+                    "bytes": symbol_bytes.astype(np.int64),
+                }).to_csv(tp_f, sep=" ", header=False, index=False)
+    finally:
+        for pkt_f, tp_f in handles.values():
+            pkt_f.close()
+            tp_f.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic fronthaul site")
+    parser.add_argument("--out", required=True, help="Output site directory")
+    parser.add_argument("--links", type=int, default=DEFAULT_CONFIG["links"])
+    parser.add_argument("--cells-per-link", type=int, default=DEFAULT_CONFIG["cells_per_link"])
+    parser.add_argument("--seconds", type=float, default=DEFAULT_CONFIG["seconds"])
+    parser.add_argument("--link-capacity-gbps", type=float, default=DEFAULT_CONFIG["link_capacity_gbps"])
+    parser.add_argument("--buffer-us", type=float, default=DEFAULT_CONFIG["buffer_us"])
+    parser.add_argument("--seed", type=int, default=DEFAULT_CONFIG["seed"])
+    args = parser.parse_args()
+
+    truth = generate_workload(
+        args.out,
+        links=args.links,
+        cells_per_link=args.cells_per_link,
+        seconds=args.seconds,
+        link_capacity_gbps=args.link_capacity_gbps,
+        buffer_us=args.buffer_us,
+        seed=args.seed,
+    )
+
+    print(f"✅ Synthetic site written to {args.out}")
+    for link, cells in truth.items():
+        print(f"{link} → Cells: {cells}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+
+"""
+Congestion Episodes
+===================
+
+Turns per-slot loss series into discrete incidents:
+
+    cell episode   a run of rows with loss >= loss_threshold (quiet gaps of
+                   up to max_gap rows are bridged)
+    link episode   member-cell episodes of one link that overlap or lie
+                   within link_gap seconds of each other, merged
+
+Each episode carries start/end slot, peak loss, total dropped packets
+(loss summed over the episode), number of slots and the cells involved.
+
+EpisodeIndex stores them in a static centred interval tree, so "what was
+congested at slot X" and "which episodes overlap [a, b]" cost
+O(log n + matches) instead of a scan of the raw matrix.
+
+The last slot of the input data is kept in episodes.attrs["data_end"], so
+"the last hour" is measured from the end of the data, not from the end of
+the last episode.
+"""
+
+import numpy as np
+import pandas as pd
+
+from preprocessing.symbol_to_slot import SLOT_DURATION_SEC
+
+EPISODE_COLUMNS = ["scope", "name", "start", "end", "peak_loss", "dropped",
+                   "n_slots", "cells"]
+
+# Default merge distance for link episodes: the events window (5 slots)
+DEFAULT_LINK_GAP = 5 * SLOT_DURATION_SEC
+
+
+def cell_episodes(packet_df, loss_threshold=1, max_gap=0):
+    """
+    Episodes of one cell's loss series.
+
+    Args:
+        packet_df: DataFrame(slot, packet_loss), slot increasing
+        max_gap: quiet rows allowed inside one episode
+
+    Returns:
+        DataFrame(start, end, peak_loss, dropped, n_slots)
+    """
+    slots = packet_df["slot"].to_numpy()
+    loss = np.nan_to_num(packet_df["packet_loss"].to_numpy(dtype=np.float64))
+
+    rows = np.flatnonzero(loss >= loss_threshold)
+    if len(rows) == 0:
+        return pd.DataFrame(columns=["start", "end", "peak_loss", "dropped", "n_slots"])
+
+    breaks = np.flatnonzero(np.diff(rows) > max_gap + 1) + 1
+    first = rows[np.r_[0, breaks]]
+    last = rows[np.r_[breaks - 1, len(rows) - 1]]
+
+    # Totals over the whole episode, bridged quiet rows included
+    cumulative = np.r_[0, np.cumsum(loss)]
+
+    return pd.DataFrame({
+        "start": slots[first],
+        "end": slots[last],
+        "peak_loss": np.maximum.reduceat(loss[rows], np.r_[0, breaks]),
+        "dropped": cumulative[last + 1] - cumulative[first],
+        "n_slots": last - first + 1,
+    })
+
+
+def _merge_link(link, episodes, link_gap):
+    """
+    Merges overlapping member-cell episodes into link episodes.
+    """
+    episodes = episodes.sort_values("start", kind="stable")
+    start = episodes["start"].to_numpy()
+    end = episodes["end"].to_numpy()
+
+    # A new link episode starts where no earlier episode reaches this one
+    reach = np.maximum.accumulate(end)
+    group = np.r_[0, np.cumsum(start[1:] > reach[:-1] + link_gap)]
+
+    rows = []
+    for _, part in episodes.groupby(group, sort=True):
+        rows.append({
+            "scope": "link",
+            "name": link,
+            "start": part["start"].min(),
+            "end": part["end"].max(),
+            "peak_loss": part["peak_loss"].max(),
+            "dropped": part["dropped"].sum(),
+            "n_slots": int(part["n_slots"].sum()),
+            "cells": tuple(sorted(set(part["name"]))),
+        })
+
+    return rows
+
+
+def extract_episodes(packet_data, link_mapping=None, loss_threshold=1,
+                     max_gap=0, link_gap=DEFAULT_LINK_GAP):
+    """
+    Cell episodes for every cell, plus link episodes if a mapping is given.
+
+    Args:
+        packet_data (dict): cell_id -> DataFrame(slot, packet_loss)
+        link_mapping (dict): link -> list of cells
+        link_gap (float): seconds between member episodes still merged
+
+    Returns:
+        DataFrame[EPISODE_COLUMNS] sorted by start; n_slots of a link
+        episode counts cell-slots; attrs["data_end"] is the last slot of
+        packet_data
+    """
+    frames = []
+    for cell in sorted(packet_data):
+        df = cell_episodes(packet_data[cell], loss_threshold, max_gap)
+        df.insert(0, "name", cell)
+        df.insert(0, "scope", "cell")
+        df["cells"] = [(cell,)] * len(df)
+        frames.append(df)
+
+    cells = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=EPISODE_COLUMNS)
+
+    links = []
+    for link, members in (link_mapping or {}).items():
+        member_episodes = cells[cells["name"].isin(members)]
+        if len(member_episodes):
+            links.extend(_merge_link(link, member_episodes, link_gap))
+
+    episodes = pd.concat([cells, pd.DataFrame(links, columns=EPISODE_COLUMNS)], ignore_index=True)
+    episodes = episodes[EPISODE_COLUMNS].astype({"start": np.float64, "end": np.float64,
+                                                  "peak_loss": np.float64, "dropped": np.float64,
+                                                  "n_slots": np.int64})
+
+    episodes = episodes.sort_values(["start", "scope", "name"], kind="stable").reset_index(drop=True)
+    ends = [df["slot"].max() for df in packet_data.values() if len(df)]
+    episodes.attrs["data_end"] = float(np.nanmax(ends)) if ends else 0.0
+
+    return episodes
+
+
+# -------------------------
+# Interval index
+# -------------------------
+LEAF_SIZE = 32
+
+
+class _Node:
+    __slots__ = ("center", "by_start", "starts", "by_end", "ends", "left", "right")
+
+
+class EpisodeIndex:
+    """
+    Static interval tree over episode [start, end] ranges.
+
+    Args:
+        episodes: DataFrame[EPISODE_COLUMNS] (e.g. from extract_episodes)
+        data_end: last slot of the data the episodes come from; defaults to
+            episodes.attrs["data_end"], else the end of the last episode
+    """
+
+    def __init__(self, episodes, data_end=None):
+        self.episodes = episodes.reset_index(drop=True)
+        self._start = self.episodes["start"].to_numpy(dtype=np.float64)
+        self._end = self.episodes["end"].to_numpy(dtype=np.float64)
+
+        self._start_order = np.argsort(self._start, kind="stable")
+        self._sorted_starts = self._start[self._start_order]
+
+        self.start = float(self._start.min()) if len(self._start) else 0.0
+        self.end = float(self._end.max()) if len(self._end) else 0.0
+        if data_end is None:
+            data_end = episodes.attrs.get("data_end", self.end)
+        self.data_end = max(float(data_end), self.end)
+
+        self._root = self._build(np.arange(len(self.episodes)))
+
+    def __len__(self):
+        return len(self.episodes)
+
+    def _build(self, idx):
+        if len(idx) == 0:
+            return None
+
+        node = _Node()
+        s, e = self._start[idx], self._end[idx]
+
+        if len(idx) <= LEAF_SIZE:
+            # Leaf: a short linear scan
+            node.center = None
+            here = idx
+            node.left = node.right = None
+        else:
+            node.center = float(np.median(np.r_[s, e]))
+            left = e < node.center
+            right = s > node.center
+            here = idx[~(left | right)]
+            node.left = self._build(idx[left])
+            node.right = self._build(idx[right])
+
+        order = np.argsort(self._start[here], kind="stable")
+        node.by_start, node.starts = here[order], self._start[here][order]
+        order = np.argsort(self._end[here], kind="stable")
+        node.by_end, node.ends = here[order], self._end[here][order]
+
+        return node
+
+    def _stab(self, x):
+        found = []
+        node = self._root
+        while node is not None:
+            if node.center is None:
+                k = np.searchsorted(node.starts, x, side="right")
+                cand = node.by_start[:k]
+                found.append(cand[self._end[cand] >= x])
+                break
+            if x < node.center:
+                # All intervals here end after the centre; only starts matter
+                found.append(node.by_start[:np.searchsorted(node.starts, x, side="right")])
+                node = node.left
+            elif x > node.center:
+                found.append(node.by_end[np.searchsorted(node.ends, x, side="left"):])
+                node = node.right
+            else:
+                found.append(node.by_start)
+                break
+
+        return np.concatenate(found) if found else np.array([], dtype=np.int64)
+
+    def _overlap(self, start, end):
+        # Intervals containing `start`, plus those starting inside (start, end]
+        lo = np.searchsorted(self._sorted_starts, start, side="right")
+        hi = np.searchsorted(self._sorted_starts, end, side="right")
+
+        return np.sort(np.concatenate([self._stab(start), self._start_order[lo:hi]]))
+
+    def _select(self, idx, scope):
+        result = self.episodes.iloc[idx]
+        if scope is not None:
+            result = result[result["scope"] == scope]
+
+        return result
+
+    def at(self, slot, scope=None):
+        """
+        Episodes active at `slot` (stabbing query).
+        """
+        return self._select(np.sort(self._stab(slot)), scope)
+
+    def overlapping(self, start, end, scope=None):
+        """
+        Episodes overlapping [start, end].
+        """
+        return self._select(self._overlap(start, end), scope)
+
+    def congested_at(self, slot):
+        """
+        Returns:
+            sorted list of cells inside an episode at `slot`
+        """
+        return sorted(self.at(slot, scope="cell")["name"])
+
+    def top(self, k=50, start=None, end=None, by="dropped", scope=None):
+        """
+        The k largest episodes by `by` overlapping [start, end] (whole
+        range if omitted).
+        """
+        start = self.start if start is None else start
+        end = self.end if end is None else end
+
+        return self.overlapping(start, end, scope).nlargest(k, by)
+
+    def recent(self, duration, k=50, by="dropped", scope=None):
+        """
+        Top k episodes in the last `duration` seconds of the data (up to
+        data_end), e.g. recent(3600) for "top 50 incidents last hour".
+        """
+        return self.top(k, self.data_end - duration, self.data_end, by, scope)
@@ -1,12 +1,13 @@
 import pandas as pd
 import numpy as np
 
-def build_congestion_matrix(event_data: dict):
+def build_congestion_matrix(event_data: dict, dtype=None):
     """
     Builds slot-aligned congestion event matrix.
 
     Args:
         event_data: dict[cell_id] -> DataFrame(slot, congestion_event)
+        dtype: Optional storage dtype for the matrix (e.g. np.uint8).
 
     Returns:
         DataFrame[slot x cell_id]
@@ -19,6 +20,8 @@ def build_congestion_matrix(event_data: dict):
         series.append(s)
 
     matrix = pd.concat(series, axis=1).fillna(0)
+    if dtype is not None:
+        matrix = matrix.astype(dtype)
     return matrix
 
 
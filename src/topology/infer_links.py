@@ -11,3 +11,44 @@ def infer_link_mapping(communities):
         link_mapping[f"Link{idx}"] = sorted(list(community))
 
     return link_mapping
+
+
+def score_link_mapping(link_mapping, truth):
+    """
+    Compares an inferred mapping with a ground-truth one.
+
+    Inferred links are matched one-to-one to true links so that the most
+    cells land on the right link (link names are arbitrary labels).
+
+    Returns:
+        dict with accuracy (share of true cells on the matched link),
+        matched (inferred link -> true link) and misplaced cells
+    """
+    from scipy.optimize import linear_sum_assignment
+
+    inferred = list(link_mapping)
+    actual = list(truth)
+
+    overlap = [
+        [len(set(link_mapping[i]) & set(truth[t])) for t in actual]
+        for i in inferred
+    ]
+    rows, cols = linear_sum_assignment(overlap, maximize=True)
+
+    matched = {inferred[r]: actual[c] for r, c in zip(rows, cols)}
+    correct = sum(overlap[r][c] for r, c in zip(rows, cols))
+    total = sum(len(cells) for cells in truth.values())
+
+    true_link = {cell: link for link, cells in truth.items() for cell in cells}
+    misplaced = sorted(
+        cell
+        for link, cells in link_mapping.items()
+        for cell in cells
+        if true_link.get(cell) != matched.get(link)
+    )
+
+    return {
+        "accuracy": correct / total if total else 0.0,
+        "matched": matched,
+        "misplaced": misplaced,
+    }
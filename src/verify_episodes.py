@@ -0,0 +1,94 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+from topology.congestion_episodes import LEAF_SIZE, EpisodeIndex, extract_episodes
+
+failed = False
+
+
+def check(label, ok, detail=""):
+    global failed
+    print(f"  {'✅' if ok else '❌'} {label} {detail}")
+    failed |= not ok
+
+
+def random_episodes(rng, n):
+    # Starts and ends on a coarse grid, so many intervals share endpoints
+    start = rng.integers(0, 2000, n) * 0.0005
+    end = start + rng.integers(0, 60, n) * 0.0005
+    return pd.DataFrame({
+        "scope": "cell",
+        "name": [f"cell-{i % 7}" for i in range(n)],
+        "start": start,
+        "end": end,
+        "peak_loss": 1.0,
+        "dropped": rng.random(n),
+        "n_slots": 1,
+        "cells": [(f"cell-{i % 7}",) for i in range(n)],
+    })
+
+
+def centres(node):
+    if node is None or node.center is None:
+        return []
+    return [node.center] + centres(node.left) + centres(node.right)
+
+
+rng = np.random.default_rng(0)
+
+# Empty, one leaf, just over one leaf, and deep trees
+for n in (0, 1, LEAF_SIZE, LEAF_SIZE + 1, 500, 5000):
+    print(f"Testing interval tree with {n} episodes...")
+    episodes = random_episodes(rng, n)
+    index = EpisodeIndex(episodes)
+    start, end = episodes["start"].to_numpy(), episodes["end"].to_numpy()
+
+    # Every endpoint, every node centre, nudged either side, plus random points
+    points = np.r_[start, end, centres(index._root), rng.uniform(-0.01, 1.05, 200)]
+    points = np.unique(np.r_[points, points - 1e-9, points + 1e-9])
+
+    bad = [x for x in points
+           if list(index.at(x).index) != list(np.flatnonzero((start <= x) & (end >= x)))]
+    check("stabbing", not bad, f"({len(points)} points, {len(bad)} mismatched)")
+
+    windows = [(x, x) for x in rng.choice(points, 200)] if len(points) else []
+    windows += [tuple(sorted(rng.choice(points, 2))) for _ in range(300)] if len(points) else []
+    bad = [
+        (a, b) for a, b in windows
+        if list(index.overlapping(a, b).index) != list(np.flatnonzero((start <= b) & (end >= a)))
+    ]
+    check("overlap", not bad, f"({len(windows)} windows, {len(bad)} mismatched)")
+
+# Episodes extracted from loss series, against the rows themselves
+print("Testing extracted episodes against the loss series...")
+packet_data = {}
+for i in range(6):
+    n = 3000
+    slots = 1.0 + np.arange(n) * 0.0005
+    loss = np.repeat(rng.random(n // 10) < 0.2, 10) * rng.integers(0, 4, n)
+    packet_data[f"cell-{i}"] = pd.DataFrame({"slot": slots, "packet_loss": loss.astype(float)})
+
+episodes = extract_episodes(packet_data, {"Link1": ["cell-0", "cell-1", "cell-2"]})
+index = EpisodeIndex(episodes)
+
+probe_rows = rng.choice(3000, 400, replace=False)
+bad = []
+for row in probe_rows:
+    x = 1.0 + row * 0.0005
+    expected = sorted(c for c, df in packet_data.items() if df["packet_loss"].iloc[row] >= 1)
+    if index.congested_at(x) != expected:
+        bad.append(x)
+check("congested_at", not bad, f"({len(probe_rows)} slots, {len(bad)} mismatched)")
+check("data end kept", index.data_end == 1.0 + 2999 * 0.0005)
+
+if failed:
+    print("Verification Failed.")
+    sys.exit(1)
+
+print("Episode index matches a linear scan.")
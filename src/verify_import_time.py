@@ -0,0 +1,81 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Import-time check: CLI entry points must not pull in heavy packages at
+# module load, and quick operations must start in well under a second.
+SRC = Path(__file__).resolve().parent
+
+HEAVY = ["numpy", "pandas", "scipy", "networkx", "matplotlib", "plotly", "seaborn", "streamlit"]
+LIGHT_MODULES = ["main", "batch", "pipeline.stages", "pipeline.profiling", "outputs.bundle"]
+MAX_STARTUP_SEC = 1.0
+
+
+def import_times(module):
+    """
+    Returns:
+        dict[top-level package] -> cumulative import time in microseconds
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC, capture_output=True, text=True, check=True
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        if cumulative.isdigit():
+            top = name.split(".")[0]
+            times[top] = max(times.get(top, 0), int(cumulative))
+    return times
+
+
+failed = False
+
+print("Checking module imports...")
+for module in LIGHT_MODULES:
+    times = import_times(module)
+    heavy = sorted(pkg for pkg in HEAVY if pkg in times)
+    total_ms = times.get(module.split(".")[0], 0) / 1000
+
+    if heavy:
+        print(f"  ❌ {module}: imports {heavy} at load ({total_ms:.0f} ms)")
+        failed = True
+    else:
+        print(f"  ✅ {module}: {total_ms:.0f} ms, no heavy packages")
+
+print("Checking `main.py --show-topology` startup...")
+with tempfile.TemporaryDirectory() as bundle_dir:
+    os.makedirs(os.path.join(bundle_dir, "v-1"))
+    with open(os.path.join(bundle_dir, "CURRENT"), "w") as f:
+        f.write("v-1")
+    with open(os.path.join(bundle_dir, "v-1", "link_mapping.json"), "w") as f:
+        json.dump({"Link1": ["cell-1", "cell-2"]}, f)
+
+    start = time.perf_counter()
+    shown = subprocess.run(
+        [sys.executable, "main.py", "--show-topology", "--bundle-dir", bundle_dir],
+        cwd=SRC, capture_output=True, check=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+
+if "Link1" not in shown.stdout:
+    print("  ❌ topology not read from the bundle")
+    failed = True
+elif elapsed > MAX_STARTUP_SEC:
+    print(f"  ❌ took {elapsed:.2f}s (limit {MAX_STARTUP_SEC:.1f}s)")
+    failed = True
+else:
+    print(f"  ✅ {elapsed:.2f}s")
+
+if failed:
+    print("Verification Failed.")
+    sys.exit(1)
+
+print("Import-time checks passed.")
@@ -0,0 +1,148 @@
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+from demand.hidden_demand import offered_load_matrix
+from capacity.queue_simulator import simulate_link_queue
+from ingestion.load_packet_stats import load_packet_tables
+from ingestion.load_throughput import load_slot_throughput
+from ps2.link_aggregation import aggregate_link_throughput
+from simulation.workload_generator import (
+    PACKET_HEADER, SYMBOLS_PER_SLOT, _served_per_cell, generate_workload
+)
+
+failed = False
+
+
+def check(label, ok, detail=""):
+    global failed
+    print(f"  {'✅' if ok else '❌'} {label} {detail}")
+    failed |= not ok
+
+
+HEADER = "<slot> <slotStart> <txPackets> <rxPackets> <tooLateRxPackets>\n"
+
+with tempfile.TemporaryDirectory() as site:
+    packet_dir = os.path.join(site, "packet_stats")
+    throughput_dir = os.path.join(site, "throughput")
+    os.makedirs(packet_dir)
+    os.makedirs(throughput_dir)
+
+    # One packet row per slot, timestamps exactly on slot boundaries
+    n = 10000
+    rng = np.random.default_rng(0)
+    time = 1.0 + np.arange(n) * 0.0005
+    tx = rng.integers(10, 40, n)
+    rx = tx - (rng.random(n) < 0.1) * rng.integers(0, 10, n)
+    late = (rng.random(n) < 0.1) * np.minimum(rx, 3)
+    bytes_per_packet = 1500
+
+    with open(os.path.join(packet_dir, "pkt-stats-cell-1.dat"), "w") as f:
+        f.write(HEADER)
+        for row in zip(time, tx, rx, late):
+            f.write("%.5f %d %d %d\n" % row)
+
+    # Throughput symbols half a slot in, carrying every received packet
+    pd.DataFrame({0: time + 0.00025, 1: rx * bytes_per_packet}).to_csv(
+        os.path.join(throughput_dir, "throughput-cell-1.dat"),
+        sep=" ", header=False, index=False, float_format="%.5f"
+    )
+
+    print("Testing packet stats parsing...")
+    packets, counters = load_packet_tables(packet_dir)
+    slots = counters["cell-1"]["slot"].to_numpy()
+    check("distinct slots", len(np.unique(slots)) == n, f"({len(np.unique(slots))}/{n})")
+    check("consecutive slots", np.all(np.diff(slots) == 1))
+
+    loss = packets["cell-1"]["packet_loss"].to_numpy()
+    check("packet loss is tx - rx", np.array_equal(loss, tx - rx))
+    check("loss table keeps the time column", np.allclose(packets["cell-1"]["slot"], time))
+
+    print("Testing offered load...")
+    throughput = load_slot_throughput(throughput_dir)
+    offered, carried, _, _ = offered_load_matrix(throughput, counters)
+    ceiling = tx * bytes_per_packet
+    check("late packets not counted as lost", np.allclose(offered[0], ceiling),
+          f"(offered {offered.sum() / carried.sum():.3f}x carried, "
+          f"ceiling {ceiling.sum() / carried.sum():.3f}x)")
+
+    # A lag counts packet rows: same as reading every counter `lag` rows later
+    lag = 3
+    shifted, _, _, _ = offered_load_matrix(throughput, counters, lags={"cell-1": lag})
+    manual = counters["cell-1"].copy()
+    for col in ("tx_packets", "rx_packets", "too_late_packets"):
+        manual[col] = np.r_[manual[col].to_numpy()[lag:], np.zeros(lag, dtype=np.int64)]
+    expected, _, _, _ = offered_load_matrix(throughput, {"cell-1": manual})
+    check("row lag", np.allclose(shifted, expected))
+
+print("Testing a generated site...")
+with tempfile.TemporaryDirectory() as site:
+    capacity_gbps = 10.0
+    seconds = 2.0
+    truth = generate_workload(site, links=2, cells_per_link=6, seconds=seconds,
+                              link_capacity_gbps=capacity_gbps, seed=1)
+    n_slots = int(round(seconds / 0.0005))
+
+    throughput = load_slot_throughput(os.path.join(site, "throughput"))
+    check("one slot per generated slot",
+          all(len(df) == n_slots for df in throughput.values()))
+
+    # Symbol bytes are rounded to whole bytes: allow half a byte per symbol
+    for link, df in aggregate_link_throughput(throughput, truth).items():
+        slack = 0.5 * SYMBOLS_PER_SLOT * len(truth[link]) * 8 / 0.0005 / 1e9
+        peak = df["total_throughput"].max()
+        check(f"{link} carried <= capacity", peak <= capacity_gbps + slack,
+              f"(peak {peak:.4f} Gbps)")
+
+    packet_dir = os.path.join(site, "packet_stats")
+    path = os.path.join(packet_dir, os.listdir(packet_dir)[0])
+    with open(path) as f:
+        header, row = f.readline().strip(), f.readline().split()
+    check("packet stats in the real capture layout",
+          header == PACKET_HEADER and len(row) == 4, f"({len(row)} fields per row)")
+
+    packets, counters = load_packet_tables(packet_dir)
+    dropped = sum(df["packet_loss"].sum() for df in packets.values())
+    within = all(
+        (packets[c]["packet_loss"] <= counters[c]["tx_packets"]).all() for c in packets
+    )
+    check("PS1 sees the simulated drops", within and dropped > 0,
+          f"({dropped} packets dropped)")
+
+print("Testing FIFO split of an overloaded link...")
+n, n_cells = 10 ** 6, 8
+rng = np.random.default_rng(2)
+capacity = 1.0
+accepted = rng.gamma(2.0, 1.1 / n_cells / 2.0, (n_cells, n))
+queue, dropped = simulate_link_queue(accepted.sum(axis=0), capacity, buffer=50.0)
+accepted *= 1 - dropped / np.maximum(accepted.sum(axis=0), 1e-12)
+busy = np.mean(queue > 0)
+
+started = perf_counter()
+backlog = np.zeros(n_cells)
+served = []
+for a in range(0, n, 2 ** 18):
+    part, backlog = _served_per_cell(accepted[:, a:a + 2 ** 18], queue[a:a + 2 ** 18], backlog)
+    served.append(part)
+served = np.hstack(served)
+elapsed = perf_counter() - started
+
+check(f"{n:.0e} slots ({busy:.0%} busy) split in {elapsed:.2f}s", elapsed < 5.0)
+departures = np.diff(np.r_[0.0, queue]) * -1 + accepted.sum(axis=0)
+check("link departures preserved", np.allclose(served.sum(axis=0), departures, atol=1e-6))
+check("per-cell bytes conserved",
+      np.allclose(served.sum(axis=1) + backlog, accepted.sum(axis=1)))
+check("departures within capacity", served.sum(axis=0).max() <= capacity + 1e-6)
+
+if failed:
+    print("Verification Failed.")
+    sys.exit(1)
+
+print("Ingestion, offered load and generated sites verified.")
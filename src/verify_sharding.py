@@ -0,0 +1,108 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+from pipeline.sharding import DEFAULT_RELATIVE_ACCURACY, run_sharded, sharded_correlation
+from pipeline.stages import build_pipeline, DEFAULT_PARAMS
+from capacity.sketch import QuantileSketch
+from simulation.workload_generator import generate_workload
+
+CORR_TOL = 1e-9
+CAPACITY_TOL = 2 * DEFAULT_RELATIVE_ACCURACY
+
+failed = False
+
+
+def check(label, ok, detail=""):
+    global failed
+    print(f"  {'✅' if ok else '❌'} {label} {detail}")
+    failed |= not ok
+
+
+# Sketch vs np.percentile, including merges
+print("Testing quantile sketch...")
+rng = np.random.default_rng(0)
+values = np.concatenate([np.zeros(500), rng.lognormal(2, 1, 20000)])
+merged = QuantileSketch()
+for part in np.array_split(rng.permutation(values), 7):
+    merged.merge(QuantileSketch().add(part))
+for q in (1, 50, 90, 99, 99.9):
+    exact = np.percentile(values, q)
+    est = merged.quantile(q)
+    rel = abs(est - exact) / exact if exact else abs(est)
+    check(f"p{q}", rel <= CAPACITY_TOL, f"(exact {exact:.3f}, sketch {est:.3f})")
+
+# Correlation with irregular timestamps and non-zero lags, against the
+# serial shift -> events -> correlation path
+print("Testing sharded correlation with lags...")
+from alignment.time_shift import align_packet_loss
+from topology.congestion_events import extract_windowed_congestion_events
+from topology.correlation import build_congestion_matrix, compute_correlation_matrix
+
+packets, lags, aligned = {}, {}, {}
+for i in range(6):
+    n = 3000
+    slots = np.sort(rng.choice(np.arange(20000), n, replace=False)) * 0.0005 + 1.0
+    loss = (rng.random(n) < 0.05) * rng.integers(1, 5, n)
+    cell = f"cell-{i}"
+    packets[cell] = pd.DataFrame({"slot": slots, "packet_loss": loss.astype(float)})
+
+    # Throughput leading the loss by `lag` rows, so the serial path detects it
+    lag = int(rng.integers(-7, 8))
+    throughput = pd.DataFrame({"slot": slots, "throughput": np.roll(loss, -lag).astype(float)})
+    aligned[cell], lags[cell] = align_packet_loss(throughput, packets[cell])
+    check(f"{cell} lag detected", lags[cell] == lag, f"({lags[cell]} vs {lag})")
+
+serial_matrix = build_congestion_matrix({
+    c: extract_windowed_congestion_events(df, loss_threshold=1, window=5)
+    for c, df in aligned.items()
+})
+serial_corr = compute_correlation_matrix(serial_matrix)
+
+for n_shards in (1, 3, 8):
+    corr, rows = sharded_correlation(packets, lags, 1, 5, n_shards=n_shards, workers=2)
+    diff = np.nanmax(np.abs(corr.to_numpy() - serial_corr.to_numpy()))
+    check(f"{n_shards} shards", diff < CORR_TOL and rows == len(serial_matrix),
+          f"(max diff {diff:.2e}, rows {rows}/{len(serial_matrix)})")
+
+# End-to-end on a synthetic site: serial stages vs sharded run
+print("Testing full sharded run on a synthetic site...")
+with tempfile.TemporaryDirectory() as site:
+    generate_workload(site, links=2, cells_per_link=4, seconds=1.0, seed=3)
+    params = {
+        **DEFAULT_PARAMS,
+        "throughput_dir": os.path.join(site, "throughput"),
+        "packet_dir": os.path.join(site, "packet_stats"),
+    }
+    pipeline = build_pipeline(None)
+    serial = pipeline.run(["corr_matrix", "link_mapping", "capacity", "link_throughput"], params)
+    sharded = run_sharded(pipeline, params, n_shards=4, workers=2)
+
+    diff = np.nanmax(np.abs(sharded["corr_matrix"].to_numpy() - serial["corr_matrix"].to_numpy()))
+    check("correlation", diff < CORR_TOL, f"(max diff {diff:.2e})")
+    check("link mapping", sharded["link_mapping"] == serial["link_mapping"])
+
+    for _, row in serial["capacity"].iterrows():
+        got = sharded["capacity"].set_index("link").loc[row["link"]]
+        for col in ("no_buffer", "with_buffer"):
+            rel = abs(got[col] - row[col]) / row[col]
+            check(f"{row['link']} {col}", rel <= CAPACITY_TOL,
+                  f"(serial {row[col]:.3f}, sharded {got[col]:.3f} Gbps)")
+
+        expected = serial["link_throughput"][row["link"]]
+        series = sharded["link_throughput"][row["link"]]
+        same = (len(series) == len(expected)
+                and np.allclose(series["total_throughput"], expected["total_throughput"]))
+        check(f"{row['link']} slot series", same)
+
+if failed:
+    print("Verification Failed.")
+    sys.exit(1)
+
+print("Sharded results match the serial run.")
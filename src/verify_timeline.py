@@ -0,0 +1,90 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+from simulation.congestion_state import build_congestion_state
+from simulation.timeline import CongestionTimeline
+
+failed = False
+
+
+def check(label, ok, detail=""):
+    global failed
+    print(f"  {'✅' if ok else '❌'} {label} {detail}")
+    failed |= not ok
+
+
+# Bursty loss on irregular, partly disjoint slot grids
+rng = np.random.default_rng(0)
+packet_data = {}
+for i in range(12):
+    n = 4000
+    slots = np.sort(rng.choice(np.arange(6000), n, replace=False)) * 0.0005 + 1.0
+    bursts = np.repeat(rng.random(n // 20) < 0.2, 20)
+    loss = bursts * rng.integers(0, 9, n)
+    packet_data[f"cell-{i}"] = pd.DataFrame({"slot": slots, "packet_loss": loss.astype(float)})
+
+state = build_congestion_state(packet_data)
+grid = state.index.to_numpy()
+dense = state.to_numpy()
+
+timelines = {
+    "from_state": CongestionTimeline.from_state(state),
+    "from_packet_data": CongestionTimeline.from_packet_data(packet_data),
+}
+
+
+def state_at(x):
+    # Level of the last grid slot at or before x (0 before the data)
+    i = np.searchsorted(grid, x, side="right") - 1
+    return dense[i] if i >= 0 else np.zeros(dense.shape[1], dtype=dense.dtype)
+
+
+def brute_congested(a, b, min_level):
+    inside = dense[(grid > a) & (grid <= b)]
+    window = np.vstack([state_at(a)[None, :], inside])
+    return [c for c, hit in zip(state.columns, (window >= min_level).any(axis=0)) if hit]
+
+
+# Grid slots, points between them, and the ends of the data
+between = (grid[:-1] + grid[1:]) / 2
+probes = np.r_[grid, between[::7], grid[0] - 0.0005, grid[-1] + 0.0005]
+
+for name, timeline in timelines.items():
+    print(f"Testing {name} against build_congestion_state...")
+    check("cells", timeline.cells == list(state.columns))
+    check("run starts and ends", timeline.start == grid[0] and timeline.end == grid[-1])
+
+    mismatched = [x for x in probes
+                  if list(timeline.seek(x).values()) != state_at(x).tolist()]
+    check("seek", not mismatched, f"({len(probes)} slots, {len(mismatched)} mismatched)")
+
+    check("to_state", timeline.to_state(grid).equals(state))
+
+    # Replaying iter_changes reproduces the dense state at every change
+    a, b = grid[500], grid[3000]
+    current, replay_ok = {}, True
+    for slot, changes in timeline.iter_changes(a, b):
+        current.update(changes)
+        replay_ok &= list(current.values()) == state_at(slot).tolist()
+    check("iter_changes replay", replay_ok)
+
+    windows = [(x, x) for x in rng.choice(probes, 100)]
+    windows += [tuple(sorted(rng.choice(probes, 2))) for _ in range(300)]
+    windows += [(grid[0], grid[-1]), (grid[-1], grid[-1] + 1.0), (grid[0] - 1.0, grid[0])]
+    bad = [
+        (a, b, level) for a, b in windows for level in (1, 2, 3)
+        if timeline.congested_cells(a, b, level) != brute_congested(a, b, level)
+    ]
+    check("congested_cells", not bad, f"({3 * len(windows)} windows, {len(bad)} mismatched)")
+
+if failed:
+    print("Verification Failed.")
+    sys.exit(1)
+
+print("Timeline queries match the dense congestion state.")
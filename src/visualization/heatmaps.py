@@ -0,0 +1,143 @@
+
+"""
+Correlation Heatmaps
+====================
+
+Helpers for drawing large cell x cell correlation matrices:
+
+    community_order   cells grouped by inferred link (mapping order); within
+                      a link, most central cells first; unassigned cells
+                      follow, next to the link they correlate with most;
+                      unassigned cells (all cells, without a mapping) are
+                      in hierarchical-clustering leaf order
+    downsample        block-mean raster of at most max_pixels per side
+    tile              full-resolution sub-matrix for a zoomed region
+
+The overview costs O(max_pixels^2) to send and draw whatever the cell
+count; full resolution is only ever served for the zoomed tile.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Largest matrix shown without downsampling
+MAX_PIXELS = 400
+
+
+def _cluster_order(corr, rows):
+    """
+    Rows in average-linkage leaf order on 1 - correlation, so strongly
+    correlated cells end up next to each other.
+    """
+    if len(rows) <= 2:
+        return list(rows)
+
+    from scipy.cluster.hierarchy import leaves_list, linkage
+    from scipy.spatial.distance import squareform
+
+    rows = np.asarray(rows)
+    distance = np.clip(1 - corr[np.ix_(rows, rows)], 0, 2)
+    distance = (distance + distance.T) / 2
+    np.fill_diagonal(distance, 0)
+
+    tree = linkage(squareform(distance, checks=False), method="average")
+    return list(rows[leaves_list(tree)])
+
+
+def community_order(corr_matrix, link_mapping=None):
+    """
+    Returns:
+        (ordered cell list, list of (link, first index, end index) blocks
+        of each link's member cells)
+    """
+    cells = list(corr_matrix.index)
+    corr = np.nan_to_num(corr_matrix.to_numpy(dtype=np.float64))
+    pos = {cell: i for i, cell in enumerate(cells)}
+
+    members = {
+        link: [pos[c] for c in group if c in pos]
+        for link, group in (link_mapping or {}).items()
+    }
+    members = {link: rows for link, rows in members.items() if rows}
+    assigned = {i for rows in members.values() for i in rows}
+    loose = [i for i in range(len(cells)) if i not in assigned]
+
+    # Unassigned cells join the link they correlate with most (as a tail)
+    tails = {link: [] for link in members}
+    rest = []
+    if members and loose:
+        links = list(members)
+        loose_corr = corr[loose]
+        strength = np.array([loose_corr[:, rows].mean(axis=1) for rows in members.values()])
+        best = strength.argmax(axis=0)
+        for j, i in enumerate(loose):
+            if strength[best[j], j] > 0:
+                tails[links[best[j]]].append(i)
+            else:
+                rest.append(i)
+    else:
+        rest = loose
+
+    order, blocks = [], []
+    for link, rows in members.items():
+        rows = np.array(rows)
+        # Most central first: mean correlation with the rest of the link
+        centrality = corr[np.ix_(rows, rows)].mean(axis=1)
+        group = list(rows[np.argsort(-centrality, kind="stable")]) + _cluster_order(corr, tails[link])
+        # Blocks outline members only; attached unassigned cells sit just after
+        blocks.append((link, len(order), len(order) + len(rows)))
+        order.extend(group)
+
+    order.extend(_cluster_order(corr, rest))
+
+    return [cells[i] for i in order], blocks
+
+
+def downsample(matrix, max_pixels=MAX_PIXELS):
+    """
+    Block-mean pooling to at most max_pixels x max_pixels (NaN ignored).
+
+    Returns:
+        (raster, row edges, column edges); block k covers
+        edges[k]:edges[k + 1] of the input
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    rows, cols = matrix.shape
+
+    def edges(n):
+        return np.linspace(0, n, min(n, max_pixels) + 1).round().astype(np.int64)
+
+    r_edges, c_edges = edges(rows), edges(cols)
+    if len(r_edges) - 1 == rows and len(c_edges) - 1 == cols:
+        return matrix, r_edges, c_edges
+
+    valid = ~np.isnan(matrix)
+    values = np.where(valid, matrix, 0.0)
+
+    # Sum over row blocks, then column blocks; same for the valid counts
+    sums = np.add.reduceat(np.add.reduceat(values, r_edges[:-1], axis=0), c_edges[:-1], axis=1)
+    counts = np.add.reduceat(np.add.reduceat(valid.astype(np.int64), r_edges[:-1], axis=0),
+                             c_edges[:-1], axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        raster = sums / counts
+
+    return raster, r_edges, c_edges
+
+
+def tile(corr_matrix, row_range, col_range):
+    """
+    Full-resolution sub-matrix of an (ordered) correlation frame.
+    """
+    return corr_matrix.iloc[row_range[0]:row_range[1], col_range[0]:col_range[1]]
+
+
+def ordered_matrix(corr_matrix, link_mapping=None):
+    """
+    Correlation frame with rows and columns in community order.
+
+    Returns:
+        (DataFrame, blocks)
+    """
+    order, blocks = community_order(corr_matrix, link_mapping)
+    return corr_matrix.loc[order, order], blocks
@@ -2,19 +2,41 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import networkx as nx
 
+from visualization.heatmaps import MAX_PIXELS, downsample, ordered_matrix
 
-def plot_correlation_heatmap(corr_matrix):
+
+def plot_correlation_heatmap(corr_matrix, link_mapping=None, max_pixels=MAX_PIXELS):
     """
     Visualizes the cell-to-cell congestion correlation matrix.
+
+    Cells are grouped by inferred link; above max_pixels cells the matrix
+    is drawn as a block-mean raster.
     """
+    ordered, blocks = ordered_matrix(corr_matrix, link_mapping)
+    raster, _, _ = downsample(ordered.to_numpy(), max_pixels)
+
     plt.figure(figsize=(12, 10))
-    sns.heatmap(
-        corr_matrix,
-        cmap="coolwarm",
-        center=0,
-        square=True,
-        cbar_kws={"label": "Congestion Correlation"}
-    )
+    if len(raster) == len(ordered):
+        sns.heatmap(
+            ordered,
+            cmap="coolwarm",
+            center=0,
+            square=True,
+            cbar_kws={"label": "Congestion Correlation"}
+        )
+    else:
+        n = len(ordered)
+        plt.imshow(raster, cmap="coolwarm", vmin=-1, vmax=1,
+                   extent=(0, n, n, 0), interpolation="nearest")
+        plt.colorbar(label="Congestion Correlation (block mean)")
+        plt.xlabel("Cell (ordered by link)")
+        plt.ylabel("Cell (ordered by link)")
+
+    # Link boundaries
+    for edge in sorted({e for _, a, b in blocks for e in (a, b)} - {0, len(ordered)}):
+        plt.axhline(edge, color="black", linewidth=0.5)
+        plt.axvline(edge, color="black", linewidth=0.5)
+
     plt.title("Cell-to-Cell Congestion Correlation Heatmap (PS1 Evidence)")
     plt.tight_layout()
     plt.show()
@@ -1,109 +1,155 @@
 
+"""
+3D Topology
+===========
+
+Plotly 3D hub-and-spoke view with level of detail: links can be shown
+collapsed (one aggregate glyph per link, sized by its cell count) or
+expanded into their cells. Positions come from the shared hub-and-spoke
+layout; every trace column is built from NumPy arrays.
+
+With a congestion state (cell -> level, e.g. CongestionTimeline.seek)
+cells are coloured by level and collapsed links by their worst cell.
+"""
+
+import colorsys
+
+import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
-import networkx as nx
 
-def generate_3d_topology(link_mapping):
+from visualization.topology_graph import hub_spoke_arrays
+
+# Expand every link automatically up to this many cells
+LOD_CELL_LIMIT = 1000
+
+# Aesthetic Colors (Neon Palette); further links get evenly spaced hues
+NEON_PALETTE = [
+    "#00f3ff",  # Cyan
+    "#39ff14",  # Neon Green
+    "#ff00ff",  # Magenta
+    "#ffff00",  # Yellow
+    "#ff7700",  # Orange
+]
+
+# Congestion level -> colour (normal, mild, severe)
+LEVEL_COLORS = np.array(["#39ff14", "#ff7700", "#ff0033"], dtype=object)
+
+
+def link_colors(n):
+    """
+    n distinct colours: the neon palette first, then golden-ratio hues.
+    """
+    extra = [
+        "#%02x%02x%02x" % tuple(int(255 * c) for c in colorsys.hsv_to_rgb((i * 0.618034) % 1, 0.9, 1))
+        for i in range(max(n - len(NEON_PALETTE), 0))
+    ]
+    return np.array((NEON_PALETTE + extra)[:n], dtype=object)
+
+
+def _levels(names, congestion):
+    if congestion is None:
+        return None
+    levels = pd.Series(congestion, dtype="float64").reindex(names).fillna(0)
+    return np.clip(levels.to_numpy().astype(np.int64), 0, len(LEVEL_COLORS) - 1)
+
+
+def generate_3d_topology(link_mapping, congestion=None, expand="auto"):
     """
     Generates a 3D aesthetic topology figure using Plotly.
-    
+
     Args:
         link_mapping (dict): Dictionary mapping Link IDs to Cells.
-        
+        congestion (dict | pd.Series): Optional cell -> congestion level.
+        expand: links shown cell by cell; "auto" expands all links when
+            the deployment has at most LOD_CELL_LIMIT cells, otherwise none.
+
     Returns:
-        plotly.graph_objects.Figure
+        plotly.graph_objects.Figure (edge trace, node trace)
     """
-    # 1. Build Graph
-    G = nx.Graph()
-    for link, cells in link_mapping.items():
-        G.add_node(link, type="link", group=link)
-        for cell in cells:
-            G.add_node(cell, type="cell", group=link)
-            G.add_edge(link, cell)
-
-    # 2. Compute 3D Layout
-    # k=0.5 pushes nodes apart, dim=3 for 3D
-    pos = nx.spring_layout(G, dim=3, seed=42, k=0.5)
-
-    # 3. Extract Coordinates & Styles
-    edge_x = []
-    edge_y = []
-    edge_z = []
-    
-    node_x = []
-    node_y = []
-    node_z = []
-    node_color = []
-    node_size = []
-    node_text = []
-    
-    # Aesthetic Colors (Neon Palette)
-    # Link1: Neon Blue, Link2: Neon Green, Link3: Neon Orange/Pink
-    group_colors = {
-        "Link1": "#00f3ff", # Cyan
-        "Link2": "#39ff14", # Neon Green
-        "Link3": "#ff00ff", # Magenta
-        "Link4": "#ffff00", # Yellow
-        "Link5": "#ff7700"  # Orange
-    }
-    
-    # Edges
-    for edge in G.edges():
-        x0, y0, z0 = pos[edge[0]]
-        x1, y1, z1 = pos[edge[1]]
-        edge_x.extend([x0, x1, None])
-        edge_y.extend([y0, y1, None])
-        edge_z.extend([z0, z1, None])
-
-    # Nodes
-    for node in G.nodes():
-        x, y, z = pos[node]
-        node_x.append(x)
-        node_y.append(y)
-        node_z.append(z)
-        
-        node_type = G.nodes[node]["type"]
-        group = G.nodes[node]["group"]
-        
-        base_color = group_colors.get(group, "#ffffff")
-        
-        if node_type == "link":
-            node_color.append(base_color)
-            node_size.append(15) # Larger for Hubs
-            node_text.append(f"<b>{node}</b> (Main Hub)")
-        else:
-            node_color.append(base_color)
-            node_size.append(6) # Smaller for Cells
-            node_text.append(f"{node}")
-
-    # 4. Create Traces
-    
-    # Glow Effect: We draw nodes twice, once with blur? Plotly doesn't do blur easily.
-    # Instead, we use marker line width to create a "halo"
-    
+    layout = hub_spoke_arrays(link_mapping, dim=3)
+    links = layout["links"]
+    sizes = layout["sizes"]
+    n_links = len(links)
+
+    coords = layout["coords"]
+    is_hub = layout["is_hub"]
+    link_index = layout["link_index"]
+    names = np.array(layout["names"], dtype=object)
+
+    if isinstance(expand, str) and expand == "auto":
+        expanded = np.full(n_links, sizes.sum() <= LOD_CELL_LIMIT)
+    else:
+        expanded = np.isin(np.array(links, dtype=object), list(expand or []))
+
+    palette = link_colors(n_links)
+
+    # Cells visible: members of expanded links
+    cell_rows = np.flatnonzero(~is_hub & expanded[link_index])
+    cell_links = link_index[cell_rows]
+    cell_levels = _levels(names[cell_rows], congestion)
+
+    # Hub glyphs: plain hubs when expanded, aggregates when collapsed
+    hub_size = np.where(expanded, 15, 10 + 4 * np.sqrt(sizes))
+    if congestion is not None:
+        all_cells = ~is_hub
+        all_levels = _levels(names[all_cells], congestion)
+        worst = np.zeros(n_links, dtype=np.int64)
+        np.maximum.at(worst, link_index[all_cells], all_levels)
+        congested = np.bincount(link_index[all_cells], weights=all_levels > 0, minlength=n_links)
+        hub_color = np.where(expanded, palette, LEVEL_COLORS[worst])
+        hub_status = np.char.mod(" · %d congested", congested.astype(np.int64))
+    else:
+        hub_color = palette
+        hub_status = np.full(n_links, "", dtype=object)
+
+    hub_text = np.where(
+        expanded,
+        np.char.add(np.char.add("<b>", np.array(links, dtype=str)), "</b> (Main Hub)"),
+        np.char.add(np.char.add(np.char.add("<b>", np.array(links, dtype=str)), "</b> · "),
+                    np.char.mod("%d cells", sizes)),
+    ).astype(str)
+    hub_text = np.char.add(hub_text, hub_status.astype(str))
+
+    if cell_levels is None:
+        cell_color = palette[cell_links]
+        cell_text = names[cell_rows].astype(str)
+    else:
+        cell_color = LEVEL_COLORS[cell_levels]
+        cell_text = np.char.add(names[cell_rows].astype(str), np.char.mod("<br>Level %d", cell_levels))
+
+    # Edges: hub -> cell segments separated by NaN gaps
+    hubs_xyz = coords[:n_links]
+    cells_xyz = coords[cell_rows]
+    segments = np.stack([
+        hubs_xyz[cell_links], cells_xyz, np.full_like(cells_xyz, np.nan)
+    ], axis=1).reshape(-1, 3)
+
     edge_trace = go.Scatter3d(
-        x=edge_x, y=edge_y, z=edge_z,
+        x=segments[:, 0], y=segments[:, 1], z=segments[:, 2],
         mode='lines',
         line=dict(color='#888888', width=2), # Semi-transparent grey
         opacity=0.3,
         hoverinfo='none'
     )
 
+    nodes_xyz = np.vstack([hubs_xyz, cells_xyz]).astype(np.float32)
     node_trace = go.Scatter3d(
-        x=node_x, y=node_y, z=node_z,
+        x=nodes_xyz[:, 0], y=nodes_xyz[:, 1], z=nodes_xyz[:, 2],
         mode='markers',
         marker=dict(
-            size=node_size,
-            color=node_color,
+            size=np.r_[hub_size, np.full(len(cell_rows), 6)],
+            color=np.r_[hub_color, cell_color],
             line=dict(color='#ffffff', width=2), # White halo
             opacity=0.9
         ),
-        text=node_text,
+        text=np.r_[hub_text, cell_text],
         hoverinfo='text'
     )
 
-    # 5. Figure Layout
+    # Figure Layout
     fig = go.Figure(data=[edge_trace, node_trace])
-    
+
     fig.update_layout(
         title="✨ Immersive 3D Topology",
         title_font_color="#ffffff",
@@ -117,7 +163,8 @@ def generate_3d_topology(link_mapping):
             bgcolor="#0e1117"
         ),
         margin=dict(l=0, r=0, b=0, t=40),
-        height=700
+        height=700,
+        uirevision="topology"  # keep the camera when levels/expansion change
     )
-    
+
     return fig
@@ -0,0 +1,164 @@
+
+"""
+Topology Layout
+===============
+
+Deterministic hub-and-spoke layout shared by every topology view
+(dashboard map, simulator, Plotly animation, 3D view).
+
+Hubs (links) sit evenly on a unit circle (2D) or a Fibonacci sphere (3D).
+Each link's cells sit on a ring or small sphere around their hub, sized
+so neighbouring clusters do not overlap. Placement is O(n) with no
+iterations, and the same mapping always gives the same positions.
+
+Layouts and graphs are cached per process, keyed by a hash of the link
+mapping, so Streamlit reruns and different views reuse one result.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+CACHE_SIZE = 16
+
+_layouts = OrderedDict()
+_graphs = OrderedDict()
+
+
+def mapping_key(link_mapping):
+    """
+    Stable hash of a link mapping (order of links and cells included).
+    """
+    payload = json.dumps([[link, list(cells)] for link, cells in link_mapping.items()])
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _cached(cache, key, build):
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+
+    value = cache[key] = build()
+    while len(cache) > CACHE_SIZE:
+        cache.popitem(last=False)
+
+    return value
+
+
+def _circle(n, radius=1.0):
+    angle = 2 * np.pi * np.arange(n) / max(n, 1)
+    return radius * np.column_stack([np.cos(angle), np.sin(angle)])
+
+
+def _sphere(n, radius=1.0):
+    # Fibonacci lattice: near-uniform points on a sphere
+    if n == 1:
+        return np.zeros((1, 3))
+    i = np.arange(n) + 0.5
+    z = 1 - 2 * i / n
+    r = np.sqrt(1 - z * z)
+    theta = np.pi * (1 + 5 ** 0.5) * i
+    return radius * np.column_stack([r * np.cos(theta), r * np.sin(theta), z])
+
+
+def _nearest_hub_distance(hubs, dim):
+    if dim == 2:
+        # Neighbouring points on the unit circle
+        return 2 * np.sin(np.pi / len(hubs))
+
+    # A few hundred hubs at most: plain pairwise distances
+    gap = np.linalg.norm(hubs[:, None, :] - hubs[None, :, :], axis=-1)
+    np.fill_diagonal(gap, np.inf)
+    return gap.min()
+
+
+def _compute(link_mapping, dim):
+    links = list(link_mapping)
+    n_links = len(links)
+    place = _circle if dim == 2 else _sphere
+
+    hubs = place(n_links) if n_links > 1 else np.zeros((n_links, dim))
+
+    # Spoke radius: under half the distance between the closest two hubs
+    if n_links <= 1:
+        spoke = 1.0
+    else:
+        spoke = min(0.45 * _nearest_hub_distance(hubs, dim), 0.45)
+
+    sizes = np.array([len(link_mapping[link]) for link in links], dtype=np.int64)
+    names = list(links)
+    coords = [hubs]
+    hub_of = [np.arange(n_links)]
+
+    for i, link in enumerate(links):
+        cells = list(link_mapping[link])
+        if not cells:
+            continue
+        if dim == 3 and len(cells) == 1:
+            ring = np.array([[spoke, 0.0, 0.0]])
+        else:
+            ring = place(len(cells), spoke)
+        coords.append(hubs[i] + ring)
+        names.extend(cells)
+        hub_of.append(np.full(len(cells), i))
+
+    coords = np.vstack(coords) if names else np.zeros((0, dim))
+    is_hub = np.zeros(len(names), dtype=bool)
+    is_hub[:n_links] = True
+
+    link_index = np.concatenate(hub_of) if names else np.zeros(0, dtype=np.int64)
+
+    # Shared through the cache: callers must not modify them
+    for array in (coords, is_hub, link_index, sizes):
+        array.setflags(write=False)
+
+    return {
+        "names": names,
+        "coords": coords,
+        "is_hub": is_hub,
+        "link_index": link_index,
+        "links": links,
+        "sizes": sizes,
+    }
+
+
+def hub_spoke_arrays(link_mapping, dim=2):
+    """
+    Layout as arrays (cached and shared, so the arrays are read-only).
+
+    Returns:
+        dict(names, coords[n x dim], is_hub, link_index, links, sizes);
+        hubs come first, then each link's cells in mapping order
+    """
+    key = (mapping_key(link_mapping), dim)
+    return _cached(_layouts, key, lambda: _compute(link_mapping, dim))
+
+
+def hub_spoke_layout(link_mapping, dim=2):
+    """
+    Node -> position dict, the same shape nx.spring_layout returns.
+    Positions are copies, free to modify.
+    """
+    layout = hub_spoke_arrays(link_mapping, dim)
+    return dict(zip(layout["names"], layout["coords"].copy()))
+
+
+def build_hub_spoke_graph(link_mapping):
+    """
+    Hub (type="link") and spoke (type="cell") graph, cached per mapping.
+    Treat the result as read-only.
+    """
+    def build():
+        import networkx as nx
+
+        G = nx.Graph()
+        for link, cells in link_mapping.items():
+            G.add_node(link, type="link", group=link)  # Hub
+            for cell in cells:
+                G.add_node(cell, type="cell", group=link)  # Spoke
+                G.add_edge(link, cell)
+        return G
+
+    return _cached(_graphs, mapping_key(link_mapping), build)
@@ -0,0 +1,262 @@
+
+"""
+Traffic Plots
+=============
+
+Multi-resolution time pyramid for long-window traffic plots.
+
+Each series (a cell or a link) is summarised at five resolutions:
+
+    slot    0.5 ms   raw slot values
+    1 ms    2 slots
+    10 ms   20 slots
+    1 s     2000 slots
+    1 min   120000 slots
+
+Every bucket keeps min, max, mean and count of the throughput samples and
+the number of congested (loss) slots; buckets with loss slots only have
+NaN min/max/mean. Each level is reduced from the one
+below, so building is O(n). A plot asks for a [start, end] window and its
+pixel width and gets the finest level with at most one bucket per pixel,
+so a day-long view and a single-slot zoom cost about the same.
+"""
+
+import numpy as np
+import pandas as pd
+
+from preprocessing.symbol_to_slot import SLOT_DURATION_SEC, time_to_slot
+
+# (name, slots per bucket), finest first
+PYRAMID_LEVELS = (
+    ("slot", 1),
+    ("1 ms", 2),
+    ("10 ms", 20),
+    ("1 s", 2000),
+    ("1 min", 120000),
+)
+
+STAT_COLUMNS = ["slot", "min", "max", "mean", "count", "loss_count"]
+
+
+def _reduce(keys, stats, factor):
+    """
+    Merges buckets of one level into buckets `factor` times wider.
+    """
+    if len(keys) == 0:
+        return keys, stats
+
+    parent = keys // factor
+    starts = np.r_[0, np.flatnonzero(np.diff(parent)) + 1]
+
+    sums = np.where(stats["count"] > 0, stats["mean"].astype(np.float64) * stats["count"], 0.0)
+    total = np.add.reduceat(sums, starts)
+    count = np.add.reduceat(stats["count"], starts)
+
+    return parent[starts], {
+        # fmin/fmax skip the NaN of loss-only buckets
+        "min": np.fmin.reduceat(stats["min"], starts),
+        "max": np.fmax.reduceat(stats["max"], starts),
+        "mean": _mean(total, count),
+        "count": count,
+        "loss_count": np.add.reduceat(stats["loss_count"], starts),
+    }
+
+
+def _mean(total, count):
+    # NaN where a bucket has no throughput samples (loss slots only)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / count, np.nan).astype(np.float32)
+
+
+class TimePyramid:
+    """
+    Args:
+        keys: dict[level name] -> bucket index array (slot // width)
+        stats: dict[level name] -> dict of min/max/mean/count/loss_count
+    """
+
+    def __init__(self, keys, stats):
+        self.keys = keys
+        self.stats = stats
+
+    @classmethod
+    def from_series(cls, slots, values, loss_slots=None):
+        """
+        Args:
+            slots: integer slot indices of the throughput samples
+            values: throughput per slot
+            loss_slots: integer slot indices of congested (loss) slots
+        """
+        slots = np.asarray(slots, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float32)
+
+        order = np.argsort(slots, kind="stable")
+        slots, values = slots[order], values[order]
+
+        loss_slots = np.asarray(loss_slots if loss_slots is not None else [], dtype=np.int64)
+
+        # Slot level on the union of throughput and loss slots
+        keys = np.sort(np.concatenate([slots, loss_slots]))
+        keys = keys[np.r_[True, np.diff(keys) > 0]] if len(keys) else keys
+        pos = np.searchsorted(keys, slots)
+
+        count = np.bincount(pos, minlength=len(keys)).astype(np.int64)
+        total = np.bincount(pos, weights=values, minlength=len(keys))
+        low = np.full(len(keys), np.nan, dtype=np.float32)
+        high = np.full(len(keys), np.nan, dtype=np.float32)
+        if np.all(np.diff(slots) > 0):
+            low[pos] = high[pos] = values
+        else:
+            np.fmin.at(low, pos, values)
+            np.fmax.at(high, pos, values)
+
+        stats = {
+            "min": low,
+            "max": high,
+            "mean": _mean(total, count),
+            "count": count,
+            "loss_count": np.bincount(
+                np.searchsorted(keys, loss_slots), minlength=len(keys)
+            ).astype(np.int64),
+        }
+
+        all_keys, all_stats = {}, {}
+        width = 1
+        for name, slots_per_bucket in PYRAMID_LEVELS:
+            if slots_per_bucket != width:
+                keys, stats = _reduce(keys, stats, slots_per_bucket // width)
+                width = slots_per_bucket
+            all_keys[name], all_stats[name] = keys, stats
+
+        return cls(all_keys, all_stats)
+
+    @property
+    def start(self):
+        keys = self.keys[PYRAMID_LEVELS[0][0]]
+        return int(keys[0]) if len(keys) else 0
+
+    @property
+    def end(self):
+        keys = self.keys[PYRAMID_LEVELS[0][0]]
+        return int(keys[-1]) if len(keys) else 0
+
+    def level_for(self, start, end, pixels):
+        """
+        Finest level with at most one bucket per pixel over [start, end].
+        """
+        span = max(end - start + 1, 1)
+        for name, width in PYRAMID_LEVELS:
+            if span / width <= pixels:
+                return name
+
+        return PYRAMID_LEVELS[-1][0]
+
+    def query(self, start, end, pixels=1200, level=None):
+        """
+        Buckets overlapping slots [start, end].
+
+        Returns:
+            (level name, DataFrame[STAT_COLUMNS]); `slot` is the first slot
+            of each bucket
+        """
+        level = level or self.level_for(start, end, pixels)
+        width = dict(PYRAMID_LEVELS)[level]
+
+        keys = self.keys[level]
+        lo = np.searchsorted(keys, start // width, side="left")
+        hi = np.searchsorted(keys, end // width, side="right")
+
+        stats = self.stats[level]
+        frame = pd.DataFrame({"slot": keys[lo:hi] * width})
+        for col in STAT_COLUMNS[1:]:
+            frame[col] = stats[col][lo:hi]
+
+        return level, frame
+
+
+def build_pyramids(matrix, slots, cells, link_mapping=None, congestion_state=None):
+    """
+    Pyramids for every cell and every link.
+
+    Args:
+        matrix, slots, cells: slot throughput [cells x slots] with integer
+            slot indices (ResultsBundle.slot_throughput)
+        link_mapping: dict[link] -> cells; link series are member sums
+        congestion_state: DataFrame[slot (seconds) x cell] of levels; slots
+            with level >= 1 are counted as loss
+
+    Returns:
+        dict[name] -> TimePyramid
+    """
+    slots = np.asarray(slots, dtype=np.int64)
+    row = {cell: i for i, cell in enumerate(cells)}
+
+    loss = {}
+    if congestion_state is not None and len(congestion_state):
+        # Same slot convention as the throughput loader
+        state_slots = time_to_slot(congestion_state.index.to_numpy(dtype=np.float64))
+        for cell in congestion_state.columns:
+            loss[cell] = state_slots[congestion_state[cell].to_numpy() >= 1]
+
+    pyramids = {}
+    for cell in cells:
+        pyramids[cell] = TimePyramid.from_series(slots, matrix[row[cell]], loss.get(cell))
+
+    for link, members in (link_mapping or {}).items():
+        rows = [row[c] for c in members if c in row]
+        if not rows:
+            continue
+        member_loss = [loss[c] for c in members if c in loss]
+        pyramids[link] = TimePyramid.from_series(
+            slots,
+            np.asarray(matrix[rows], dtype=np.float64).sum(axis=0),
+            np.concatenate(member_loss) if member_loss else None,
+        )
+
+    return pyramids
+
+
+def plot_traffic_window(pyramid, start, end, pixels=1200, title=None):
+    """
+    Min/max band, mean line and loss counts for slots [start, end].
+
+    Returns:
+        (plotly Figure, level name)
+    """
+    import plotly.graph_objects as go
+
+    level, frame = pyramid.query(start, end, pixels)
+
+    # BYTES per slot -> Gbps
+    to_gbps = 8 / SLOT_DURATION_SEC / 1e9
+    t = frame["slot"] * SLOT_DURATION_SEC
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=t, y=frame["max"] * to_gbps, mode="lines",
+        line=dict(width=0), showlegend=False, hoverinfo="skip"
+    ))
+    fig.add_trace(go.Scatter(
+        x=t, y=frame["min"] * to_gbps, mode="lines", fill="tonexty",
+        line=dict(width=0), fillcolor="rgba(31,119,180,0.25)", name="min–max"
+    ))
+    fig.add_trace(go.Scatter(
+        x=t, y=frame["mean"] * to_gbps, mode="lines",
+        line=dict(color="#1f77b4", width=1), name="mean"
+    ))
+    fig.add_trace(go.Bar(
+        x=t, y=frame["loss_count"], name="loss slots",
+        marker_color="#d62728", opacity=0.5, yaxis="y2"
+    ))
+
+    fig.update_layout(
+        title=title or f"Throughput ({level} buckets)",
+        xaxis_title="Time (s)",
+        yaxis=dict(title="Throughput (Gbps)"),
+        yaxis2=dict(title="Congested slots", overlaying="y", side="right", showgrid=False),
+        height=450,
+        bargap=0,
+        legend=dict(orientation="h")
+    )
+
+    return fig, level